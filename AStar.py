@@ -1,6 +1,9 @@
 from RushHourPuzzle import RushHourPuzzle
 from Node import Node
-import heapq
+from SearchTree import SearchTree
+from OpenList import HeapOpenList, BucketOpenList
+from Budget import SearchStopped, SearchSnapshot, run_search
+from SearchStats import SearchStats
 import time
 
 
@@ -9,12 +12,12 @@ def h1(state):
     Heuristic 1: Distance from target vehicle (X) to exit
     Exit is at position (board_width - 2, board_height // 2 - 1)
     """
-    for v in state.vehicles:
-        if v["id"] == "X":
-            goal_x = state.board_width - 2 #position de la sortie
-            distance = goal_x - v["x"] #distance horizontale
-            return distance
-    return 0
+    layout = state.layout
+    t = layout.target
+    if t is None:
+        return 0
+    x, _ = layout.coords(t, state.pos[t])
+    return layout.goal_x - x #distance horizontale
 
 
 def h2(state):
@@ -24,27 +27,32 @@ def h2(state):
     """
     # First get h1
     h1_value = h1(state)
-    
+
     # Find X vehicle
-    x_vehicle = None
-    for v in state.vehicles:
-        if v["id"] == "X":
-            x_vehicle = v #yhws aala x
-            break
-    
-    if x_vehicle is None:
+    layout = state.layout
+    t = layout.target
+    if t is None:
         return h1_value
-    
+
     # Count blocking vehicles
     blocking_count = 0
-    x_row = x_vehicle["y"] #position de x 
-    x_end = x_vehicle["x"] + x_vehicle["length"] #position de la fin dont le v se trouve
-    goal_x = state.board_width - 2 # Position de la sortie
-    
+    x, x_row = layout.coords(t, state.pos[t]) #position de x
+    x_end = x + layout.lengths[t] #position de la fin dont le v se trouve
+    goal_x = layout.goal_x # Position de la sortie
+    width = layout.board_width
+
+    if layout.backend == 'bitboard':
+        # Same count in one AND: X's row mask cut to the columns [x_end, goal_x + 1]
+        lane = layout.row_masks[x_row] & ~((1 << (x_row * width + x_end)) - 1)
+        blocking_count = bin(state.occupancy() & lane).count("1")
+        return max(h1_value, blocking_count)
+
+    row = state.row(x_row)
+
     # Check each column from X's end to goal
     for col in range(x_end, goal_x + 2):
-        if col < state.board_width and state.board[x_row][col] != ' ': #nchofo dans la ligne de x esq kyn li ybloquiw la voie
-            blocking_count += 1 
+        if col < width and row[col] != ' ': #nchofo dans la ligne de x esq kyn li ybloquiw la voie
+            blocking_count += 1
             #explication
             """""
 Si X est en position 1-2:
@@ -52,7 +60,7 @@ Si X est en position 1-2:
 - goal_x = 4 (sortie)
 - La boucle vérifie les positions 3, 4, et 5 et 5 is the wall
 - Trouve B et C comme obstacles
-- blocking_count sera 2   """ 
+- blocking_count sera 2   """
 
     # Take the maximum to ensure admissibility c’est‑à‑dire pour tout état s : h(s) ≤ h*(s) (h* = coût réel minimal jusqu’au but).
     return max(h1_value, blocking_count)
@@ -65,131 +73,325 @@ def h3(state):
     """
     # Get distance component (h1)
     h1_value = h1(state)
-    
+
     # Find X vehicle
-    x_vehicle = None
-    for v in state.vehicles:
-        if v["id"] == "X":
-            x_vehicle = v
-            break
-    
-    if x_vehicle is None:
+    layout = state.layout
+    t = layout.target
+    if t is None:
         return h1_value
-    
+
     # Analyze blocking vehicles
-    x_row = x_vehicle["y"]
-    x_end = x_vehicle["x"] + x_vehicle["length"]
-    goal_x = state.board_width - 2
-    
+    x, x_row = layout.coords(t, state.pos[t])
+    x_end = x + layout.lengths[t]
+    goal_x = layout.goal_x
+    width = layout.board_width
+    row = state.row(x_row)
+
     min_moves = 0  # Minimal moves needed
     blockers = set()  # Track unique blockers
-    
+
     # First pass: identify unique blockers
     for col in range(x_end, goal_x + 2):
-        if col < state.board_width:
-            cell = state.board[x_row][col]
+        if col < width:
+            cell = row[col]
             if cell != ' ' and cell != 'X':
                 blockers.add(cell)
-    
+
     # Second pass: analyze each blocker's situation
     for blocker_id in blockers:
-        # Find the blocker vehicle
-        blocker = None
-        for v in state.vehicles:
-            if v["id"] == blocker_id: #nchofo esq blocker ta3 X 
-                blocker = v
-                break
-        
-        if blocker:
-            if blocker["orientation"] == 'V':
+        # Find the blocker vehicle (walls '#' are not vehicles so they are skipped)
+        b = layout.index.get(blocker_id) #nchofo esq blocker ta3 X
+
+        if b is not None:
+            if layout.orientations[b] == 'V':
                 # Vertical vehicle must move at least 1 space
                 min_moves += 1 #always ki ykon vertical il suffit de bouger une fois
             else:
-                # Horizontal vehicle might need 2 moves if trapped
+                # Horizontal vehicle might need 2 moves if trapped (it is on X's row so `row` is enough)
                 spaces_before = 0
                 spaces_after = 0
-                x, y = blocker["x"], blocker["y"]
-                
+                bx, _ = layout.coords(b, state.pos[b])
+
                 # Check spaces before
-                if x > 0 and state.board[y][x-1] == ' ': #li 9bl blocker vide
+                if bx > 0 and row[bx - 1] == ' ': #li 9bl blocker vide
                     spaces_before = 1
-                    
+
                 # Check spaces after
-                end_x = x + blocker["length"]
-                if end_x < state.board_width and state.board[y][end_x] == ' ':
+                end_x = bx + layout.lengths[b]
+                if end_x < width and row[end_x] == ' ':
                     spaces_after = 1
-                
+
                 # If no free space on either side, need at least 2 moves
                 if spaces_before + spaces_after == 0: #no place to moove
                     min_moves += 2
                 else:
                     min_moves += 1
-    
+
     # Take maximum to ensure admissibility
-    return max(h1_value, min_moves)    
+    return max(h1_value, min_moves)
+
+
+def h4(state):
+    """
+    Heuristic 4: always 0 (A* becomes uniform cost search), used as the worst case in compare_heuristics
+    """
+    return 0
+
 
 
+def h5(state):
+    """
+    Heuristic 5: for the slide cost model (one move = one slide of any length)
+    X needs at least 1 slide + 1 slide for each distinct vehicle in its way
+    h1..h3 count cells, so they are only admissible with the per-cell cost model
+    """
+    layout = state.layout
+    t = layout.target
+    if t is None or state.isGoal():
+        return 0
+
+    x, x_row = layout.coords(t, state.pos[t])
+    row = state.row(x_row)
+    blockers = set(row[x + layout.lengths[t]:]) - {' ', '#', 'X'}
+    return 1 + len(blockers)
+
+
+# Cost models for the macro-moves (id, direction, k) of slideSuccessorFunction
+def slide_cost(action):
+    """
+    Standard Rush Hour metric: any slide costs 1
+    """
+    return 1
+
+
+def cell_cost(action):
+    """
+    One per cell moved, gives the same optimal answers as the single cell successors
+    """
+    return action[2] if len(action) > 2 else 1
+
+
+def AStar(s, successorsFn, isGoal, h, cost=None, compact=False, early_goal=False, open_list='heap', tie_break=None,
+          budget=None, stats=None):
+    # Runs iterAStar to the end: goal node, None (no solution) or SearchStopped
+    return run_search(iterAStar(s, successorsFn, isGoal, h, cost, compact, early_goal, open_list, tie_break,
+                                budget, stats))
 
-def AStar(s, successorsFn, isGoal, h):
-    # Priority queue: stores (f, counter, node)
-    # counter prevents comparison of nodes when f values are equal
-    Open = []
-    counter = 0 #in the heap, loukan f values ykounou equal, nverifyiw counter to see chkoun ja 1st
+
+def iterAStar(s, successorsFn, isGoal, h, cost=None, compact=False, early_goal=False, open_list='heap',
+              tie_break=None, budget=None, stats=None, every=None):
+    # Generator form of AStar: with every=N it yields a SearchSnapshot each N expanded nodes (expanded,
+    # frontier size, f and depth of the node being expanded, elapsed), the last item is the result of AStar.
+    # search.send(reason) between two snapshots stops it: the next item is SearchStopped(reason, ...)
+    # successorsFn can return a list or be a generator (state.iterSuccessors), it is only iterated
+    # cost(action) -> step cost, None means 1 per action (like before)
+    # compact=True stores the search tree in arrays (SearchTree) instead of one Node per state
+    # early_goal=True tests the goal when a child is generated and stops right away when it is
+    # provably optimal (g <= f of the popped node, which is <= the optimal cost if h is admissible)
+    # open_list: 'heap' (HeapOpenList, any f) or 'bucket' (BucketOpenList, integer f and costs only)
+    # tie_break between equal f: None = default of the open list ('fifo' for the heap, 'high_g' for buckets)
+    # budget: optional Budget (nodes / time / memory / CancelToken), when it runs out the search returns
+    # a SearchStopped (reason, expanded node with the smallest h, SearchStats) instead of a goal node
+    # stats: optional SearchStats filled with the counters of the search (and the time spent in the
+    # successors, h and the open list if stats.timed)
+    start = time.perf_counter()
+    if open_list == 'bucket':
+        Open = BucketOpenList(tie_break or 'high_g')
+    elif open_list == 'heap':
+        Open = HeapOpenList(tie_break or 'fifo')
+    else:
+        raise ValueError(f"Unknown open_list: {open_list}")
+    push, pop = Open.push, Open.pop
+    if stats is not None and stats.timed:
+        successorsFn = lambda state, fn=successorsFn: stats.time_iterator('successors', fn(state))
+        h = stats.time_function('heuristic', h)
+        push = stats.time_function('queue', push)
+        pop = stats.time_function('queue', pop)
     
-    # Track f values for states in Open and Closed
-    Open_dict = {}  # state -> (f, node) as heapq is harder when it comes to updating, searching
-    Closed = {}  # state -> f
+    # Open knows the f of its states (and drops the replaced entries), Closed: state -> f
+    Closed = {}
     
-    init_node = Node(state=s, parent=None, action=None, g=0)
+    new_node = SearchTree(s).Node if compact else Node
+    init_node = new_node(state=s, parent=None, action=None, g=0)
     init_node.f = h(init_node.state)
+    push(init_node, init_node.f)
     
-    heapq.heappush(Open, (init_node.f, counter, init_node)) #list li nhato fiha, what were gonna push
-    Open_dict[init_node.state] = (init_node.f, init_node)#kol ma we push nhato f dict
-    counter += 1
+    if budget is not None:
+        budget.start()
+    expanded = generated = duplicates_open = duplicates_closed = reopened = 0
+    peak_open = peak_closed = 1
+    best = init_node  # closest to the goal according to h, what a stopped search gives back
+    current = init_node
+    goal_node = reason = None
+    next_snapshot = every or -1  # expanded count of the next snapshot (-1: never)
     
     while len(Open) > 0:
-        # Get node with lowest f
-        current_f, _, current = heapq.heappop(Open) #when we pop, we get the tuple (f, counter, node)
+        if budget is not None:
+            reason = budget.check(expanded, current)
+            if reason:
+                break
+        if expanded == next_snapshot:
+            next_snapshot += every
+            reason = yield SearchSnapshot(expanded, len(Open), current.f, current.g, time.perf_counter() - start,
+                                          best)
+            if reason:
+                break
         
-        # Remove from Open_dict
-        if current.state in Open_dict:
-            del Open_dict[current.state]
+        # Get node with lowest f (an entry replaced by a better one is never returned)
+        current = pop()
         
         if isGoal(current.state):
-            return current
+            goal_node = current
+            break
+        
+        if current.f - current.g < best.f - best.g:
+            best = current
         
         Closed[current.state] = current.f
+        expanded += 1
         
         for action, successor in successorsFn(current.state):
-            child = Node(state=successor, parent=current, action=action)
-            child.g = current.g + 1  # c(current, action, successor) = 1
-            child.f = child.g + h(child.state)
+            generated += 1
+            g = current.g + (cost(action) if cost else 1)  # c(current, action, successor)
             
-            # Check if child.state not in Open and not in Closed
-            in_open = child.state in Open_dict
-            in_closed = child.state in Closed
+            if early_goal and g <= current.f and isGoal(successor):
+                goal_node = new_node(state=successor, parent=current, action=action, g=g, f=g)
+                break
+            
+            f = g + h(successor)
+            
+            # Check if successor not in Open and not in Closed
+            # (the node is only created when it goes in Open, duplicates never get a Node / tree entry)
+            in_open = successor in Open
+            in_closed = successor in Closed
             
             if not in_open and not in_closed:
-                heapq.heappush(Open, (child.f, counter, child))
-                Open_dict[child.state] = (child.f, child)
-                counter += 1
+                push(new_node(state=successor, parent=current, action=action, g=g, f=f), f)
             
-            # If in Open with higher f, replace
+            # If in Open with higher f, replace (decrease-key)
             elif in_open:
-                old_f, old_node = Open_dict[child.state]
-                if child.f < old_f:
-                    # Remove old, add new
-                    Open_dict[child.state] = (child.f, child)
-                    heapq.heappush(Open, (child.f, counter, child))
-                    counter += 1
+                duplicates_open += 1
+                if f < Open.f(successor):
+                    push(new_node(state=successor, parent=current, action=action, g=g, f=f), f)
             
             # If in Closed with higher f, reopen
             elif in_closed:
-                old_f = Closed[child.state]
-                if child.f < old_f:
-                    del Closed[child.state]
-                    heapq.heappush(Open, (child.f, counter, child))
-                    Open_dict[child.state] = (child.f, child)
-                    counter += 1
+                duplicates_closed += 1
+                if f < Closed[successor]:
+                    reopened += 1
+                    del Closed[successor]
+                    push(new_node(state=successor, parent=current, action=action, g=g, f=f), f)
+        
+        if goal_node is not None:
+            break
+        if len(Open) > peak_open:
+            peak_open = len(Open)
+        if len(Closed) > peak_closed:
+            peak_closed = len(Closed)
+    
+    if stats is not None or reason:
+        stats = (stats or SearchStats(timed=False)).record(
+            start, goal_node, expanded=expanded, generated=generated, duplicates_open=duplicates_open,
+            duplicates_closed=duplicates_closed, reopened=reopened, peak_open=peak_open,
+            peak_closed=peak_closed)
+    if reason:
+        yield SearchStopped(reason, best, stats)
+    else:
+        yield goal_node
+
+
+def IDAStar(s, successorsFn, isGoal, h, cost=None, table_size=None, replacement='depth', table=None):
+    # Depth-first iterative deepening on f: only the current path is in memory
+    # table_size: optional fixed-size transposition table (slot = hash(state) % table_size), an entry
+    # (state, iteration, g, learned) keeps the smallest g the state was searched with in this iteration
+    # (not expanded again from a bigger g) and a learned lower bound of its distance to the goal
+    # (the smallest f found under it, reused in the next iterations with max(h, learned))
+    # table: a list of None owned by the caller instead (its length is the size), to reuse it for
+    # many puzzles: it is emptied before IDAStar returns, no state of this puzzle stays in it
+    # replacement: 'depth' keeps the entry of this iteration closest to the root (bigger subtree saved),
+    # an entry of an older iteration is always replaced; 'always' overwrites
+    owned = table is not None
+    if not owned and table_size:
+        table = [None] * table_size
+    try:
+        return _ida_search(s, successorsFn, isGoal, h, cost, table, replacement)
+    finally:
+        if owned:
+            table[:] = [None] * len(table)
+
+
+def _ida_search(s, successorsFn, isGoal, h, cost, table, replacement):
+    init_node = Node(state=s, parent=None, action=None, g=0)
+    init_node.f = h(s)
+    if isGoal(s):
+        return init_node
     
-    return None
+    table_size = len(table) if table is not None else 0
+    bound = init_node.f
+    iteration = 0
+    
+    while True:
+        iteration += 1
+        next_bound = None  # smallest f that went over the bound
+        on_path = {s}
+        # frame = [node, children, smallest f found under node (None = nothing yet), table slot]
+        stack = [[init_node, iter(successorsFn(s)), None, None]]
+        
+        while stack:
+            frame = stack[-1]
+            node = frame[0]
+            for action, successor in frame[1]:
+                g = node.g + (cost(action) if cost else 1)
+                f = g + h(successor)
+                
+                slot = entry = None
+                if table is not None:
+                    slot = hash(successor) % table_size
+                    entry = table[slot]
+                    if entry is not None and entry[0] == successor:
+                        f = max(f, g + entry[3])
+                    else:
+                        entry = None
+                
+                if entry is not None and entry[1] == iteration and entry[2] <= g:
+                    skip = True  # transposition: already searched in this iteration from as close to the root
+                else:
+                    skip = f > bound or successor in on_path  # over the bound or cycle
+                if skip:
+                    if f > bound and (next_bound is None or f < next_bound):
+                        next_bound = f
+                    if frame[2] is None or f < frame[2]:
+                        frame[2] = f
+                    continue
+                
+                child = Node(state=successor, parent=node, action=action, g=g, f=f)
+                # g <= bound <= optimal cost, so the first goal found is optimal
+                if isGoal(successor):
+                    return child
+                if table is not None:
+                    # remembered as soon as it is entered, so the transpositions met under it are cut too
+                    if entry is not None:
+                        table[slot] = (successor, iteration, g, entry[3])
+                    elif (table[slot] is None or replacement == 'always' or table[slot][1] != iteration
+                          or g <= table[slot][2]):
+                        table[slot] = (successor, iteration, g, 0)
+                on_path.add(successor)
+                stack.append([child, iter(successorsFn(successor)), None, slot])
+                break
+            else:
+                # all the children are done, go back to the parent
+                stack.pop()
+                on_path.discard(node.state)
+                if frame[2] is not None and stack:
+                    parent = stack[-1]
+                    if parent[2] is None or frame[2] < parent[2]:
+                        parent[2] = frame[2]
+                if frame[3] is not None:
+                    # no goal under node within the bound: its distance is at least frame[2] - g
+                    entry = table[frame[3]]
+                    if frame[2] is not None and entry is not None and entry[0] == node.state:
+                        table[frame[3]] = entry[:3] + (max(frame[2] - node.g, entry[3]),)
+        
+        if next_bound is None:
+            return None  # nothing left over the bound: no solution
+        bound = next_bound
@@ -1,45 +1,106 @@
 from RushHourPuzzle import RushHourPuzzle
 from Node import Node
+from SearchTree import SearchTree
+from Budget import SearchStopped, SearchSnapshot, run_search
+from SearchStats import SearchStats
 from collections import deque
 import time
 
 
-def BFS(s, successorsFn, isGoal):
+def BFS(s, successorsFn, isGoal, compact=False, budget=None, stats=None):
+    # Runs iterBFS to the end: goal node, None (no solution) or SearchStopped
+    return run_search(iterBFS(s, successorsFn, isGoal, compact, budget, stats))
+
+
+def iterBFS(s, successorsFn, isGoal, compact=False, budget=None, stats=None, every=None):
     
+    #Generator form of BFS: with every=N it yields a SearchSnapshot each N expanded nodes
+    #(expanded, frontier size, depth, elapsed), the last item it yields is the result of BFS.
+    #The caller can stop the search between two snapshots with search.send(reason): the next
+    #item is then SearchStopped(reason, ...) like with a Budget (its own deadline, cancel...)
+    #compact=True stores the search tree in arrays (SearchTree) instead of one Node per state
+    #budget: optional Budget (nodes / time / memory / CancelToken), when it runs out the search
+    #returns a SearchStopped (reason, last expanded node, SearchStats) instead of a goal node
+    #stats: optional SearchStats filled with the counters of the search (and the time of the
+    #successor generation if stats.timed)
+    #successorsFn can return a list or be a generator (state.iterSuccessors): the goal is tested
+    #when a child is generated, so with a generator the remaining siblings are never built
     #We use deque for Open since we need FIFO for open list
     #We use set for closed since we need its items to be unique + fast search
 
+    start = time.perf_counter()
+    if stats is not None and stats.timed:
+        successorsFn = lambda state, fn=successorsFn: stats.time_iterator('successors', fn(state))
+
     Open = deque()
     Closed = set()
     
     # We initialise the first node with the state s passée en paramètre
-    init_node = Node(state=s, parent=None, action=None, g=0)
+    new_node = SearchTree(s).Node if compact else Node
+    init_node = new_node(state=s, parent=None, action=None, g=0)
     
     if isGoal(init_node.state):
-        return init_node
+        if stats is not None:
+            stats.record(start, init_node, peak_open=1)
+        yield init_node
+        return
     
     #hna we add the node to, open, and its state to open states
     #Why open states? To make search for if state exists much faster than it would be in deque
     Open.append(init_node)
     Open_states = set([init_node.state]) #set means access direct O(1)
     
+    if budget is not None:
+        budget.start()
+    expanded = generated = duplicates_open = duplicates_closed = 0
+    peak_open = 1
+    current = init_node
+    goal_node = reason = None
+    next_snapshot = every or -1  # expanded count of the next snapshot (-1: never)
+    
     #moving states men open lel closed après parcours
-    while len(Open) > 0:
+    while len(Open) > 0 and goal_node is None:
+        if budget is not None:
+            reason = budget.check(expanded, current)
+            if reason:
+                break
+        if expanded == next_snapshot:
+            next_snapshot += every
+            reason = yield SearchSnapshot(expanded, len(Open), None, current.g, time.perf_counter() - start,
+                                          current)
+            if reason:
+                break
+        expanded += 1
         current = Open.popleft()
         Open_states.remove(current.state)
         Closed.add(current.state)
         
         for action, successor in successorsFn(current.state):
-            child = Node(state=successor, parent=current, action=action, g=current.g + 1)
-            
-            if isGoal(child.state):
-                return child
+            generated += 1
+            if isGoal(successor):
+                goal_node = new_node(state=successor, parent=current, action=action, g=current.g + 1)
+                break
             
-            if child.state not in Closed and child.state not in Open_states:
-                Open.append(child)
-                Open_states.add(child.state)
+            # The node is only created for a new state, duplicates never get a Node / tree entry
+            if successor in Closed:
+                duplicates_closed += 1
+            elif successor in Open_states:
+                duplicates_open += 1
+            else:
+                Open.append(new_node(state=successor, parent=current, action=action, g=current.g + 1))
+                Open_states.add(successor)
+        
+        if len(Open) > peak_open:
+            peak_open = len(Open)
     
-    return None
+    if stats is not None or reason:
+        stats = (stats or SearchStats(timed=False)).record(
+            start, goal_node, expanded=expanded, generated=generated, duplicates_open=duplicates_open,
+            duplicates_closed=duplicates_closed, peak_open=peak_open, peak_closed=len(Closed))
+    if reason:
+        yield SearchStopped(reason, current, stats)
+    else:
+        yield goal_node
 
 #How BFS Works:
 # So in BFS, we initialise  open and closed lists
@@ -0,0 +1,175 @@
+import os
+import sys
+import time
+
+try:
+    import resource  # fallback for the memory used when /proc is not there, not on Windows
+except ImportError:
+    resource = None
+
+
+def memory_used():
+    """
+    Resident memory of this process in bytes (None if it can't be read on this system)
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        # peak and not current memory, in KB on Linux but in bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    return None
+
+
+def reset_peak_memory():
+    """
+    Starts a new peak for peak_memory (Linux only, returns False when the peak can't be reset)
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as fichier:
+            fichier.write('5')  # 5: reset VmHWM, the peak resident memory
+        return True
+    except OSError:
+        return False
+
+
+def peak_memory():
+    """
+    Peak resident memory of this process in bytes since it started or since reset_peak_memory (None if unknown)
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    return None
+
+
+class CancelToken:
+    """
+    Stop flag shared with a running search (another thread sets it, the search reads an attribute)
+    """
+
+    __slots__ = ('cancelled',)
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Budget:
+    """
+    Limits of one search: expanded nodes, seconds, bytes of resident memory (approximate: the whole
+    process is measured) and/or a CancelToken. The search calls start() once then check(expanded, node)
+    for every expanded node: the token and the node count are checked each time, the clock and the
+    memory only every check_every nodes.
+    progress: optional function called every check_every nodes with a dict
+    {'expanded', 'elapsed', 'depth', 'f'} (depth / f of the last expanded node), e.g. to feed a UI
+    """
+
+    def __init__(self, max_expanded=None, max_time=None, max_memory=None, cancel=None, check_every=256,
+                 progress=None):
+        self.max_expanded = max_expanded
+        self.max_time = max_time
+        self.max_memory = max_memory
+        self.cancel = cancel
+        self.check_every = check_every
+        self.progress = progress
+        self.start_time = None
+        self.deadline = None
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        self.deadline = self.start_time + self.max_time if self.max_time is not None else None
+
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def check(self, expanded, node=None):
+        # None while the search can go on, else why it has to stop
+        if self.cancel is not None and self.cancel.cancelled:
+            return 'cancelled'
+        if self.max_expanded is not None and expanded >= self.max_expanded:
+            return 'expanded'
+        if expanded % self.check_every == 0:
+            if self.progress is not None:
+                self.progress({'expanded': expanded, 'elapsed': self.elapsed(),
+                               'depth': node.g if node is not None else None,
+                               'f': node.f if node is not None else None})
+            if self.deadline is not None and time.perf_counter() >= self.deadline:
+                return 'time'
+            if self.max_memory is not None:
+                used = memory_used()
+                if used is not None and used >= self.max_memory:
+                    return 'memory'
+        return None
+
+
+class SearchStopped:
+    """
+    Returned instead of a goal Node when a Budget stopped the search.
+    reason: 'expanded', 'time', 'memory' or 'cancelled'
+    node: best node reached so far (A*: smallest h, BFS: the last expanded, so the deepest)
+    stats: SearchStats of the search when it stopped
+    """
+
+    def __init__(self, reason, node, stats):
+        self.reason = reason
+        self.node = node
+        self.stats = stats
+
+    def __bool__(self):
+        # `if goal_node:` in the callers must not take a stopped search for a solution
+        return False
+
+    def __repr__(self):
+        return f"SearchStopped(reason={self.reason!r}, stats={self.stats!r})"
+
+
+class SearchSnapshot:
+    """
+    Yielded by iterBFS / iterAStar while they search (every `every` expanded nodes):
+    expanded, frontier (size of Open), f (A*: f of the node being expanded, a lower bound of the
+    optimal cost with an admissible h; BFS: None), depth (g of that node), elapsed seconds,
+    node (BFS: last expanded node, A*: the one with the smallest h so far)
+    """
+
+    __slots__ = ('expanded', 'frontier', 'f', 'depth', 'elapsed', 'node')
+
+    def __init__(self, expanded, frontier, f, depth, elapsed, node):
+        self.expanded = expanded
+        self.frontier = frontier
+        self.f = f
+        self.depth = depth
+        self.elapsed = elapsed
+        self.node = node
+
+    def as_dict(self):
+        # same keys as the Budget progress dicts (+ frontier), without the node: can be sent to another process
+        return {'expanded': self.expanded, 'frontier': self.frontier, 'f': self.f, 'depth': self.depth,
+                'elapsed': self.elapsed}
+
+    def __repr__(self):
+        return (f"SearchSnapshot(expanded={self.expanded}, frontier={self.frontier}, f={self.f}, "
+                f"depth={self.depth}, elapsed={self.elapsed:.3f})")
+
+
+def run_search(search):
+    """
+    Runs a search generator (iterBFS / iterAStar) to the end: its last item is the result
+    (goal node, None or SearchStopped)
+    """
+    result = None
+    for result in search:
+        pass
+    return result
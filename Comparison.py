@@ -0,0 +1,132 @@
+from RushHourPuzzle import RushHourPuzzle
+from BFS import iterBFS
+from AStar import iterAStar, h1, h2, h3, cell_cost
+from Budget import SearchStopped, SearchSnapshot, run_search
+from SearchStats import SearchStats
+import multiprocessing
+import queue
+import time
+
+# The algorithms of the comparison: name -> heuristic (None = BFS)
+ALGORITHMS = {'BFS': None, 'A* h1': h1, 'A* h2': h2, 'A* h3': h3}
+SNAPSHOT_EVERY = 256  # expanded nodes between two progress snapshots of a worker
+
+
+class SharedCancelToken:
+    """
+    CancelToken that also works across processes: the flag is a byte of shared memory
+    (reading .cancelled stays an attribute access (Budget.check, the workers), no lock)
+    """
+
+    def __init__(self):
+        self.flag = multiprocessing.Value('b', 0, lock=False)
+
+    @property
+    def cancelled(self):
+        return bool(self.flag.value)
+
+    def cancel(self):
+        self.flag.value = 1
+
+
+def run_algorithm(csv_file, name, slides=False, budget=None, backend='grid', watch=None, timed=False):
+    """
+    One algorithm of the comparison, timed in this process around the search only
+    -> {'moves', 'cost', 'time', 'cpu_time', 'stats', 'actions', 'stopped'} (plain data, sent back by
+    the workers). cpu_time is the CPU time of the search: with more searches than cores the wall
+    time of each one also counts the time the others had the core, its CPU time doesn't.
+    watch(search) -> result: optional, gets the search generator (a SearchSnapshot each SNAPSHOT_EVERY
+    expanded nodes, then the result) instead of running it to the end
+    timed=True also times each phase (SearchStats.timed): the wrappers slow the search down, so
+    the time of a timed run is not the time of the algorithm
+    """
+    puzzle = RushHourPuzzle(csv_file, backend=backend)
+    successors = (lambda state: state.iterSlideSuccessors()) if slides else (lambda state: state.iterSuccessors())
+    stats = SearchStats(timed=timed)
+    heuristic = ALGORITHMS[name]
+    every = SNAPSHOT_EVERY if watch is not None else None
+    start_time = time.perf_counter()
+    start_cpu = time.process_time()
+    if heuristic is None:
+        search = iterBFS(puzzle, successors, lambda state: state.isGoal(), budget=budget, stats=stats, every=every)
+    else:
+        search = iterAStar(puzzle, successors, lambda state: state.isGoal(), heuristic,
+                           cell_cost if slides else None, budget=budget, stats=stats, every=every)
+    goal_node = (watch or run_search)(search)
+    elapsed = time.perf_counter() - start_time
+    cpu_time = time.process_time() - start_cpu
+
+    stopped = goal_node.reason if isinstance(goal_node, SearchStopped) else None
+    solved = bool(goal_node)
+    return {
+        'moves': len(goal_node.getSolution()) if solved else None,
+        'cost': goal_node.g if solved else None,
+        'time': elapsed,
+        'cpu_time': cpu_time,
+        'stats': stats,
+        'actions': goal_node.getSolution() if solved else None,
+        'stopped': stopped,
+    }
+
+
+def _worker(messages, csv_file, name, slides, cancel, time_limit, backend):
+    # one process: the snapshots of the search and its result go to the parent through messages,
+    # the time limit and the cancel token are checked here at each snapshot (no Budget needed)
+    def watch(search):
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        for item in search:
+            if not isinstance(item, SearchSnapshot):
+                return item
+            messages.put(('progress', name, item.as_dict()))
+            if cancel is not None and cancel.cancelled:
+                return search.send('cancelled')
+            if deadline is not None and time.perf_counter() >= deadline:
+                return search.send('time')
+
+    try:
+        result = run_algorithm(csv_file, name, slides, backend=backend, watch=watch)
+    except Exception as error:
+        result = {'error': f"{type(error).__name__}: {error}"}
+    messages.put(('result', name, result))
+
+
+def compare_concurrently(csv_file, names=None, slides=False, cancel=None, time_limit=None, progress=None,
+                         backend='grid'):
+    """
+    Starts one process per algorithm and yields (name, result of run_algorithm) as they finish,
+    so the wall time is about the one of the slowest algorithm.
+    cancel: optional SharedCancelToken (stops every search), time_limit: seconds per search
+    progress(name, snapshot): optional, called in this process with the snapshots of the workers
+    (SearchSnapshot.as_dict())
+    """
+    names = list(ALGORITHMS if names is None else names)
+    messages = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_worker, daemon=True,
+                                         args=(messages, csv_file, name, slides, cancel, time_limit, backend))
+                 for name in names]
+    for process in processes:
+        process.start()
+    try:
+        remaining = len(names)
+        while remaining:
+            try:
+                kind, name, data = messages.get(timeout=0.1)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes) and messages.empty():
+                    break  # a worker died without sending its result
+                continue
+            if kind == 'progress':
+                if progress is not None:
+                    progress(name, data)
+            else:
+                remaining -= 1
+                yield name, data
+    finally:
+        # closed early (BACK in the UI, Ctrl-C): the searches give up at their next expansion
+        # if there is a token, else they are killed
+        if remaining and cancel is not None:
+            cancel.cancel()
+        for process in processes:
+            process.join(timeout=5 if cancel is not None or not remaining else 0)
+            if process.is_alive():
+                process.terminate()
@@ -0,0 +1,169 @@
+from Node import Node
+from array import array
+from bisect import bisect_left
+import hashlib
+import mmap
+import struct
+
+# File: header, then the sorted keys (uint64) and the distances (uint16), native byte order
+MAGIC = b'RHDIST1\0'
+HEADER = struct.Struct('=8sHHI16sQ')  # magic, version, slides, padding, layout digest, count
+VERSION = 1
+UNSOLVABLE = 0xFFFF  # state of the component from which no goal can be reached
+
+
+class ComponentTooLarge(ValueError):
+    """
+    Raised by DistanceTable.build(max_states=...): states = how many were found before giving up
+    (a lower bound of the size of the component)
+    """
+
+    def __init__(self, message, states):
+        ValueError.__init__(self, message)
+        self.states = states
+
+
+def layout_digest(layout):
+    # Stable between processes (hash() of strings is not)
+    return hashlib.blake2b(repr(layout.key()).encode(), digest_size=16).digest()
+
+
+class DistanceTable:
+    """
+    Exact distance-to-goal of every state of the component of a puzzle (all the states reachable
+    from it). Built once with a BFS backwards from all goal states (moves are reversible),
+    then any position of the same layout is solved by a lookup + greedy descent.
+    A state is stored as one integer key (mixed radix encoding of its positions) in a sorted array.
+    """
+
+    def __init__(self, layout, keys, distances, slides=False):
+        self.layout = layout
+        self.keys = keys            # sorted array('Q') or memoryview on the mmapped file
+        self.distances = distances  # array('H') (or memoryview) in the same order
+        self.slides = slides
+        self.radix = [len(spans) for spans in layout.span_masks]
+        self._mmap = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def encode(self, pos):
+        key = 0
+        for p, radix in zip(pos, self.radix):
+            key = key * radix + p
+        return key
+
+    def decode(self, key):
+        # positions tuple of a key (inverse of encode)
+        pos = []
+        for radix in reversed(self.radix):
+            key, p = divmod(key, radix)
+            pos.append(p)
+        return tuple(reversed(pos))
+
+    def successors(self, state):
+        if self.slides:
+            return state.iterSlideSuccessors()
+        return state.iterSuccessors()
+
+    @classmethod
+    def build(cls, state, slides=False, max_states=None):
+        """
+        Enumerates the whole component of state, then runs a multi-source BFS from its goal states.
+        max_states: raises ComponentTooLarge when the component has more states (checked after each level)
+        """
+        table = cls(state.layout, array('Q'), array('H'), slides)
+        size = 1
+        for radix in table.radix:
+            size *= radix
+        if size > 1 << 64:
+            raise ComponentTooLarge("Too many vehicle positions to encode a state on 64 bits", 1)
+
+        # 1. every state reachable from state
+        component = {state}
+        frontier = [state]
+        while frontier:
+            next_frontier = []
+            for current in frontier:
+                for _, child in table.successors(current):
+                    if child not in component:
+                        component.add(child)
+                        next_frontier.append(child)
+            frontier = next_frontier
+            if max_states is not None and len(component) > max_states:
+                raise ComponentTooLarge(f"More than {max_states} states reachable", len(component))
+
+        # 2. backwards from the goals, a move undone is a move too so the successors are the predecessors
+        distance = {s: 0 for s in component if s.isGoal()}
+        frontier = list(distance)
+        d = 0
+        while frontier:
+            d += 1
+            next_frontier = []
+            for current in frontier:
+                for _, child in table.successors(current):
+                    if child not in distance:
+                        distance[child] = d
+                        next_frontier.append(child)
+            frontier = next_frontier
+        if d > UNSOLVABLE:
+            raise ValueError("Distances do not fit on 16 bits")
+
+        entries = sorted((table.encode(s.pos), distance.get(s, UNSOLVABLE)) for s in component)
+        table.keys = array('Q', [key for key, _ in entries])
+        table.distances = array('H', [dist for _, dist in entries])
+        return table
+
+    def distance(self, state):
+        """
+        Number of moves to the goal, None if the state is not in the component or can't be solved
+        """
+        key = self.encode(state.pos)
+        i = bisect_left(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key or self.distances[i] == UNSOLVABLE:
+            return None
+        return self.distances[i]
+
+    def solve(self, state):
+        """
+        Optimal solution from state as a Node (like BFS / AStar), None if there is none
+        """
+        d = self.distance(state)
+        if d is None:
+            return None
+        node = Node(state=state, parent=None, action=None, g=0)
+        while d > 0:
+            # greedy descent: any successor one move closer to the goal
+            for action, child in self.successors(node.state):
+                if self.distance(child) == d - 1:
+                    node = Node(state=child, parent=node, action=action, g=node.g + 1)
+                    break
+            d -= 1
+        return node
+
+    def save(self, path):
+        with open(path, 'wb') as fichier:
+            fichier.write(HEADER.pack(MAGIC, VERSION, self.slides, 0, layout_digest(self.layout), len(self.keys)))
+            array('Q', self.keys).tofile(fichier)
+            array('H', self.distances).tofile(fichier)
+
+    @classmethod
+    def load(cls, path, layout):
+        """
+        Memory-maps a table saved with save(), nothing is read until a lookup touches it
+        """
+        with open(path, 'rb') as fichier:
+            mm = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, slides, _, digest, count = HEADER.unpack_from(mm)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a distance table (version {VERSION})")
+        if digest != layout_digest(layout):
+            raise ValueError(f"{path} was built for another puzzle layout")
+
+        view = memoryview(mm)
+        start = HEADER.size
+        keys = view[start:start + 8 * count].cast('Q')
+        distances = view[start + 8 * count:start + 10 * count].cast('H')
+        table = cls(layout, keys, distances, bool(slides))
+        table._mmap = mm
+        return table
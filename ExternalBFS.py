@@ -0,0 +1,164 @@
+from PackedState import PackedState
+from ParallelBFS import key_weights, decode, replay
+from array import array
+from bisect import bisect_left
+import heapq
+import mmap
+import os
+import shutil
+import tempfile
+
+
+class _Layer:
+    """
+    Sorted uint64 keys of one file, memory-mapped (only the pages that are read get loaded)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._mmap = None
+        self.keys = ()
+        if os.path.getsize(path):
+            with open(path, 'rb') as fichier:
+                self._mmap = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+            self.keys = memoryview(self._mmap).cast('Q')
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __iter__(self):
+        return iter(self.keys)
+
+    def __contains__(self, key):
+        i = bisect_left(self.keys, key)
+        return i < len(self.keys) and self.keys[i] == key
+
+    def close(self):
+        if self._mmap is not None:
+            self.keys.release()
+            self._mmap.close()
+            self._mmap = None
+
+
+def _write_sorted(path, keys, buffer_size):
+    # keys: sorted iterable, written by blocks of buffer_size
+    block = array('Q')
+    with open(path, 'wb') as fichier:
+        for key in keys:
+            block.append(key)
+            if len(block) >= buffer_size:
+                block.tofile(fichier)
+                block = array('Q')
+        block.tofile(fichier)
+
+
+def _unique(keys):
+    last = None
+    for key in keys:
+        if key != last:
+            yield key
+            last = key
+
+
+def _subtract(keys, layer):
+    # sorted keys minus the sorted keys of layer, streaming (one pass on both)
+    other = iter(layer)
+    current = next(other, None)
+    for key in keys:
+        while current is not None and current < key:
+            current = next(other, None)
+        if key != current:
+            yield key
+
+
+def ExternalBFS(s, slides=False, work_dir=None, buffer_size=1 << 20, keep_files=False):
+    # BFS for the state spaces that don't fit in RAM: each depth is a file of sorted uint64 keys
+    # (mixed radix of the positions). The children of a layer are sorted by blocks of buffer_size keys
+    # (written as runs), merged, and the keys already in the layer or the one before are removed:
+    # every move can be undone, so a child of depth d is at depth d-1, d or d+1 and nothing older
+    # is needed. Only the buffer and the parent links of the solution are in memory.
+    # The path is found backwards at the end: a parent of a state of depth d is any of its
+    # neighbours (moves are reversible) found in the file of depth d-1.
+    # work_dir: where the layer files go (default: a temporary directory, removed at the end)
+    if s.isGoal():
+        return replay(s, [])
+
+    layout = s.layout
+    weights = key_weights(layout)
+    if sum((len(spans) - 1) * w for spans, w in zip(layout.span_masks, weights)) >= 1 << 64:
+        raise ValueError("Too many vehicle positions to encode a state on 64 bits")
+
+    def neighbours(key):
+        state = PackedState(layout, decode(key, layout))
+        successors = state.iterSlideSuccessors() if slides else state.iterSuccessors()
+        for action, child in successors:
+            i = layout.index[action[0]]
+            yield action, key + (child.pos[i] - state.pos[i]) * weights[i], child
+
+    directory = tempfile.mkdtemp(prefix='rushhour-bfs-', dir=work_dir)
+    layer_path = lambda depth: os.path.join(directory, f"layer-{depth}.bin")
+    root = sum(p * w for p, w in zip(s.pos, weights))
+    _write_sorted(layer_path(0), [root], buffer_size)
+    layers = [_Layer(layer_path(0))]
+    goal = None
+
+    try:
+        # Forward: one layer file per depth until a goal is generated
+        while goal is None and len(layers[-1]):
+            depth = len(layers)
+            runs = []
+            buffer = array('Q')
+            for key in layers[-1]:
+                for _, child_key, child in neighbours(key):
+                    if child.isGoal():
+                        goal = child_key
+                        break
+                    buffer.append(child_key)
+                    if len(buffer) >= buffer_size:
+                        runs.append(_spill(directory, depth, len(runs), buffer, buffer_size))
+                        buffer = array('Q')
+                if goal is not None:
+                    break
+            if goal is not None:
+                for run in runs:
+                    run.close()
+                break
+            runs.append(_spill(directory, depth, len(runs), buffer, buffer_size))
+
+            keys = _unique(heapq.merge(*runs))
+            for previous in layers[-2:]:
+                keys = _subtract(keys, previous)
+            _write_sorted(layer_path(depth), keys, buffer_size)
+            for run in runs:
+                run.close()
+                os.remove(run.path)
+            layers.append(_Layer(layer_path(depth)))
+
+        if goal is None:
+            return None
+
+        # Backward: from the goal (depth = len(layers)) down to the root, one parent per layer
+        actions = []
+        key = goal
+        for layer in reversed(layers):
+            for action, parent_key, _ in neighbours(key):
+                if parent_key in layer:
+                    break
+            # the move parent -> key is the one of the parent's successors that lands on key
+            for action, child_key, _ in neighbours(parent_key):
+                if child_key == key:
+                    actions.append(action)
+                    break
+            key = parent_key
+        return replay(s, reversed(actions))
+    finally:
+        for layer in layers:
+            layer.close()
+        if not keep_files:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+def _spill(directory, depth, number, buffer, buffer_size):
+    path = os.path.join(directory, f"run-{depth}-{number}.bin")
+    _write_sorted(path, _unique(sorted(buffer)), buffer_size)
+    return _Layer(path)
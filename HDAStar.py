@@ -0,0 +1,236 @@
+from PackedState import PackedState
+from Node import Node
+from ParallelBFS import key_weights, decode, replay
+import heapq
+import multiprocessing
+import os
+import queue
+import time
+
+NO_SOLUTION = 2 ** 62  # value of the shared upper bound while no goal is known
+
+
+class _Worker:
+    """
+    One HDA* process: owns Open / Closed of the states with hash(state) % workers == number.
+    best[key] = (g, parent key, action) is Open + Closed + the parent links of its states.
+    """
+
+    def __init__(self, number, layout, h, cost, slides, batch_size, inboxes, results, bound, idle, sent, received):
+        self.number = number
+        self.layout = layout
+        self.weights = key_weights(layout)
+        self.h = h
+        self.cost = cost
+        self.slides = slides
+        self.batch_size = batch_size
+        self.inboxes = inboxes
+        self.results = results
+        self.bound = bound  # cost of the best goal found by any worker (shared)
+        self.idle = idle
+        self.sent = sent
+        self.received = received
+        self.open = []  # (f, -g, counter, key, g, state)
+        self.counter = 0
+        self.best = {}
+        self.expanded = set()
+        self.outboxes = [[] for _ in inboxes]
+
+    def run(self):
+        while True:
+            # 1. messages: wait for them only when there is nothing left to expand
+            if self.idle[self.number] or not self._expandable():
+                self._flush()
+                self.idle[self.number] = 1
+                try:
+                    message = self.inboxes[self.number].get(timeout=0.05)
+                except queue.Empty:
+                    continue
+            else:
+                try:
+                    message = self.inboxes[self.number].get_nowait()
+                except queue.Empty:
+                    message = None
+            while message is not None:
+                if message[0] == 'stop':
+                    return
+                self._handle(message)
+                try:
+                    message = self.inboxes[self.number].get_nowait()
+                except queue.Empty:
+                    message = None
+
+            # 2. a slice of expansions, then the children go to their owners
+            for _ in range(self.batch_size):
+                if not self._expandable():
+                    break
+                self._expand(heapq.heappop(self.open))
+            self._flush()
+
+    def _handle(self, message):
+        if message[0] == 'nodes':
+            self.idle[self.number] = 0
+            self.received[self.number] += 1
+            for key, g, parent, action in message[1]:
+                self._receive(key, g, parent, action, None)
+        elif message[0] == 'trace':
+            key = message[1]
+            self.results.put(('parent', key) + self.best[key][1:])
+
+    def _expandable(self):
+        # drops the stale entries and the ones that can't beat the best goal
+        while self.open:
+            f, _, _, key, g, _ = self.open[0]
+            if f < self.bound.value and key not in self.expanded and self.best[key][0] == g:
+                return True
+            heapq.heappop(self.open)
+        return False
+
+    def _receive(self, key, g, parent, action, state):
+        old = self.best.get(key)
+        if old is not None and old[0] <= g:
+            return  # duplicate (in Open or Closed with a g as good)
+        if state is None:
+            state = PackedState(self.layout, decode(key, self.layout))
+        f = g + self.h(state)
+        if f >= self.bound.value:
+            return
+        self.best[key] = (g, parent, action)
+        self.expanded.discard(key)  # reopened if it was expanded with a bigger g
+        if state.isGoal():
+            with self.bound.get_lock():
+                if g < self.bound.value:
+                    self.bound.value = g
+                    self.results.put(('goal', key, g))
+            return
+        heapq.heappush(self.open, (f, -g, self.counter, key, g, state))
+        self.counter += 1
+
+    def _expand(self, entry):
+        _, _, _, key, g, state = entry
+        self.expanded.add(key)
+        pos = state.pos
+        index = self.layout.index
+        workers = len(self.inboxes)
+        successors = state.iterSlideSuccessors() if self.slides else state.iterSuccessors()
+        for action, child in successors:
+            i = index[action[0]]
+            child_key = key + (child.pos[i] - pos[i]) * self.weights[i]
+            child_g = g + (self.cost(action) if self.cost else 1)
+            owner = hash(child) % workers
+            if owner == self.number:
+                self._receive(child_key, child_g, key, action, child)
+            else:
+                outbox = self.outboxes[owner]
+                outbox.append((child_key, child_g, key, action))
+                if len(outbox) >= self.batch_size:
+                    self._send(owner)
+
+    def _send(self, owner):
+        # counted before the put, so a batch in flight always shows as sent > received
+        self.sent[self.number] += 1
+        self.inboxes[owner].put(('nodes', self.outboxes[owner]))
+        self.outboxes[owner] = []
+
+    def _flush(self):
+        for owner, outbox in enumerate(self.outboxes):
+            if outbox:
+                self._send(owner)
+
+
+def _run_worker(*args):
+    _Worker(*args).run()
+
+
+def _snapshot(idle, sent, received):
+    return all(idle), tuple(sent), tuple(received)
+
+
+def _check_workers(processes):
+    # a worker only stops when it is told to: one that exited has crashed (exception in h, killed...)
+    # and the others would wait for its messages forever
+    for number, process in enumerate(processes):
+        if not process.is_alive():
+            raise RuntimeError(f"HDA* worker {number} exited early (exit code {process.exitcode})")
+
+
+def _get_result(results, processes):
+    # results.get() that gives up when a worker died instead of waiting forever
+    while True:
+        try:
+            return results.get(timeout=0.1)
+        except queue.Empty:
+            _check_workers(processes)
+
+
+def HDAStar(s, h, cost=None, workers=None, slides=False, batch_size=64):
+    # Hash-distributed A*: worker number k owns the states with hash(state) % workers == k (the
+    # Zobrist keys are seeded so every process computes the same hash). Children are sent in batches
+    # to their owner over its queue. h must be a module level function (h1, h2, h3... from AStar.py)
+    # and cost None (1 per action) or one like cell_cost, the goal test is state.isGoal().
+    # Optimality: the cost of the best goal found is a shared bound, nodes with f >= bound are dropped,
+    # so when every worker is idle and no batch is in flight the bound is the optimal cost.
+    # Termination: all idle and sent == received, twice in a row with the same counters.
+    # Returns a Node path like AStar (rebuilt by asking each owner for the parent of its state).
+    # Raises RuntimeError if a worker process dies during the search.
+    if s.isGoal():
+        return Node(state=s, parent=None, action=None, g=0)
+
+    workers = workers or os.cpu_count() or 1
+    layout = s.layout
+    inboxes = [multiprocessing.Queue() for _ in range(workers)]
+    results = multiprocessing.Queue()
+    bound = multiprocessing.Value('q', NO_SOLUTION)
+    idle = multiprocessing.Array('b', workers, lock=False)
+    sent = multiprocessing.Array('q', workers + 1, lock=False)  # last one: the root sent by this process
+    received = multiprocessing.Array('q', workers + 1, lock=False)
+    processes = [multiprocessing.Process(target=_run_worker, daemon=True,
+                                         args=(k, layout, h, cost, slides, batch_size, inboxes, results,
+                                               bound, idle, sent, received))
+                 for k in range(workers)]
+    for process in processes:
+        process.start()
+
+    try:
+        root = sum(p * w for p, w in zip(s.pos, key_weights(layout)))
+        sent[workers] = 1
+        inboxes[hash(s) % workers].put(('nodes', [(root, 0, None, None)]))
+
+        previous = None
+        while True:
+            time.sleep(0.01)
+            _check_workers(processes)
+            current = _snapshot(idle, sent, received)
+            if current[0] and sum(current[1]) == sum(current[2]) and current == previous:
+                break
+            previous = current
+
+        if bound.value == NO_SOLUTION:
+            return None
+        # the message of the best goal was put before its worker went idle, it is on its way
+        while True:
+            message = _get_result(results, processes)
+            if message[0] == 'goal' and message[2] == bound.value:
+                goal = message[1]
+                break
+
+        actions = []
+        while True:
+            owner = hash(PackedState(layout, decode(goal, layout))) % workers
+            inboxes[owner].put(('trace', goal))
+            message = _get_result(results, processes)
+            while message[0] != 'parent' or message[1] != goal:
+                message = _get_result(results, processes)
+            _, _, parent, action = message
+            if parent is None:
+                break
+            actions.append(action)
+            goal = parent
+        return replay(s, reversed(actions), cost)
+    finally:
+        for inbox in inboxes:
+            inbox.put(('stop',))
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
@@ -1,7 +1,11 @@
 from RushHourPuzzle import RushHourPuzzle
+from PathView import PathView
 
 class Node:
 
+    # __slots__: no __dict__ per node, a search creates a lot of them
+    __slots__ = ('state', 'parent', 'action', 'g', 'f')
+
     def __init__(self, state, parent=None, action=None, g=0, f=0):
         self.state = state #instance of the rush hour puzzle                 
         self.parent = parent #state board li 9blo (la vache qui rit xD) 
@@ -22,12 +26,24 @@ class Node:
         path.reverse()
         return path
 
+    def getPathView(self):
+        # Same states as getPath but made on demand from the initial state and the actions (PathView)
+        node = self
+        while node.parent is not None:
+            node = node.parent
+        return PathView(node.state, self.getSolution())
+
 
-    def getSolution(self):#seqence d'actions pour arriver au but
+    def getSolution(self, expand=False):#seqence d'actions pour arriver au but
+        # expand=True turns the slides (id, dir, k) into k single cell actions (id, dir)
         actions = []
         node = self
         while node.parent is not None:
-            actions.append(node.action)
+            action = node.action
+            if expand and len(action) > 2:
+                actions.extend([action[:2]] * action[2])
+            else:
+                actions.append(action)
             node = node.parent
         actions.reverse()
         return actions
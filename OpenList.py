@@ -0,0 +1,118 @@
+import heapq
+
+
+class HeapOpenList:
+    """
+    Open list of AStar on a binary heap of (f, tie, counter, node) + a dict state -> (f, node).
+    An update only pushes the better copy, the old heap entry becomes stale and is skipped when popped.
+    tie_break: 'fifo' (oldest first, like before), 'high_g' or 'low_g' between equal f
+    """
+
+    def __init__(self, tie_break='fifo'):
+        if tie_break not in ('fifo', 'high_g', 'low_g'):
+            raise ValueError(f"Unknown tie_break: {tie_break}")
+        self.heap = []
+        self.entries = {}
+        self.counter = 0  # in the heap, loukan f values ykounou equal, nverifyiw counter to see chkoun ja 1st
+        self.tie_break = tie_break
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, state):
+        return state in self.entries
+
+    def f(self, state):
+        return self.entries[state][0]
+
+    def push(self, node, f):
+        # insert, or replace the node of a state already in Open (decrease-key)
+        if self.tie_break == 'high_g':
+            tie = -node.g
+        elif self.tie_break == 'low_g':
+            tie = node.g
+        else:
+            tie = 0
+        self.entries[node.state] = (f, node)
+        heapq.heappush(self.heap, (f, tie, self.counter, node))
+        self.counter += 1
+
+    def pop(self):
+        while True:
+            _, _, _, node = heapq.heappop(self.heap)
+            entry = self.entries.get(node.state)
+            if entry is not None and entry[1] is node:
+                del self.entries[node.state]
+                return node
+            # stale: a better copy of this state was pushed after it
+
+
+class BucketOpenList:
+    """
+    Open list of AStar for small integer f: buckets[f][g] = {state: node} with a pointer on the
+    smallest non empty f and, in each f, a pointer on the best g (largest or smallest, see tie_break),
+    so push / pop are O(1) amortized and decrease-key really moves the entry (nothing stale).
+    tie_break: 'high_g' (deepest first, usually reaches the goal sooner) or 'low_g' between equal f,
+    last in first out between equal f and g
+    """
+
+    def __init__(self, tie_break='high_g'):
+        if tie_break not in ('high_g', 'low_g'):
+            raise ValueError(f"Unknown tie_break for buckets: {tie_break}")
+        self.buckets = []
+        self.sizes = []  # number of states in each f
+        self.best_g = []  # each f: no non empty g beyond it in the tie_break order, moves like min_f
+        self.where = {}  # state -> (f, g) of its entry
+        self.min_f = 0
+        self.high_g = tie_break == 'high_g'
+
+    def __len__(self):
+        return len(self.where)
+
+    def __contains__(self, state):
+        return state in self.where
+
+    def f(self, state):
+        return self.where[state][0]
+
+    def push(self, node, f):
+        state, g = node.state, node.g
+        if state in self.where:
+            self._remove(state)
+        while len(self.buckets) <= f:
+            self.buckets.append([])
+            self.sizes.append(0)
+            self.best_g.append(0)
+        bucket = self.buckets[f]
+        while len(bucket) <= g:
+            bucket.append({})
+        bucket[g][state] = node
+        self.where[state] = (f, g)
+        if not self.sizes[f] or (g > self.best_g[f] if self.high_g else g < self.best_g[f]):
+            self.best_g[f] = g
+        self.sizes[f] += 1
+        if f < self.min_f:
+            self.min_f = f
+
+    def _remove(self, state):
+        # the pointers stay, pop skips the empty f and g
+        f, g = self.where.pop(state)
+        del self.buckets[f][g][state]
+        self.sizes[f] -= 1
+
+    def pop(self):
+        if not self.where:
+            raise IndexError("pop from an empty open list")
+        while not self.sizes[self.min_f]:
+            self.min_f += 1
+        f = self.min_f
+        bucket = self.buckets[f]
+        step = -1 if self.high_g else 1
+        g = self.best_g[f]
+        while not bucket[g]:
+            g += step
+        self.best_g[f] = g
+        state, node = bucket[g].popitem()
+        self.sizes[f] -= 1
+        del self.where[state]
+        return node
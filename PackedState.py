@@ -0,0 +1,283 @@
+import random
+
+_BOARD_MASKS = {}
+ZOBRIST_SEED = 20240611  # fixed so every process gets the same hashes for the same puzzle
+# Version of the moves (iterSuccessors / iterSlideSuccessors: which moves and in what order),
+# bump it when they change: the solutions saved by SolutionCache are only valid for one version
+SUCCESSOR_VERSION = 1
+
+
+def board_masks(board_height, board_width):
+    """
+    Row and column bitboards of a board size (bit index = y * board_width + x), computed once per size
+    """
+    key = (board_height, board_width)
+    if key not in _BOARD_MASKS:
+        row = (1 << board_width) - 1
+        col = 0
+        for y in range(board_height):
+            col |= 1 << (y * board_width)
+        _BOARD_MASKS[key] = ([row << (y * board_width) for y in range(board_height)],
+                             [col << x for x in range(board_width)])
+    return _BOARD_MASKS[key]
+
+
+class PuzzleLayout:
+    """
+    Static part of a puzzle: board size, walls and the vehicles (id, orientation, length).
+    It is built once per puzzle and shared by every state generated during the search.
+    """
+
+    def __init__(self, board_height, board_width, vehicles, walls, backend='grid'):
+        # vehicles: list of (id, orientation, length, fixed)
+        # fixed = the row of an horizontal vehicle or the column of a vertical one,
+        # since a vehicle never leaves its line, only the other coordinate is stored in the state
+        self.board_height = board_height
+        self.board_width = board_width
+        self.walls = tuple(walls)
+        self.backend = backend  # 'grid' (list of cells) or 'bitboard' (one int, one bit per cell)
+
+        self.ids = tuple(v[0] for v in vehicles)
+        self.orientations = tuple(v[1] for v in vehicles)
+        self.lengths = tuple(v[2] for v in vehicles)
+        self.fixed = tuple(v[3] for v in vehicles)
+        self.index = {vid: i for i, vid in enumerate(self.ids)}
+
+        # Flat grid (row by row) with only the walls painted, copied then filled by each state
+        self.wall_grid = [' '] * (board_height * board_width)
+        for (x, y) in self.walls:
+            self.wall_grid[y * board_width + x] = '#'
+
+        # For each vehicle: (first cell index of its line, step between cells, limit, back, forward)
+        self.axes = []
+        for orientation, fixed in zip(self.orientations, self.fixed):
+            if orientation == 'H':
+                self.axes.append((fixed * board_width, 1, board_width, 'L', 'R'))
+            else:
+                self.axes.append((fixed, board_width, board_height, 'U', 'D'))
+
+        # Bitboards: the walls, and for each vehicle the cells it covers at every position p
+        # (span_masks) and the single cell it enters when it moves back / forward from p
+        self.row_masks, self.col_masks = board_masks(board_height, board_width)
+        self.wall_mask = 0
+        for (x, y) in self.walls:
+            self.wall_mask |= 1 << (y * board_width + x)
+
+        self.span_masks = []
+        self.back_masks = []
+        self.forward_masks = []
+        for (base, step, limit, _, _), orientation, fixed, length in zip(
+                self.axes, self.orientations, self.fixed, self.lengths):
+            # A window of length * step bits cut by the row/column mask gives the cells of the vehicle
+            lane = self.row_masks[fixed] if orientation == 'H' else self.col_masks[fixed]
+            window = (1 << (length * step)) - 1
+            positions = range(limit - length + 1)
+            self.span_masks.append([lane & (window << (base + p * step)) for p in positions])
+            self.back_masks.append([1 << (base + (p - 1) * step) if p > 0 else 0 for p in positions])
+            self.forward_masks.append([1 << (base + (p + length) * step) if p + length < limit else 0
+                                       for p in positions])
+
+        # Zobrist keys: one random 64 bits number per (vehicle, position)
+        # hash(state) = XOR of the keys of its positions, updated with 2 XOR when a vehicle moves
+        rng = random.Random(ZOBRIST_SEED)
+        self.zobrist = [[rng.getrandbits(64) for _ in spans] for spans in self.span_masks]
+
+        # Goal: X reaches (board_width - 2, board_height // 2 - 1)
+        # goal_pos is the value its moving coordinate must have, None if X can never get there
+        self.goal_x = board_width - 2
+        self.goal_y = board_height // 2 - 1
+        self.target = self.index.get("X")
+        self.goal_pos = None
+        if self.target is not None:
+            if self.orientations[self.target] == 'H' and self.fixed[self.target] == self.goal_y:
+                self.goal_pos = self.goal_x
+            elif self.orientations[self.target] == 'V' and self.fixed[self.target] == self.goal_x:
+                self.goal_pos = self.goal_y
+
+    def key(self):
+        return (self.board_height, self.board_width, self.walls,
+                self.ids, self.orientations, self.lengths, self.fixed)
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        return isinstance(other, PuzzleLayout) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def coords(self, i, p):
+        # (x, y) of vehicle i when its moving coordinate is p
+        if self.orientations[i] == 'H':
+            return p, self.fixed[i]
+        return self.fixed[i], p
+
+
+class PackedState:
+    """
+    A state is only the tuple of the moving coordinate of each vehicle (x for 'H', y for 'V'),
+    in the same order as layout.ids. Everything else lives in the shared PuzzleLayout.
+    """
+
+    __slots__ = ('layout', 'pos', '_occ', '_hash')
+
+    def __init__(self, layout, pos):
+        self.layout = layout
+        self.pos = tuple(pos)
+        self._occ = None
+        self._hash = None
+
+    def _moved(self, i, q, occ=None):
+        # Child where vehicle i is at q. No copy and no __init__: the child shares the layout,
+        # the tuple is new and the Zobrist hash (and the bitboard if given) are updated by XOR
+        layout = self.layout
+        pos = self.pos
+        p = pos[i]
+        keys = layout.zobrist[i]
+        child = object.__new__(self.__class__)
+        child.layout = layout
+        child.pos = pos[:i] + (q,) + pos[i + 1:]
+        child._hash = (self._hash if self._hash is not None else self.__hash__()) ^ keys[p] ^ keys[q]
+        if occ is None:
+            child._occ = None
+        else:
+            spans = layout.span_masks[i]
+            child._occ = occ ^ spans[p] ^ spans[q]
+        return child
+
+    def applyAction(self, action):
+        # Replays an action (id, direction) or (id, direction, k), returns None if it leaves the board
+        layout = self.layout
+        i = layout.index.get(action[0])
+        if i is None:
+            return None
+        _, _, _, back, forward = layout.axes[i]
+        distance = action[2] if len(action) > 2 else 1
+        if action[1] == back:
+            q = self.pos[i] - distance
+        elif action[1] == forward:
+            q = self.pos[i] + distance
+        else:
+            return None  # a vehicle can't leave its line
+        if not 0 <= q < len(layout.span_masks[i]):
+            return None  # out of the board
+        return self._moved(i, q)
+
+    def occupancy(self):
+        # Bitboard of every non empty cell (walls + vehicles), cached on the state
+        if self._occ is None:
+            layout = self.layout
+            occ = layout.wall_mask
+            for spans, p in zip(layout.span_masks, self.pos):
+                occ |= spans[p]
+            self._occ = occ
+        return self._occ
+
+    def grid(self):
+        # Flat board: ' ' empty, '#' wall, or the id of the vehicle on the cell
+        layout = self.layout
+        grid = layout.wall_grid[:]
+        for vid, (base, step, _, _, _), length, p in zip(layout.ids, layout.axes, layout.lengths, self.pos):
+            start = base + p * step
+            for k in range(length):
+                grid[start + k * step] = vid
+        return grid
+
+    def row(self, y):
+        # Only one line of the board (what the heuristics look at), cheaper than grid()
+        layout = self.layout
+        width = layout.board_width
+        row = layout.wall_grid[y * width:(y + 1) * width]
+        for vid, orientation, length, fixed, p in zip(layout.ids, layout.orientations, layout.lengths,
+                                                      layout.fixed, self.pos):
+            if orientation == 'H':
+                if fixed == y:
+                    row[p:p + length] = [vid] * length
+            elif p <= y < p + length:
+                row[fixed] = vid
+        return row
+
+    def isGoal(self):
+        layout = self.layout
+        return layout.goal_pos is not None and self.pos[layout.target] == layout.goal_pos
+
+    def successorFunction(self):
+        # Same order as before: vehicles in file order, then L/R or U/D
+        return list(self.iterSuccessors())
+
+    def slideSuccessorFunction(self):
+        return list(self.iterSlideSuccessors())
+
+    def iterSuccessors(self):
+        # Lazy version: children are only built when the search asks for them,
+        # so a search that stops on a goal child never builds the remaining siblings
+        layout = self.layout
+        pos = self.pos
+
+        if layout.backend == 'bitboard':
+            # Collision = one AND with the entered cell, child occupancy = parent XOR old span XOR new span
+            occ = self.occupancy()
+            for i, (vid, (_, _, _, back, forward)) in enumerate(zip(layout.ids, layout.axes)):
+                p = pos[i]
+                enter = layout.back_masks[i][p]
+                if enter and not occ & enter:
+                    yield (vid, back), self._moved(i, p - 1, occ)
+                enter = layout.forward_masks[i][p]
+                if enter and not occ & enter:
+                    yield (vid, forward), self._moved(i, p + 1, occ)
+            return
+
+        grid = self.grid()
+        for i, (vid, (base, step, limit, back, forward), length) in enumerate(
+                zip(layout.ids, layout.axes, layout.lengths)):
+            p = pos[i]
+            if p > 0 and grid[base + (p - 1) * step] == ' ':
+                yield (vid, back), self._moved(i, p - 1)
+            if p + length < limit and grid[base + (p + length) * step] == ' ':
+                yield (vid, forward), self._moved(i, p + 1)
+
+    def iterSlideSuccessors(self):
+        # Macro-moves: every reachable slide distance k of each vehicle in one expansion,
+        # actions are (id, direction, k)
+        layout = self.layout
+        pos = self.pos
+
+        if layout.backend == 'bitboard':
+            occ = self.occupancy()
+            for i, (vid, (_, _, _, back, forward)) in enumerate(zip(layout.ids, layout.axes)):
+                p = pos[i]
+                for direction, masks, delta in ((back, layout.back_masks[i], -1),
+                                                (forward, layout.forward_masks[i], 1)):
+                    q = p
+                    while masks[q] and not occ & masks[q]:
+                        q += delta
+                        yield (vid, direction, abs(q - p)), self._moved(i, q, occ)
+            return
+
+        grid = self.grid()
+        for i, (vid, (base, step, limit, back, forward), length) in enumerate(
+                zip(layout.ids, layout.axes, layout.lengths)):
+            p = pos[i]
+            q = p
+            while q > 0 and grid[base + (q - 1) * step] == ' ':
+                q -= 1
+                yield (vid, back, p - q), self._moved(i, q)
+            q = p
+            while q + length < limit and grid[base + (q + length) * step] == ' ':
+                q += 1
+                yield (vid, forward, q - p), self._moved(i, q)
+
+    def __eq__(self, other):
+        # O(n): the positions tuple is the canonical vector of the state (same order as layout.ids)
+        if not isinstance(other, PackedState):
+            return False
+        return self.pos == other.pos and (self.layout is other.layout or self.layout == other.layout)
+
+    def __hash__(self):
+        # Computed once (XOR of all keys) for a root state, children get it from their parent
+        if self._hash is None:
+            h = 0
+            for keys, p in zip(self.layout.zobrist, self.pos):
+                h ^= keys[p]
+            self._hash = h
+        return self._hash
@@ -0,0 +1,127 @@
+from PackedState import PackedState
+from Node import Node
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+# Globals of a worker process, set once by _init_worker (the layout is not sent with every chunk)
+_layout = None
+_slides = False
+_weights = None
+
+
+def key_weights(layout):
+    """
+    Mixed radix weights: key = sum(pos[i] * weights[i]) is a unique int per state of the layout
+    """
+    weights = []
+    weight = 1
+    for spans in reversed(layout.span_masks):
+        weights.append(weight)
+        weight *= len(spans)
+    return weights[::-1]
+
+
+def decode(key, layout):
+    pos = []
+    for spans in reversed(layout.span_masks):
+        key, p = divmod(key, len(spans))
+        pos.append(p)
+    return tuple(pos[::-1])
+
+
+def replay(s, actions, cost=None):
+    """
+    Node chain of the actions played from s (for the searches that only keep keys and parent links)
+    """
+    node = Node(state=s, parent=None, action=None, g=0)
+    for action in actions:
+        node = Node(state=node.state.applyAction(action), parent=node, action=action,
+                    g=node.g + (cost(action) if cost else 1))
+    return node
+
+
+def _init_worker(layout, slides):
+    global _layout, _slides, _weights
+    _layout = layout
+    _slides = slides
+    _weights = key_weights(layout)
+
+
+def _expand(chunk):
+    """
+    Successors of a chunk of keys of the same depth -> ([(child key, parent key, action), ...], goal found)
+    Duplicates inside the chunk are dropped (first one kept), the visited set is only in the main process.
+    Stops at the first goal child, like BFS.
+    """
+    index = _layout.index
+    seen = set()
+    candidates = []
+    for key in chunk:
+        state = PackedState(_layout, decode(key, _layout))
+        pos = state.pos
+        successors = state.iterSlideSuccessors() if _slides else state.iterSuccessors()
+        for action, child in successors:
+            i = index[action[0]]
+            child_key = key + (child.pos[i] - pos[i]) * _weights[i]
+            if child_key in seen:
+                continue
+            seen.add(child_key)
+            candidates.append((child_key, key, action))
+            if child.isGoal():
+                return candidates, True
+    return candidates, False
+
+
+def ParallelBFS(s, workers=None, slides=False, chunk_size=None):
+    # Level-synchronous BFS: the frontier (one depth) is cut in chunks expanded by a pool of processes,
+    # the main process keeps the visited dict key -> (parent key, action) and builds the next frontier.
+    # States travel as int keys (mixed radix of the positions), the layout is sent once per worker.
+    # workers: number of processes (None = os.cpu_count()), 1 runs the same code without a pool
+    # slides=True uses the macro-moves (id, dir, k). The goal test is state.isGoal() (lambdas can't
+    # be sent to another process). Returns the same Node as BFS (same path: chunks are merged in order).
+    if s.isGoal():
+        return Node(state=s, parent=None, action=None, g=0)
+
+    workers = workers or os.cpu_count() or 1
+    layout = s.layout
+    root = sum(p * w for p, w in zip(s.pos, key_weights(layout)))
+    parents = {root: None}
+    frontier = [root]
+    goal = None
+
+    if workers > 1:
+        pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(layout, slides))
+        expand_all = pool.map
+    else:
+        pool = None
+        _init_worker(layout, slides)
+        expand_all = map
+
+    try:
+        while frontier and goal is None:
+            # a few chunks per worker so a slow chunk doesn't keep the others waiting
+            size = chunk_size or max(1, len(frontier) // (workers * 4) + 1)
+            chunks = [frontier[i:i + size] for i in range(0, len(frontier), size)]
+            next_frontier = []
+            for candidates, found in expand_all(_expand, chunks):
+                for key, parent, action in candidates:
+                    if key not in parents:
+                        parents[key] = (parent, action)
+                        next_frontier.append(key)
+                if found:
+                    goal = candidates[-1][0]  # the first goal of the level, chunks come back in order
+                    break
+            frontier = next_frontier
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    if goal is None:
+        return None
+
+    # Rebuild the path: actions from the goal up to the root, then replayed from s
+    actions = []
+    while parents[goal] is not None:
+        goal, action = parents[goal]
+        actions.append(action)
+    return replay(s, reversed(actions))
@@ -0,0 +1,51 @@
+class PathView:
+    """
+    Lazy path of a solution, only the initial state and the actions (getSolution) are kept.
+    path[k] (0 <= k <= len(actions), negative indexes too) is made on demand by replaying the moves
+    from the closest of the start and the last step asked: forward with the actions, backward with
+    their opposite moves, so going to the next / previous step costs one move and scrubbing costs
+    the distance. Same states as the list of getPath, without keeping one state per step.
+    """
+
+    __slots__ = ('initial', 'actions', '_step', '_state')
+
+    def __init__(self, initial, actions):
+        self.initial = initial
+        self.actions = list(actions)
+        self._step = 0  # last step asked and its state
+        self._state = initial
+
+    def __len__(self):
+        return len(self.actions) + 1
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self[i] for i in range(*k.indices(len(self)))]
+        if k < 0:
+            k += len(self)
+        if not 0 <= k < len(self):
+            raise IndexError(k)
+        if k < abs(k - self._step):
+            # closer to the start than to the last step
+            self._step, self._state = 0, self.initial
+        while self._step < k:
+            self._state = self._state.applyAction(self.actions[self._step])
+            self._step += 1
+        while self._step > k:
+            self._step -= 1
+            self._state = self._state.applyAction(self.reverse(self.actions[self._step]))
+        return self._state
+
+    def __iter__(self):
+        # forward replay from the start (the last step asked is not changed)
+        state = self.initial
+        yield state
+        for action in self.actions:
+            state = state.applyAction(action)
+            yield state
+
+    def reverse(self, action):
+        # opposite move: (id, direction[, k]) -> (id, other direction of its line[, k])
+        layout = self.initial.layout
+        _, _, _, back, forward = layout.axes[layout.index[action[0]]]
+        return (action[0], forward if action[1] == back else back) + tuple(action[2:])
@@ -0,0 +1,111 @@
+import cProfile
+import gc
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+
+class Profiler:
+    """
+    Profile of a block of code (with Profiler('run.prof') as profiler: ...):
+    cProfile function stats (dumped to the .prof file, open it with pstats / snakeviz),
+    tracemalloc peak + top allocation sites, and the garbage collections per generation.
+    The text summary goes next to the .prof file (run.txt).
+    Both cProfile and tracemalloc slow the code down a lot (x2 - x4): compare the profiles
+    between them, not their times with normal runs.
+    """
+
+    def __init__(self, path='rushhour.prof', top=15, frames=1, interval=0.05):
+        self.path = path
+        self.summary_path = os.path.splitext(path)[0] + '.txt'
+        self.top = top
+        self.frames = frames
+        self.interval = interval
+        self.profile = cProfile.Profile()
+        self.collections = [0, 0, 0]
+        self.gc_time = 0.0
+        self._gc_start = None
+        self.peak_snapshot = None
+        self.peak = 0
+        self.elapsed = None
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def _on_gc(self, phase, info):
+        if phase == 'start':
+            self._gc_start = time.perf_counter()
+        elif self._gc_start is not None:
+            self.collections[info['generation']] += 1
+            self.gc_time += time.perf_counter() - self._gc_start
+
+    def _sample(self):
+        # tracemalloc only gives the peak size, not what was allocated at the peak: a snapshot is taken
+        # each time the traced memory grows by 25%, the biggest one shows the sites at (about) the peak
+        snapshot_size = 0
+        while not self._stop.wait(self.interval):
+            current = tracemalloc.get_traced_memory()[0]
+            if current > snapshot_size * 1.25 and current > 1 << 20:
+                self._take_snapshot(current)
+                snapshot_size = current
+
+    def _take_snapshot(self, size):
+        if self.peak_snapshot is None or size > self.peak_snapshot[0]:
+            self.peak_snapshot = (size, tracemalloc.take_snapshot())
+
+    def __enter__(self):
+        gc.callbacks.append(self._on_gc)
+        tracemalloc.start(self.frames)
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+        self.start = time.perf_counter()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.disable()
+        self.elapsed = time.perf_counter() - self.start
+        self._stop.set()
+        self._sampler.join()
+        current, self.peak = tracemalloc.get_traced_memory()
+        self._take_snapshot(current)
+        tracemalloc.stop()
+        gc.callbacks.remove(self._on_gc)
+
+        self.profile.dump_stats(self.path)
+        with open(self.summary_path, 'w') as fichier:
+            fichier.write(self.summary())
+        return False
+
+    def allocation_sites(self):
+        # (site, KB, blocks) of the biggest snapshot, without tracemalloc / the profiler themselves
+        if self.peak_snapshot is None:
+            return []
+        snapshot = self.peak_snapshot[1].filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ])
+        sites = []
+        for statistic in snapshot.statistics('lineno')[:self.top]:
+            frame = statistic.traceback[0]
+            site = f"{os.path.basename(frame.filename)}:{frame.lineno}"
+            sites.append((site, statistic.size / 1024, statistic.count))
+        return sites
+
+    def summary(self):
+        text = io.StringIO()
+        text.write(f"Profile: {self.path}  ({self.elapsed:.3f}s profiled)\n\n")
+        text.write(f"Functions (top {self.top} by cumulative time)\n")
+        stats = pstats.Stats(self.profile, stream=text)
+        stats.sort_stats('cumulative').print_stats(self.top)
+        text.write(f"Memory: peak {self.peak / 2 ** 20:.1f} MB traced\n")
+        if self.peak_snapshot is not None:
+            text.write(f"Allocation sites (snapshot at {self.peak_snapshot[0] / 2 ** 20:.1f} MB)\n")
+            for site, size, count in self.allocation_sites():
+                text.write(f"  {site:<40} {size:>12.1f} KB {count:>10} blocks\n")
+        text.write(f"\nGarbage collections: gen0 {self.collections[0]}, gen1 {self.collections[1]}, "
+                   f"gen2 {self.collections[2]} ({self.gc_time:.3f}s)\n")
+        return text.getvalue()
@@ -0,0 +1,160 @@
+from RushHourPuzzle import RushHourPuzzle
+from array import array
+import glob
+import mmap
+import os
+import struct
+import sys
+
+# File: header, the puzzles one after the other, then the index (offset of each puzzle, uint64)
+# Puzzle: RECORD (height, width, walls, vehicles), name (uint16 length + utf-8), the walls (x, y bytes),
+# then each vehicle: id (uint8 length + utf-8), orientation (b'H' / b'V'), length, x, y (bytes)
+MAGIC = b'RHCORP1\0'
+HEADER = struct.Struct('=8sHHIQQ')  # magic, version, padding, padding, count, index offset
+RECORD = struct.Struct('=BBHH')
+VEHICLE = struct.Struct('=cBBB')
+VERSION = 1
+SUFFIX = '.rhc'
+
+
+def encode_puzzle(puzzle, name=''):
+    """
+    Bytes of one puzzle (a parsed RushHourPuzzle), boards up to 255 x 255
+    """
+    if max(puzzle.board_height, puzzle.board_width) > 255:
+        raise ValueError("Boards of the corpus format are 255 x 255 at most")
+    walls = puzzle.walls
+    vehicles = puzzle.vehicles
+    name = name.encode()
+    parts = [RECORD.pack(puzzle.board_height, puzzle.board_width, len(walls), len(vehicles)),
+             struct.pack('=H', len(name)), name, bytes(c for wall in walls for c in wall)]
+    for vehicle in vehicles:
+        vid = vehicle['id'].encode()
+        parts.append(bytes([len(vid)]) + vid)
+        parts.append(VEHICLE.pack(vehicle['orientation'].encode(), vehicle['length'], vehicle['x'], vehicle['y']))
+    return b''.join(parts)
+
+
+def write_corpus(path, puzzles):
+    """
+    Writes puzzles (iterable of (name, RushHourPuzzle)) in one corpus file, returns how many.
+    Only the index (8 bytes per puzzle) is kept in memory.
+    """
+    offsets = array('Q')
+    with open(path, 'wb') as fichier:
+        fichier.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0, 0))
+        offset = HEADER.size
+        for name, puzzle in puzzles:
+            record = encode_puzzle(puzzle, name)
+            offsets.append(offset)
+            fichier.write(record)
+            offset += len(record)
+        offsets.tofile(fichier)
+        fichier.seek(0)
+        fichier.write(HEADER.pack(MAGIC, VERSION, 0, 0, len(offsets), offset))
+    return len(offsets)
+
+
+def convert(path, csv_files):
+    """
+    CSV puzzles -> one corpus file (each puzzle named after its file)
+    """
+    return write_corpus(path, ((os.path.basename(csv_file), RushHourPuzzle(csv_file)) for csv_file in csv_files))
+
+
+class PuzzleCorpus:
+    """
+    Memory-mapped corpus file: len(), corpus[i] / corpus.puzzle(i, backend) and the names are read
+    from the mapping on demand, iterating yields the puzzles one at a time (constant memory,
+    only the pages being read are loaded)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as fichier:
+            self._mmap = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, _, count, index_offset = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a puzzle corpus (version {VERSION})")
+        self._view = memoryview(self._mmap)
+        self.offsets = self._view[index_offset:index_offset + 8 * count].cast('Q')
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def close(self):
+        if self._mmap is not None:
+            self.offsets.release()
+            self._view.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def read(self, i):
+        """
+        (name, height, width, walls [(x, y)], vehicles [(id, x, y, orientation, length)]) of puzzle i
+        """
+        mm = self._mmap
+        offset = self.offsets[i]
+        height, width, wall_count, vehicle_count = RECORD.unpack_from(mm, offset)
+        offset += RECORD.size
+        (name_size,) = struct.unpack_from('=H', mm, offset)
+        offset += 2
+        name = mm[offset:offset + name_size].decode()
+        offset += name_size
+        cells = mm[offset:offset + 2 * wall_count]
+        walls = list(zip(cells[0::2], cells[1::2]))
+        offset += 2 * wall_count
+        vehicles = []
+        for _ in range(vehicle_count):
+            id_size = mm[offset]
+            vid = mm[offset + 1:offset + 1 + id_size].decode()
+            offset += 1 + id_size
+            orientation, length, x, y = VEHICLE.unpack_from(mm, offset)
+            offset += VEHICLE.size
+            vehicles.append((vid, x, y, orientation.decode(), length))
+        return name, height, width, walls, vehicles
+
+    def name(self, i):
+        return self.read(i)[0]
+
+    def puzzle(self, i, backend='grid'):
+        return _build(self.read(i), backend)
+
+    def __getitem__(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        return self.puzzle(i % len(self))
+
+    def __iter__(self):
+        return (puzzle for _, puzzle in self.iter_puzzles())
+
+    def iter_puzzles(self, backend='grid'):
+        # generator: (name, puzzle) are built one by one while the caller goes through them
+        for i in range(len(self)):
+            record = self.read(i)
+            yield record[0], _build(record, backend)
+
+
+def _build(record, backend):
+    _, height, width, walls, vehicles = record
+    puzzle = RushHourPuzzle(backend=backend)
+    puzzle.setPuzzle(height, width, walls, vehicles)
+    return puzzle
+
+
+if __name__ == "__main__":
+    # python PuzzleCorpus.py corpus.rhc examples/ more/*.csv
+    if len(sys.argv) < 3:
+        sys.exit("usage: PuzzleCorpus.py CORPUS.rhc CSV_DIR_OR_GLOB [...]")
+    files = []
+    for path in sys.argv[2:]:
+        files.extend(sorted(glob.glob(os.path.join(path, '*.csv') if os.path.isdir(path) else path)))
+    count = convert(sys.argv[1], files)
+    print(f"{count} puzzles written to {sys.argv[1]}")
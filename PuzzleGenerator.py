@@ -0,0 +1,313 @@
+import argparse
+import json
+import os
+import random
+import sys
+
+from PackedState import PuzzleLayout, PackedState
+from AStar import AStar
+from Budget import Budget
+from DistanceTable import DistanceTable, ComponentTooLarge, UNSOLVABLE
+from SearchStats import SearchStats
+
+# Ids of the generated vehicles (X is the red car), 51 vehicles at most
+NAMES = "ABCDEFGHIJKLMNOPQRSTUVWYZabcdefghijklmnopqrstuvwxyz"
+
+
+class GeneratedPuzzle:
+    """
+    One generated puzzle: board size, walls, vehicles (id, x, y, orientation, length),
+    depth = optimal number of moves (one cell per move, like BFS), states = size of the part
+    of the state space reachable from it (None when it was too big to be explored) and
+    min_states = a lower bound of that size (the exact size when it is known)
+    """
+
+    def __init__(self, height, width, walls, vehicles, depth, states, seed, min_states=None):
+        self.height = height
+        self.width = width
+        self.walls = walls
+        self.vehicles = vehicles
+        self.depth = depth
+        self.states = states
+        self.min_states = min_states if min_states is not None else states
+        self.seed = seed
+
+    def lines(self):
+        lines = [f"{self.height},{self.width}"]
+        lines += [f"#,{x},{y}" for x, y in self.walls]
+        lines += [f"{vid},{x},{y},{orientation},{length}" for vid, x, y, orientation, length in self.vehicles]
+        return lines
+
+    def write_csv(self, path):
+        with open(path, 'w') as fichier:
+            fichier.write("\n".join(self.lines()) + "\n")
+        return path
+
+
+def place_vehicles(rng, height, width, count, lengths, taken):
+    """
+    Drops count vehicles on random free cells (taken: set of the cells already used, updated),
+    never horizontal on X's row. Returns [(id, x, y, orientation, length)] or None if they don't fit
+    """
+    exit_row = height // 2 - 1
+    names = iter(NAMES)
+    vehicles = []
+    attempts = 0
+    while len(vehicles) < count:
+        attempts += 1
+        if attempts > 100 * count:
+            return None  # board too full
+        orientation = rng.choice('HV')
+        length = rng.choice(lengths)
+        x, y = rng.randrange(width), rng.randrange(height)
+        cells = [(x + k, y) if orientation == 'H' else (x, y + k) for k in range(length)]
+        if orientation == 'H' and y == exit_row:
+            continue  # an horizontal car on X's row would block it forever
+        if any(cx >= width or cy >= height or (cx, cy) in taken for cx, cy in cells):
+            continue
+        taken.update(cells)
+        vehicles.append((next(names), x, y, orientation, length))
+    return vehicles
+
+
+def random_board(rng, height, width, vehicles, lengths=(2, 2, 3), wall_density=0.0):
+    """
+    Random placement (no search): X on its goal, so the board is solvable, walls on wall_density of
+    the cells (never on the exit row), then vehicles dropped on free cells.
+    Returns (walls, layout vehicles, positions) or None if the vehicles don't fit.
+    """
+    exit_row = height // 2 - 1
+    x = width - 2
+    taken = {(x, exit_row), (x + 1, exit_row)}
+
+    walls = []
+    free = [(cx, cy) for cy in range(height) for cx in range(width) if cy != exit_row]
+    for cell in rng.sample(free, int(wall_density * height * width)):
+        walls.append(cell)
+        taken.add(cell)
+    walls.sort()
+
+    placed = place_vehicles(rng, height, width, vehicles, lengths, taken)
+    if placed is None:
+        return None
+    layout_vehicles = [("X", 'H', 2, exit_row)]
+    pos = [x]
+    for vid, vx, vy, orientation, length in placed:
+        if orientation == 'H':
+            layout_vehicles.append((vid, 'H', length, vy))
+            pos.append(vx)
+        else:
+            layout_vehicles.append((vid, 'V', length, vx))
+            pos.append(vy)
+    return walls, layout_vehicles, tuple(pos)
+
+
+def scramble(rng, state, steps, pull=0.0):
+    """
+    Random walk of steps moves from state (never undoing the move just made).
+    pull: probability of moving X away from the exit when it can (on a big board a uniform walk
+    almost never moves X, so the puzzle stays solved in a few moves)
+    """
+    layout = state.layout
+    away = (layout.ids[layout.target], layout.axes[layout.target][3]) if layout.target is not None else None
+    previous = None
+    for _ in range(steps):
+        successors = [(action, child) for action, child in state.iterSuccessors() if child != previous]
+        if not successors:
+            break
+        pulled = [child for action, child in successors if action == away]
+        if pulled and rng.random() < pull:
+            child = pulled[0]
+        else:
+            child = rng.choice(successors)[1]
+        previous, state = state, child
+    return state
+
+
+def lane_bound(state):
+    """
+    Admissible heuristic for the unit moves of the climb, much tighter than h2 on big boards: X still
+    moves goal_x - x cells, and each vertical vehicle across its lane at least the cells it needs to
+    free X's row (up or down, the shortest that fits on the board). Different vehicles, different moves.
+    """
+    layout = state.layout
+    t = layout.target
+    if t is None:
+        return 0
+    pos = state.pos
+    x, x_row = layout.coords(t, pos[t])
+    x_end = x + layout.lengths[t]
+    bound = layout.goal_x - x
+    for i, orientation in enumerate(layout.orientations):
+        if orientation != 'V' or not x_end <= layout.fixed[i] <= layout.goal_x + 1:
+            continue
+        y, length = pos[i], layout.lengths[i]
+        if y <= x_row < y + length:
+            up = y + length - x_row  # fits if length <= x_row
+            down = x_row - y + 1  # fits if x_row + length < board_height
+            shifts = [s for s, fits in ((up, length <= x_row), (down, x_row + length < layout.board_height)) if fits]
+            bound += min(shifts or (up, down))
+    return bound
+
+
+def climb(rng, start, min_depth, max_depth=float('inf'), max_expanded=50000, walk_steps=None, rounds=30, tries=4,
+          pull=0.3, patience=5):
+    """
+    For the boards too big to be explored: hill climbing on the optimal depth. Each round tries
+    `tries` random walks of walk_steps moves (scramble with pull) from the current state, solves them with A*
+    lane_bound (admissible, so the depth is optimal; max_expanded nodes at most) and goes on from the deepest
+    one, until one has a depth in min_depth..max_depth.
+    Returns (state, depth, states seen) or None after `rounds` rounds, `patience` rounds in a row
+    without a deeper state or 10 * max_expanded nodes in all (some boards stall, the next one is cheaper).
+    states seen = the most distinct states one A* check reached, a lower bound of the size of the component.
+    """
+    walk_steps = walk_steps or max(min_depth, 5)
+    current, current_depth = start, 0
+    seen = 0
+    left = 10 * max_expanded
+    stalled = 0
+    for _ in range(rounds):
+        best = None
+        for _ in range(tries):
+            if left <= 0:
+                return None
+            candidate = scramble(rng, current, walk_steps, pull)
+            stats = SearchStats(timed=False)
+            goal_node = AStar(candidate, lambda s: s.iterSuccessors(), lambda s: s.isGoal(), lane_bound,
+                              budget=Budget(max_expanded=min(max_expanded, left)), stats=stats)
+            left -= stats.expanded
+            seen = max(seen, stats.generated - stats.duplicates_open - stats.duplicates_closed + 1)
+            if not goal_node:
+                continue  # too hard to check
+            depth = len(goal_node.getSolution())
+            if min_depth <= depth <= max_depth:
+                return candidate, depth, seen
+            if depth < min_depth and (best is None or depth > best[1]):
+                best = (candidate, depth)
+        if best is not None and best[1] > current_depth:
+            stalled = 0
+        else:
+            stalled += 1
+            if stalled >= patience:
+                return None
+        if best is not None and best[1] >= current_depth:
+            current, current_depth = best
+    return None
+
+
+def generate(seed, height=6, width=None, vehicles=10, lengths=(2, 2, 3), wall_density=0.0,
+             min_depth=1, max_depth=None, max_states=50000, max_expanded=50000, walk_steps=None, attempts=1000):
+    """
+    Solvable puzzle with an optimal solution of min_depth..max_depth moves, the same for the same arguments.
+    Each attempt draws a random board with X on its goal and builds the DistanceTable of its whole
+    component (up to max_states states): every state of it has its distance to the goal, and one of
+    the deepest states at the wanted depth is picked (they are rare among random boards, this finds them anyway).
+    When the component is too big (large boards) the depth is climbed from the goal instead (climb:
+    random walks checked by A* lane_bound), states is then None and min_states a lower bound. After 3
+    components too big, the next attempts go straight to the climb (building up to max_states
+    states costs seconds, the A* checks much less).
+    Raises ValueError after attempts failed boards.
+    """
+    width = width or height
+    max_depth = max_depth if max_depth is not None else float('inf')
+    if vehicles > len(NAMES):
+        raise ValueError(f"At most {len(NAMES)} vehicles besides X")
+    rng = random.Random(seed)
+    too_big = 0
+
+    for _ in range(attempts):
+        board = random_board(rng, height, width, vehicles, lengths, wall_density)
+        if board is None:
+            continue
+        walls, layout_vehicles, pos = board
+        layout = PuzzleLayout(height, width, layout_vehicles, walls, 'bitboard')
+        start = PackedState(layout, pos)
+
+        table = None
+        min_states = 0
+        if too_big < 3:
+            try:
+                table = DistanceTable.build(start, max_states=max_states)
+            except ComponentTooLarge as error:
+                too_big += 1
+                min_states = error.states
+        if table is not None:
+            fitting = [(d, key) for key, d in zip(table.keys, table.distances)
+                       if d != UNSOLVABLE and min_depth <= d <= max_depth]
+            if not fitting:
+                continue
+            # one of the deepest states that fit the target (the keys are sorted: same choice everywhere)
+            depth = max(fitting)[0]
+            chosen = table.decode(rng.choice([key for d, key in fitting if d == depth]))
+            states = min_states = len(table)
+        else:
+            climbed = climb(rng, start, min_depth, max_depth, max_expanded, walk_steps)
+            if climbed is None:
+                continue
+            state, depth, seen = climbed
+            chosen, states, min_states = state.pos, None, max(min_states, seen)
+
+        csv_vehicles = []
+        for i, vid in enumerate(layout.ids):
+            x, y = layout.coords(i, chosen[i])
+            csv_vehicles.append((vid, x, y, layout.orientations[i], layout.lengths[i]))
+        return GeneratedPuzzle(height, width, walls, csv_vehicles, depth, states, seed, min_states)
+    raise ValueError(f"No puzzle found in {attempts} attempts (seed {seed!r}), try other sizes / depths")
+
+
+def generate_corpus(directory, count, seed=0, prefix=None, verbose=False, **options):
+    """
+    Writes count puzzles (prefix-0000.csv ...) and a manifest.json (options + depth / states of each)
+    in directory. Puzzle number i uses the seed "seed-i", so a corpus can be extended or
+    regenerated one file at a time.
+    """
+    os.makedirs(directory, exist_ok=True)
+    height = options.get('height', 6)
+    width = options.get('width') or height
+    prefix = prefix or f"{height}x{width}-{options.get('vehicles', 10)}"
+    manifest = {'seed': seed, 'options': dict(options), 'puzzles': []}
+    for i in range(count):
+        puzzle = generate(f"{seed}-{i}", **options)
+        name = f"{prefix}-{i:04d}.csv"
+        puzzle.write_csv(os.path.join(directory, name))
+        manifest['puzzles'].append({'file': name, 'seed': puzzle.seed, 'depth': puzzle.depth,
+                                    'states': puzzle.states, 'min_states': puzzle.min_states})
+        if verbose:
+            states = puzzle.states if puzzle.states is not None else f">= {puzzle.min_states}"
+            print(f"{name}  depth {puzzle.depth}  states {states}", file=sys.stderr)
+    with open(os.path.join(directory, 'manifest.json'), 'w') as fichier:
+        json.dump(manifest, fichier, indent=1)
+    return manifest
+
+
+def parse_depth(text):
+    # "12" -> at least 12, "12-20" -> 12 to 20
+    low, _, high = text.partition('-')
+    return int(low), int(high) if high else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Random solvable Rush Hour puzzles (CSV) for the benchmarks")
+    parser.add_argument("directory", help="where the CSVs and manifest.json go")
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--size", type=int, default=6, help="board height (and width unless --width)")
+    parser.add_argument("--width", type=int)
+    parser.add_argument("--vehicles", type=int, default=10, help="vehicles besides X")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[2, 2, 3],
+                        help="lengths drawn for the vehicles (repeat one to make it more frequent)")
+    parser.add_argument("--walls", type=float, default=0.0, help="fraction of the cells that are walls")
+    parser.add_argument("--depth", type=parse_depth, default=(1, None), help="N (at least N moves) or N-M")
+    parser.add_argument("--max-states", type=int, default=50000,
+                        help="bigger components are checked with A* instead of being explored")
+    parser.add_argument("--max-expanded", type=int, default=50000, help="A* check budget")
+    parser.add_argument("--walk", type=int, help="random walk length per climbing round on the big boards "
+                                                 "(default: the minimum depth)")
+    parser.add_argument("--prefix")
+    args = parser.parse_args()
+
+    generate_corpus(args.directory, args.count, args.seed, args.prefix, verbose=True,
+                    height=args.size, width=args.width, vehicles=args.vehicles,
+                    lengths=tuple(args.lengths), wall_density=args.walls,
+                    min_depth=args.depth[0], max_depth=args.depth[1],
+                    max_states=args.max_states, max_expanded=args.max_expanded, walk_steps=args.walk)
@@ -1,85 +1,118 @@
 import csv
-import copy
+from PackedState import PuzzleLayout, PackedState
 
-class RushHourPuzzle:
+class RushHourPuzzle(PackedState):
 
-    def __init__(self, csv_file=None):
-        self.board_height = 0
-        self.board_width = 0
-        self.vehicles = []   #Liste de dictionnaires qui represente les v
-        self.walls = []      #Liste de tuples (x, y) qui represente les obstacles
-        self.board = []      #Matrice du board
+    # The state itself is a PackedState (layout shared + tuple of positions)
+    # vehicles, walls and board are rebuilt on demand for the UI, displayBoard and old code
+    __slots__ = ()
+
+    def __init__(self, csv_file=None, backend='grid'):
+        # backend='bitboard' keeps the occupancy as an int (one bit per cell) instead of a grid of cells
+        PackedState.__init__(self, PuzzleLayout(0, 0, [], [], backend), ())
 
         if csv_file:
             self.setVehicles(csv_file)
             self.setBoard()
 
+    @property
+    def board_height(self):
+        return self.layout.board_height
+
+    @property
+    def board_width(self):
+        return self.layout.board_width
+
+    @property
+    def walls(self):
+        return list(self.layout.walls)  #Liste de tuples (x, y) qui represente les obstacles
+
+    @property
+    def vehicles(self):
+        # Liste de dictionnaires qui represente les v, rebuilt from the packed positions
+        layout = self.layout
+        vehicles = []
+        for i, p in enumerate(self.pos):
+            x, y = layout.coords(i, p)
+            vehicles.append({
+                "id": layout.ids[i],
+                "x": x,
+                "y": y,
+                "orientation": layout.orientations[i],
+                "length": layout.lengths[i]
+            })
+        return vehicles
+
+    @property
+    def board(self):
+        # Matrice du board
+        grid = self.grid()
+        w = self.layout.board_width
+        return [grid[row * w:(row + 1) * w] for row in range(self.layout.board_height)]
+
     def setVehicles(self, csv_file):
         with open(csv_file, newline='') as fichier:
             reader = csv.reader(fichier)
 
             # Ignore les lignes vides psq qd mm il ya une possibilite ykono
-            liste = [ligne for ligne in reader if ligne]  
+            liste = [ligne for ligne in reader if ligne]
 
-        self.board_height = int(liste[0][0]) #recuperer height
-        self.board_width = int(liste[0][1])  #recuperer width
+        board_height = int(liste[0][0]) #recuperer height
+        board_width = int(liste[0][1])  #recuperer width
 
-        self.vehicles = []
-        self.walls = []
+        vehicles = []
+        walls = []
 
         # Parcourir les lignes suivantes
         for ligne in liste[1:]: #ignoré le premier élément qui rep dim
             # Ignorer les lignes vides
             if not ligne or not ligne[0]:
                 continue
-            #this step is important in : setting all lists of walls, v    
+            #this step is important in : setting all lists of walls, v
             # Si c'est un obstacle #
             if ligne[0].startswith('#'):
                 x = int(ligne[1]) #cast cHAR->INT
                 y = int(ligne[2])
-                self.walls.append((x, y))
+                walls.append((x, y))
             else:
                 v_id = ligne[0]
                 x = int(ligne[1])
                 y = int(ligne[2])
                 orientation = ligne[3]
                 length = int(ligne[4])
+                vehicles.append((v_id, x, y, orientation, length))
+
+        return self.setPuzzle(board_height, board_width, walls, vehicles)
+
+    def setPuzzle(self, board_height, board_width, walls, vehicles):
+        # Same as a parsed CSV: walls [(x, y)], vehicles [(id, x, y, orientation, length)]
+        # (used by setVehicles and by the binary corpus reader of PuzzleCorpus)
+        layout_vehicles = []
+        pos = []
+        for v_id, x, y, orientation, length in vehicles:
+            # Only the moving coordinate goes in the state, the other one is static
+            if orientation == 'H':
+                layout_vehicles.append((v_id, orientation, length, y))
+                pos.append(x)
+            else:
+                layout_vehicles.append((v_id, orientation, length, x))
+                pos.append(y)
 
-                # Créer un dictionnaire pour le véhicule pour faciliter la manipulation later
-                vehicle = {
-                    "id": v_id,
-                    "x": x,
-                    "y": y,
-                    "orientation": orientation,
-                    "length": length
-                }
-                self.vehicles.append(vehicle)
+        self.layout = PuzzleLayout(board_height, board_width, layout_vehicles, walls, self.layout.backend)
+        self.pos = tuple(pos)
+        self._occ = None
+        self._hash = None
 
         return self.vehicles
-    
-    def setBoard(self):
-        # Créer une matrice vide
-        self.board = [[' ' for _ in range(self.board_width)] for _ in range(self.board_height)]
-
-        # Placer les obstacles
-        for (x, y) in self.walls:
-            self.board[y][x] = '#'
-
-        # Placer les vehicules
-        for v in self.vehicles:
-            x, y = v["x"], v["y"]
-            for i in range(v["length"]):
-                if v["orientation"] == 'H':
-                    self.board[y][x + i] = v["id"] #tjrs we inverse it as cest des cordonnees cartesiennes
-                else:
-                    self.board[y + i][x] = v["id"]
 
+    def setBoard(self):
+        # The board is not stored anymore, it is computed from the positions
         return self.board
-    
+
     def displayBoard(self): #affichage organisee de la mat avan PYGAME
         # Ligne horizontale de séparation
         horizontal_line = "+" + "-" * (self.board_width * 4 - 1) + "+"
-        
+
         print("\n" + horizontal_line)
         for i, row in enumerate(self.board):
             # Afficher la ligne avec des séparateurs verticaux
@@ -89,145 +122,32 @@ class RushHourPuzzle:
                 print("|" + "+".join(["-" * 3 for _ in range(self.board_width)]) + "|")
         print(horizontal_line)
 
-    def isGoal(self):
-        for v in self.vehicles:
-            if v["id"] == "X": #on retourne un booleen qui indique que isGoal
-                return v["x"] == self.board_width - 2 and v["y"] == (self.board_height // 2 - 1)
-        return False
-    
     def canMove(self, vehicle, direction): #cette fonction nous indique si il peut se deplacer dans une telle pos
-        
+
         # Vérifie si un véhicule peut se déplacer dans une direction,soit up, left, right or down.
-        
-        x, y = vehicle["x"], vehicle["y"]
-        orientation = vehicle["orientation"]
-        length = vehicle["length"]
-        
-        if orientation == 'H' and direction in ['U', 'D']: #lzm ykono hado
-            return False
-        if orientation == 'V' and direction in ['L', 'R']:
+        i = self.layout.index.get(vehicle["id"])
+        if i is None:
             return False
-        
-        # Calculer la nouvelle position
-        new_x, new_y = x, y
-        
-        if direction == 'L': #left x-1
-            new_x = x - 1
-            if new_x < 0: #we reached the wall
-                return False
-            if self.board[y][new_x] != ' ':
-                return False
-                #same for others 
-        elif direction == 'R':
-            new_x = x + 1
-            if new_x + length > self.board_width:
-                return False
-            if self.board[y][new_x + length - 1] != ' ':
-                return False
-                
-        elif direction == 'U':
-            new_y = y - 1
-            if new_y < 0:
-                return False
-            if self.board[new_y][x] != ' ':
-                return False
-                
-        elif direction == 'D':
-            new_y = y + 1
-            if new_y + length > self.board_height:
-                return False
-            if self.board[new_y + length - 1][x] != ' ':
-                return False
-        
-        return True
-            # Déplace un véhicule dans une direction et retourne le nouvel état
-
-    def moveVehicle(self, vehicle_id, direction):
-        
-        # On crée une copie de l'état actuel d'abord de l'objet
-        new_state = copy.deepcopy(self)
-        
-        # Then search for le véhicule à déplacer
-        vehicle_index = None
-        for i, v in enumerate(new_state.vehicles):
-            if v["id"] == vehicle_id:
-                vehicle_index = i #index pour sauvgarder sa pos et confirmer que we found it
-                break
-        
-        if vehicle_index is None:
-            return None
-#on cree une deep copy qui contient toutw info sur l'objet
-
-        vehicle = new_state.vehicles[vehicle_index] #on cherche lobjet actuel dans sa copie
-        
-        if direction == 'L':
-            vehicle["x"] -= 1#position x  -1
-        elif direction == 'R':
-            vehicle["x"] += 1#position x  +1
-        elif direction == 'U':
-            vehicle["y"] -= 1#position y  -1
-        elif direction == 'D':
-            vehicle["y"] += 1#position y  +1
-
-        new_state.setBoard() # On met à jour le plateau avec la nouvelle position 
-        
-        return new_state
-    
-    def successorFunction(self): #we give it a vehicle and it returns the list of successors
-    
-        successors = []
-        
-        for vehicle in self.vehicles:
-            vehicle_id = vehicle["id"]
-            orientation = vehicle["orientation"]
-            
-            if orientation == 'H':
-                directions = ['L', 'R'] #the possible directions li y9dro ymove fihom (all successors)
-            else: 
-                directions = ['U', 'D']  #the possible directions li y9dro ymove fihom (all successors)
-            
-            for direction in directions:
-                if self.canMove(vehicle, direction):
-                    # Créer le nouvel état
-                    new_state = self.moveVehicle(vehicle_id, direction)
-                    if new_state:
-                        # Ajouter l'action et le successeur à la liste
-                        action = (vehicle_id, direction)
-                        successors.append((action, new_state))
-        
-        return successors
-    
-    def __eq__(self, other):
-
-        # ndiro eq because we can't compare les deux états directly since rah tcompari les adresses mémoire
-        # Soo we use it to compare the state of each vehicle position in the board between two states
-
-        if not isinstance(other, RushHourPuzzle):
-            return False
-        
-        if len(self.vehicles) != len(other.vehicles):
+
+        base, step, limit, back, forward = self.layout.axes[i]
+        if direction not in (back, forward): #lzm ykono hado
             return False
-        
-        for v1 in self.vehicles:
-            found = False
-            for v2 in other.vehicles:
-                if (v1["id"] == v2["id"] and #we compare id, x and y we can't compare directly two different objects 
-                    v1["x"] == v2["x"] and 
-                    v1["y"] == v2["y"]):
-                    found = True
-                    break
-            if not found:
-                return False
-        
-        return True
-    
-    def __hash__(self):
-
-        # In order to save the states in les listes open and closed, lazem we name them with unique names, and the best method is using hashing
-        # After ma ncryiw one tuple of all vehicle positions in current state, we hash it using python's function
-        vehicle_positions = tuple(sorted(
-            (v["id"], v["x"], v["y"]) for v in self.vehicles
-        ))
-        return hash(vehicle_positions)
-
-# this is the best method because hash + eq assurent bli the state is 100% unique
\ No newline at end of file
+
+        p = self.pos[i]
+        if self.layout.backend == 'bitboard':
+            masks = self.layout.back_masks if direction == back else self.layout.forward_masks
+            enter = masks[i][p]
+            return enter != 0 and not self.occupancy() & enter
+
+        grid = self.grid()
+        if direction == back:
+            return p > 0 and grid[base + (p - 1) * step] == ' '
+        end = p + self.layout.lengths[i]
+        return end < limit and grid[base + end * step] == ' '
+
+    def moveVehicle(self, vehicle_id, direction, distance=1):
+        # Déplace un véhicule dans une direction (distance cases) et retourne le nouvel état
+        # No deepcopy anymore: the new state shares the layout and gets a new positions tuple
+        return self.applyAction((vehicle_id, direction, distance))
+
+# hash + eq (in PackedState) work on the positions tuple, so the state is 100% unique
@@ -0,0 +1,98 @@
+import time
+
+
+class SearchStats:
+    """
+    Counters of one search, filled by BFS / AStar when they get one (stats=SearchStats()).
+    expanded: nodes whose successors were generated, generated: successors seen,
+    duplicates_open / duplicates_closed: successors already in Open / Closed,
+    reopened: A* states taken back from Closed with a better f, peak_open / peak_closed: largest sizes,
+    depth: number of actions of the solution, timings: seconds per phase ('successors', 'heuristic',
+    'queue') measured only when timed=True (each call is wrapped, so it slows the search a bit)
+    and 'total'.
+    """
+
+    def __init__(self, timed=True):
+        self.timed = timed
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates_open = 0
+        self.duplicates_closed = 0
+        self.reopened = 0
+        self.peak_open = 0
+        self.peak_closed = 0
+        self.depth = None
+        self.timings = {'successors': 0.0, 'heuristic': 0.0, 'queue': 0.0, 'total': 0.0}
+
+    def record(self, start, goal_node=None, **counters):
+        # end of the search: its counters, the total time since start (perf_counter) and the depth
+        for name, value in counters.items():
+            setattr(self, name, value)
+        self.timings['total'] = time.perf_counter() - start
+        if goal_node:
+            self.depth = len(goal_node.getSolution())
+        return self
+
+    def time_function(self, phase, function):
+        # function with its time added to timings[phase]
+        clock = time.perf_counter
+        timings = self.timings
+
+        def timed_function(*args):
+            start = clock()
+            result = function(*args)
+            timings[phase] += clock() - start
+            return result
+        return timed_function
+
+    def time_iterator(self, phase, iterable):
+        # the time of each next() goes to timings[phase] (the successors are generated lazily)
+        clock = time.perf_counter
+        timings = self.timings
+        iterator = iter(iterable)
+        while True:
+            start = clock()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                timings[phase] += clock() - start
+                return
+            timings[phase] += clock() - start
+            yield item
+
+    @property
+    def branching_factor(self):
+        """
+        Effective branching factor b*: generated + 1 = 1 + b* + b*^2 + ... + b*^depth
+        """
+        if not self.depth or not self.generated:
+            return None
+        low, high = 0.0, float(max(self.generated, 1))
+        for _ in range(100):
+            b = (low + high) / 2
+            total, power = 0.0, 1.0
+            for _ in range(self.depth):
+                power *= b
+                total += power
+            if total > self.generated:
+                high = b
+            else:
+                low = b
+        return (low + high) / 2
+
+    def as_dict(self):
+        return {
+            'expanded': self.expanded,
+            'generated': self.generated,
+            'duplicates_open': self.duplicates_open,
+            'duplicates_closed': self.duplicates_closed,
+            'reopened': self.reopened,
+            'peak_open': self.peak_open,
+            'peak_closed': self.peak_closed,
+            'depth': self.depth,
+            'branching_factor': self.branching_factor,
+            'timings': dict(self.timings),
+        }
+
+    def __repr__(self):
+        return f"SearchStats({self.as_dict()!r})"
@@ -0,0 +1,110 @@
+from array import array
+from PathView import PathView
+
+
+class SearchTree:
+    """
+    Search tree stored in parallel arrays instead of one Node object per generated state.
+    A node is an index: parents[i] (-1 for the root), actions[i] (packed action) and g[i].
+    States are not kept in the tree, the path is rebuilt by replaying the actions from the root.
+    """
+
+    def __init__(self, root_state):
+        self.root_state = root_state
+        self.layout = root_state.layout
+        # pack() has 7 bits for the vehicle and 8 for the slide distance (at most the board side - 1)
+        if len(self.layout.ids) > 1 << 7:
+            raise ValueError(f"SearchTree packs 128 vehicles at most, not {len(self.layout.ids)}")
+        if max(self.layout.board_height, self.layout.board_width) > 1 << 8:
+            raise ValueError("SearchTree packs the slides of boards up to 256 x 256")
+        self.parents = array('i')
+        self.actions = array('H')
+        self.g = array('i')
+
+    def __len__(self):
+        return len(self.parents)
+
+    def Node(self, state, parent=None, action=None, g=0, f=0):
+        # Same signature as Node(...) so BFS and AStar can use one or the other
+        self.parents.append(parent.index if parent is not None else -1)
+        self.actions.append(self.pack(action) if action is not None else 0)
+        self.g.append(g)
+        return TreeNode(self, len(self.parents) - 1, state, f)
+
+    def pack(self, action):
+        # 16 bits: vehicle index (7 bits) | slide distance k (8 bits, 0 for single cell actions) | forward (1 bit)
+        i = self.layout.index[action[0]]
+        k = action[2] if len(action) > 2 else 0
+        forward = action[1] == self.layout.axes[i][4]
+        return (i << 9) | (k << 1) | forward
+
+    def unpack(self, code):
+        i = code >> 9
+        k = (code >> 1) & 0xff
+        _, _, _, back, forward = self.layout.axes[i]
+        direction = forward if code & 1 else back
+        if k:
+            return (self.layout.ids[i], direction, k)
+        return (self.layout.ids[i], direction)
+
+    def getSolution(self, index, expand=False):
+        actions = []
+        while self.parents[index] != -1:
+            action = self.unpack(self.actions[index])
+            if expand and len(action) > 2:
+                actions.extend([action[:2]] * action[2])
+            else:
+                actions.append(action)
+            index = self.parents[index]
+        actions.reverse()
+        return actions
+
+    def getPath(self, index):
+        return list(PathView(self.root_state, self.getSolution(index)))
+
+
+class TreeNode:
+    """
+    Node-like view on one index of a SearchTree (what BFS / AStar keep in their frontier)
+    """
+
+    __slots__ = ('tree', 'index', 'state', 'f')
+
+    def __init__(self, tree, index, state=None, f=0):
+        self.tree = tree
+        self.index = index
+        self.state = state
+        self.f = f
+
+    @property
+    def g(self):
+        return self.tree.g[self.index]
+
+    @g.setter
+    def g(self, value):
+        self.tree.g[self.index] = value
+
+    @property
+    def parent(self):
+        parent = self.tree.parents[self.index]
+        return TreeNode(self.tree, parent) if parent != -1 else None
+
+    @property
+    def action(self):
+        if self.tree.parents[self.index] == -1:
+            return None
+        return self.tree.unpack(self.tree.actions[self.index])
+
+    def getPath(self):
+        return self.tree.getPath(self.index)
+
+    def getPathView(self):
+        return PathView(self.tree.root_state, self.getSolution())
+
+    def getSolution(self, expand=False):
+        return self.tree.getSolution(self.index, expand)
+
+    def setF(self, heuristic_func):
+        state = self.state if self.state is not None else self.getPath()[-1]
+        self.f = self.g + heuristic_func(state)
+        return self.f
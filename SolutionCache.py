@@ -0,0 +1,165 @@
+from PackedState import SUCCESSOR_VERSION
+from ParallelBFS import replay
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'rushhour', 'solutions.sqlite')
+COUNTERS = ('expanded', 'generated', 'duplicates_open', 'duplicates_closed', 'reopened',
+            'peak_open', 'peak_closed', 'depth')
+
+
+def fingerprint(state):
+    """
+    Canonical form of a puzzle -> (digest, {id: canonical id}).
+    Board size, walls and the vehicles without their names: X stays X, the others are sorted by
+    (orientation, line, position, length) and called V0, V1... so the same layout with renamed
+    or reordered vehicles gets the same digest.
+    """
+    layout = state.layout
+    others = sorted((i for i in range(len(layout.ids)) if layout.ids[i] != 'X'),
+                    key=lambda i: (layout.orientations[i], layout.fixed[i], state.pos[i], layout.lengths[i]))
+    names = {layout.ids[i]: f"V{rank}" for rank, i in enumerate(others)}
+    vehicles = [(names.get(layout.ids[i], 'X'), layout.orientations[i], layout.lengths[i],
+                 layout.fixed[i], state.pos[i])
+                for i in ([layout.target] if layout.target is not None else []) + others]
+    canonical = (layout.board_height, layout.board_width, tuple(sorted(layout.walls)), tuple(vehicles))
+    digest = hashlib.blake2b(repr(canonical).encode(), digest_size=16).hexdigest()
+    if layout.target is not None:
+        names['X'] = 'X'
+    return digest, names
+
+
+def restore_stats(stats, cached):
+    """
+    Puts the counters / timings of a cached solution (get()) back in a SearchStats, returns it
+    """
+    if cached['stats']:
+        for name, value in cached['stats']['counters'].items():
+            setattr(stats, name, value)
+        stats.timings.update(cached['stats']['timings'])
+        stats.timed = cached['stats'].get('timed', True)  # phase timings measured or just zeros
+    return stats
+
+
+class SolutionCache:
+    """
+    Solutions on disk (SQLite), keyed by fingerprint(puzzle) + the name of the solver
+    ('BFS', 'A* h2 slides cell'...: two solvers can give two optimal paths and their stats differ).
+    Stores the actions (canonical ids), the cost and the SearchStats counters of the first solve;
+    unsolvable puzzles are stored too (actions None).
+    When the file goes over max_bytes the least recently used solutions are removed.
+    The whole cache is emptied when SUCCESSOR_VERSION changes (other moves = other solutions).
+    """
+
+    def __init__(self, path=None, max_bytes=64 * 2 ** 20):
+        self.path = path or os.environ.get('RUSHHOUR_CACHE') or DEFAULT_PATH
+        self.max_bytes = max_bytes
+        self._touched = {}  # key -> last use not written yet (a hit doesn't write, put / close do)
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # check_same_thread=False: the UI opens the cache in its main thread and solves on worker
+        # threads (a cancelled search may still be storing its result, SQLite serializes the calls)
+        self.db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        # WAL + synchronous=NORMAL: a put does not wait for the disk (a hit writes nothing at all)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS solutions (key TEXT PRIMARY KEY, actions TEXT, "
+                        "cost INTEGER, stats TEXT, size INTEGER, last_used REAL)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS solutions_lru ON solutions (last_used)")
+        row = self.db.execute("SELECT value FROM meta WHERE name = 'successor_version'").fetchone()
+        if row is None or int(row[0]) != SUCCESSOR_VERSION:
+            self.db.execute("DELETE FROM solutions")
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('successor_version', ?)",
+                            (str(SUCCESSOR_VERSION),))
+        self.db.commit()
+
+    def close(self):
+        self._flush()
+        self.db.commit()
+        self.db.close()
+
+    def _flush(self):
+        if self._touched:
+            self.db.executemany("UPDATE solutions SET last_used = ? WHERE key = ?",
+                                [(used, key) for key, used in self._touched.items()])
+            self._touched = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def size(self):
+        return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM solutions").fetchone()[0]
+
+    def get(self, puzzle, solver):
+        """
+        {'actions': [...] with the ids of this puzzle (None: no solution), 'cost', 'stats'} or None
+        """
+        digest, names = fingerprint(puzzle)
+        key = f"{digest}:{solver}"
+        row = self.db.execute("SELECT actions, cost, stats FROM solutions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._touched[key] = time.time()
+        actions = None
+        if row[0] is not None:
+            ids = {canonical: vid for vid, canonical in names.items()}
+            actions = [(ids[action[0]],) + tuple(action[1:]) for action in json.loads(row[0])]
+        return {'actions': actions, 'cost': row[1], 'stats': json.loads(row[2]) if row[2] else None}
+
+    def put(self, puzzle, solver, actions, cost=None, stats=None):
+        # actions None = the search proved there is no solution
+        digest, names = fingerprint(puzzle)
+        key = f"{digest}:{solver}"
+        if actions is not None:
+            actions = json.dumps([[names[action[0]]] + list(action[1:]) for action in actions])
+        if stats is not None:
+            stats = json.dumps({'counters': {name: getattr(stats, name) for name in COUNTERS},
+                                'timings': stats.timings, 'timed': stats.timed})
+        size = len(key) + len(actions or '') + len(stats or '') + 32
+        self._flush()
+        self.db.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?)",
+                        (key, actions, cost, stats, size, time.time()))
+        self._evict()
+        self.db.commit()
+
+    def _evict(self):
+        total = self.size()
+        if total <= self.max_bytes:
+            return
+        for key, size in self.db.execute("SELECT key, size FROM solutions ORDER BY last_used").fetchall():
+            self.db.execute("DELETE FROM solutions WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def solve(self, puzzle, solver, search, cost=None, stats=None):
+        """
+        Goal node of search(puzzle) from the cache, or from the search (then stored).
+        stats (a SearchStats) gets the counters of the first solve on a hit.
+        A SearchStopped is returned as it is and not stored (the budget ran out, nothing is proved).
+        """
+        cached = self.get(puzzle, solver)
+        if cached is not None:
+            if stats is not None:
+                restore_stats(stats, cached)
+            if cached['actions'] is None:
+                return None
+            return replay(puzzle, cached['actions'], cost)
+
+        goal_node = search(puzzle)
+        if goal_node is None:
+            self.put(puzzle, solver, None, None, stats)
+        elif goal_node:
+            self.put(puzzle, solver, goal_node.getSolution(), goal_node.g, stats)
+        return goal_node
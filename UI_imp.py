@@ -1,16 +1,24 @@
 import pygame
 import sys
 import os
+import queue
+import threading
 from RushHourPuzzle import RushHourPuzzle
 from BFS import BFS
-from AStar import AStar, h1, h2, h3
-from Node import Node
+from AStar import AStar, h1, h2, h3, cell_cost
+from Budget import Budget, CancelToken
+from SearchStats import SearchStats
+from SolutionCache import SolutionCache, restore_stats
+from Comparison import ALGORITHMS, SharedCancelToken, compare_concurrently
 import time
 
 pygame.init()
 
 SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 750
+SOLVE_TIME_LIMIT = 60  # seconds, a search that takes longer gives up instead of freezing the window
+ANIMATION_BOARD = (500, 150, 80)  # x, y and cell size of the board of the animation screen
+BOARD_MARGINS = (80, 30, 60, 8)  # left, top, right, bottom of a board background (START / EXIT arrows)
 
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 pygame.display.set_caption("Rush Hour Puzzle Solver")
@@ -65,6 +73,23 @@ except:
     TEXT_FONT = pygame.font.Font(None, 28)
     SMALL_FONT = pygame.font.Font(None, 22)
 
+# Rendered texts: (font, text, antialias, color) -> Surface. Most labels are the same every frame,
+# font.render is the slow part of drawing them. Emptied when it gets big (timers, progress lines...)
+TEXT_CACHE = {}
+TEXT_CACHE_SIZE = 1024
+
+
+def render_text(font, text, antialias, color):
+    """font.render(text, antialias, color), rendered once per different text"""
+    key = (font, text, antialias, color)
+    surface = TEXT_CACHE.get(key)
+    if surface is None:
+        if len(TEXT_CACHE) >= TEXT_CACHE_SIZE:
+            TEXT_CACHE.clear()
+        surface = TEXT_CACHE[key] = font.render(text, antialias, color)
+    return surface
+
+
 # Game states
 STATE_WELCOME = "welcome"
 STATE_ALGORITHM_SELECT = "algorithm_select"
@@ -116,7 +141,7 @@ class Button:
             pygame.draw.rect(surface, glow_color, glow_rect, 2)
         
         # Draw text
-        text_surface = BUTTON_FONT.render(self.text, True, COLORS['text'])
+        text_surface = render_text(BUTTON_FONT, self.text, True, COLORS['text'])
         text_rect = text_surface.get_rect(center=self.rect.center)
         if self.is_pressed:
             text_rect.y += 2
@@ -147,17 +172,34 @@ class RushHourUI:
         self.last_update = pygame.time.get_ticks()
         self.solving_time = 0
         self.vehicle_color_map = {}
+        self.board_backgrounds = {}  # see board_background
+        self.car_sprites = {}  # see car_sprite
+        self.drawn_frame = None  # frame_key of the frame on screen
+        self.drawn_step = 0
         self.paused = False
         self.is_solving = False
         self.show_success = False
         self.waiting_dots = 0
         self.last_dot_update = pygame.time.get_ticks()
-        
-        # For comparison mode
+        self.slide_moves = False  # True: one action slides a vehicle k cells (toggled with M)
+        self.cache = SolutionCache()  # a file picked again (or the same layout) is not searched again
+        
+        # Background solving: the searches run on a worker thread, their messages (job, kind, ...)
+        # come back through worker_queue, read once per frame. Messages of an older job
+        # (cancelled, or left with BACK) are dropped.
+        self.worker_queue = queue.Queue()
+        self.worker_job = 0
+        self.cancel_token = None
+        self.progress = None  # last progress snapshot of the running search (see Budget)
+        self.running_algorithm = None
+        self.worker_error = None  # why the last worker failed, shown until the next search
+        
+        # For comparison mode (one process per algorithm, the rows come in as they finish)
         self.comparison_results = {}
         self.comparison_paths = {}  # Store solution paths for each algorithm
         self.comparison_steps = {}  # Current step for each algorithm
         self.comparison_solving = False
+        self.comparison_progress = {}  # algorithm -> last progress snapshot of its process
         
         # Available example files
         self.example_files = [
@@ -225,6 +267,12 @@ class RushHourUI:
         self.pause_button = Button(SCREEN_WIDTH - 160, 30, 130, 50, "PAUSE", COLORS['warning'])
         self.restart_button = Button(SCREEN_WIDTH - 160, 90, 130, 50, "RESTART", COLORS['secondary'])
         
+        # Stops the running search (waiting screen)
+        self.cancel_button = Button(
+            SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 200, 200, 60,
+            "CANCEL", COLORS['secondary']
+        )
+        
         # Success popup button
         self.continue_button = Button(
             SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 80, 200, 60,
@@ -276,11 +324,11 @@ class RushHourUI:
             pygame.draw.line(screen, COLORS['bg_light'], (0, y), (SCREEN_WIDTH, y), 1)
         
         # Title with pixel art style
-        title_text = TITLE_FONT.render("RUSH HOUR GAME SOLVER", True, COLORS['text'])
+        title_text = render_text(TITLE_FONT, "RUSH HOUR GAME SOLVER", True, COLORS['text'])
         title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, 250))
         
         # Draw title border (pixel art shadow)
-        shadow_text = TITLE_FONT.render("RUSH HOUR GAME SOLVER", True, COLORS['border'])
+        shadow_text = render_text(TITLE_FONT, "RUSH HOUR GAME SOLVER", True, COLORS['border'])
         screen.blit(shadow_text, (title_rect.x + 4, title_rect.y + 4))
         screen.blit(title_text, title_rect)
         
@@ -313,19 +361,25 @@ class RushHourUI:
         self.back_button.draw(screen)
         
         # Title
-        title_text = TITLE_FONT.render("SELECT ALGORITHM", True, COLORS['text'])
+        title_text = render_text(TITLE_FONT, "SELECT ALGORITHM", True, COLORS['text'])
         title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, 120))
         
         # Draw title with pixel border
-        shadow_text = TITLE_FONT.render("SELECT ALGORITHM", True, COLORS['border'])
+        shadow_text = render_text(TITLE_FONT, "SELECT ALGORITHM", True, COLORS['border'])
         screen.blit(shadow_text, (title_rect.x + 3, title_rect.y + 3))
         screen.blit(title_text, title_rect)
         
         # Subtitle
-        subtitle_text = TEXT_FONT.render("Choose a search algorithm to solve the puzzle", True, COLORS['text_dark'])
+        subtitle_text = render_text(TEXT_FONT, "Choose a search algorithm to solve the puzzle", True, COLORS['text_dark'])
         subtitle_rect = subtitle_text.get_rect(center=(SCREEN_WIDTH // 2, 200))
         screen.blit(subtitle_text, subtitle_rect)
         
+        # Successor mode (single cell moves or multi-cell slides)
+        mode = "slides (k cells per move)" if self.slide_moves else "single cell"
+        mode_text = render_text(SMALL_FONT, f"Moves: {mode} - press M to switch", True, COLORS['warning'])
+        mode_rect = mode_text.get_rect(center=(SCREEN_WIDTH // 2, 235))
+        screen.blit(mode_text, mode_rect)
+        
         # Draw algorithm buttons with proper spacing
         self.bfs_button.draw(screen)
         self.astar_h1_button.draw(screen)
@@ -340,10 +394,10 @@ class RushHourUI:
         self.back_button.draw(screen)
         
         # Title
-        title_text = TITLE_FONT.render("SELECT PUZZLE", True, COLORS['text'])
+        title_text = render_text(TITLE_FONT, "SELECT PUZZLE", True, COLORS['text'])
         title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, 120))
         
-        shadow_text = TITLE_FONT.render("SELECT PUZZLE", True, COLORS['border'])
+        shadow_text = render_text(TITLE_FONT, "SELECT PUZZLE", True, COLORS['border'])
         screen.blit(shadow_text, (title_rect.x + 3, title_rect.y + 3))
         screen.blit(title_text, title_rect)
         
@@ -357,10 +411,15 @@ class RushHourUI:
         }
         algo_name = algo_names.get(self.selected_algorithm, 'Unknown')
         
-        subtitle_text = TEXT_FONT.render(f"Algorithm: {algo_name}", True, COLORS['accent'])
+        subtitle_text = render_text(TEXT_FONT, f"Algorithm: {algo_name}", True, COLORS['accent'])
         subtitle_rect = subtitle_text.get_rect(center=(SCREEN_WIDTH // 2, 180))
         screen.blit(subtitle_text, subtitle_rect)
         
+        # The last search failed (back here from the solving screen)
+        if self.worker_error:
+            error_text = render_text(SMALL_FONT, f"Search failed: {self.worker_error}", True, COLORS['secondary'])
+            screen.blit(error_text, error_text.get_rect(center=(SCREEN_WIDTH // 2, 215)))
+        
         # Draw file selection buttons
         for btn in self.file_buttons:
             btn.draw(screen)
@@ -384,10 +443,24 @@ class RushHourUI:
                     # Vertical vehicles
                     self.vehicle_color_map[vid] = VERTICAL_COLORS.get(length, VERTICAL_COLORS[2])
     
-    def draw_board(self, state, x_offset, y_offset, cell_size=70):
-        """Draw the Rush Hour board in pixel art style"""
+    def board_background(self, state, cell_size):
+        """
+        Static part of a board (border, START / EXIT arrows, grid, walls) drawn once per
+        (size, walls, cell_size) -> (surface, (left, top)): the surface goes at
+        (x_offset - left, y_offset - top), the margins hold the arrows and their labels
+        """
         board_width = state.board_width
         board_height = state.board_height
+        walls = tuple(state.walls) if hasattr(state, 'walls') and state.walls else ()
+        key = (board_height, board_width, walls, cell_size)
+        cached = self.board_backgrounds.get(key)
+        if cached is not None:
+            return cached
+        
+        left, top, right, bottom = BOARD_MARGINS
+        surface = pygame.Surface((left + board_width * cell_size + right, top + board_height * cell_size + bottom))
+        surface.fill(COLORS['bg'])
+        x_offset, y_offset = left, top
         
         # Draw board background with pixel border
         board_rect = pygame.Rect(
@@ -395,14 +468,14 @@ class RushHourUI:
             board_width * cell_size + 16,
             board_height * cell_size + 16
         )
-        pygame.draw.rect(screen, COLORS['border'], board_rect)
+        pygame.draw.rect(surface, COLORS['border'], board_rect)
         
         inner_rect = pygame.Rect(
             x_offset, y_offset,
             board_width * cell_size,
             board_height * cell_size
         )
-        pygame.draw.rect(screen, COLORS['bg_light'], inner_rect)
+        pygame.draw.rect(surface, COLORS['bg_light'], inner_rect)
         
         # Draw START indicator (pixel art arrow) - on the left side
         start_row = board_height // 2 - 1
@@ -410,8 +483,8 @@ class RushHourUI:
         start_y = y_offset + start_row * cell_size + cell_size // 2
         
         # Draw start label
-        start_text = SMALL_FONT.render("START", True, COLORS['start'])
-        screen.blit(start_text, (start_x, start_y - 30))
+        start_text = render_text(SMALL_FONT, "START", True, COLORS['start'])
+        surface.blit(start_text, (start_x, start_y - 30))
         
         # Draw arrow pointing right (pixel art style)
         start_arrow_points = [
@@ -419,7 +492,7 @@ class RushHourUI:
             (start_x + 30, start_y - 10),
             (start_x + 30, start_y + 10)
         ]
-        pygame.draw.polygon(screen, COLORS['start'], start_arrow_points)
+        pygame.draw.polygon(surface, COLORS['start'], start_arrow_points)
         
         # Draw exit indicator (pixel art arrow)
         exit_row = board_height // 2 - 1
@@ -427,8 +500,8 @@ class RushHourUI:
         exit_y = y_offset + exit_row * cell_size + cell_size // 2
         
         # Draw exit label
-        exit_text = SMALL_FONT.render("EXIT", True, COLORS['exit'])
-        screen.blit(exit_text, (exit_x, exit_y - 30))
+        exit_text = render_text(SMALL_FONT, "EXIT", True, COLORS['exit'])
+        surface.blit(exit_text, (exit_x, exit_y - 30))
         
         # Draw arrow (pixel art style)
         arrow_points = [
@@ -436,17 +509,17 @@ class RushHourUI:
             (exit_x + 20, exit_y - 10),
             (exit_x + 20, exit_y + 10)
         ]
-        pygame.draw.polygon(screen, COLORS['exit'], arrow_points)
+        pygame.draw.polygon(surface, COLORS['exit'], arrow_points)
         
         # Draw grid (pixel art style)
         for row in range(board_height + 1):
             y = y_offset + row * cell_size
-            pygame.draw.line(screen, COLORS['grid'],
+            pygame.draw.line(surface, COLORS['grid'],
                            (x_offset, y),
                            (x_offset + board_width * cell_size, y), 2)
         for col in range(board_width + 1):
             x = x_offset + col * cell_size
-            pygame.draw.line(screen, COLORS['grid'],
+            pygame.draw.line(surface, COLORS['grid'],
                            (x, y_offset),
                            (x, y_offset + board_height * cell_size), 2)
         
@@ -462,66 +535,81 @@ class RushHourUI:
                 
                 # Draw wall with brick pattern
                 # Base color - dark gray
-                pygame.draw.rect(screen, (60, 60, 60), wall_rect)
+                pygame.draw.rect(surface, (60, 60, 60), wall_rect)
                 
                 # Draw brick lines (pixel art style)
                 brick_color = (80, 80, 80)
                 # Horizontal lines
-                pygame.draw.line(screen, brick_color,
+                pygame.draw.line(surface, brick_color,
                                (wall_rect.x, wall_rect.y + wall_rect.height // 3),
                                (wall_rect.x + wall_rect.width, wall_rect.y + wall_rect.height // 3), 2)
-                pygame.draw.line(screen, brick_color,
+                pygame.draw.line(surface, brick_color,
                                (wall_rect.x, wall_rect.y + 2 * wall_rect.height // 3),
                                (wall_rect.x + wall_rect.width, wall_rect.y + 2 * wall_rect.height // 3), 2)
                 
                 # Vertical lines offset for brick pattern
-                pygame.draw.line(screen, brick_color,
+                pygame.draw.line(surface, brick_color,
                                (wall_rect.x + wall_rect.width // 2, wall_rect.y),
                                (wall_rect.x + wall_rect.width // 2, wall_rect.y + wall_rect.height // 3), 2)
-                pygame.draw.line(screen, brick_color,
+                pygame.draw.line(surface, brick_color,
                                (wall_rect.x + wall_rect.width // 3, wall_rect.y + wall_rect.height // 3),
                                (wall_rect.x + wall_rect.width // 3, wall_rect.y + 2 * wall_rect.height // 3), 2)
-                pygame.draw.line(screen, brick_color,
+                pygame.draw.line(surface, brick_color,
                                (wall_rect.x + 2 * wall_rect.width // 3, wall_rect.y + wall_rect.height // 3),
                                (wall_rect.x + 2 * wall_rect.width // 3, wall_rect.y + 2 * wall_rect.height // 3), 2)
-                pygame.draw.line(screen, brick_color,
+                pygame.draw.line(surface, brick_color,
                                (wall_rect.x + wall_rect.width // 2, wall_rect.y + 2 * wall_rect.height // 3),
                                (wall_rect.x + wall_rect.width // 2, wall_rect.y + wall_rect.height), 2)
                 
                 # Border
-                pygame.draw.rect(screen, COLORS['border'], wall_rect, 3)
+                pygame.draw.rect(surface, COLORS['border'], wall_rect, 3)
                 
                 # Draw # symbol on wall
-                wall_text = TEXT_FONT.render("#", True, (100, 100, 100))
+                wall_text = render_text(TEXT_FONT, "#", True, (100, 100, 100))
                 wall_text_rect = wall_text.get_rect(center=wall_rect.center)
-                screen.blit(wall_text, wall_text_rect)
+                surface.blit(wall_text, wall_text_rect)
+        
+        self.board_backgrounds[key] = (surface, (left, top))
+        return self.board_backgrounds[key]
+    
+    def car_sprite(self, color, length, orientation, cell_size):
+        """Pixel art car drawn once per (color, length, orientation, cell_size)"""
+        key = (color, length, orientation, cell_size)
+        sprite = self.car_sprites.get(key)
+        if sprite is None:
+            along = length * cell_size - 16
+            across = cell_size - 16
+            width, height = (along, across) if orientation == 'H' else (across, along)
+            sprite = pygame.Surface((width, height))
+            self.draw_pixel_car(sprite, 0, 0, width, height, color, orientation == 'H')
+            self.car_sprites[key] = sprite
+        return sprite
+    
+    def vehicle_rect(self, vehicle, x_offset, y_offset, cell_size):
+        """Screen rectangle of a vehicle of the board drawn at (x_offset, y_offset)"""
+        length = vehicle['length'] * cell_size - 16
+        if vehicle['orientation'] == 'H':
+            width, height = length, cell_size - 16
+        else:
+            width, height = cell_size - 16, length
+        return pygame.Rect(x_offset + vehicle['x'] * cell_size + 8, y_offset + vehicle['y'] * cell_size + 8,
+                           width, height)
+    
+    def draw_board(self, state, x_offset, y_offset, cell_size=70):
+        """Draw the Rush Hour board in pixel art style: the cached background then one sprite per car"""
+        background, (left, top) = self.board_background(state, cell_size)
+        screen.blit(background, (x_offset - left, y_offset - top))
         
         # Draw vehicles with pixel art style
         for vehicle in state.vehicles:
             vid = vehicle['id']
-            x = vehicle['x']
-            y = vehicle['y']
-            length = vehicle['length']
-            orientation = vehicle['orientation']
-            
             color = self.vehicle_color_map.get(vid, COLORS['primary'])
-            
-            if orientation == 'H':
-                car_x = x_offset + x * cell_size + 8
-                car_y = y_offset + y * cell_size + 8
-                car_width = length * cell_size - 16
-                car_height = cell_size - 16
-                self.draw_pixel_car(screen, car_x, car_y, car_width, car_height, color, True)
-            else:
-                car_x = x_offset + x * cell_size + 8
-                car_y = y_offset + y * cell_size + 8
-                car_width = cell_size - 16
-                car_height = length * cell_size - 16
-                self.draw_pixel_car(screen, car_x, car_y, car_width, car_height, color, False)
+            car_rect = self.vehicle_rect(vehicle, x_offset, y_offset, cell_size)
+            screen.blit(self.car_sprite(color, vehicle['length'], vehicle['orientation'], cell_size), car_rect)
             
             # Draw vehicle ID with pixel font
-            text = TEXT_FONT.render(vid, True, COLORS['text'])
-            text_rect = text.get_rect(center=(car_x + car_width // 2, car_y + car_height // 2))
+            text = render_text(TEXT_FONT, vid, True, COLORS['text'])
+            text_rect = text.get_rect(center=car_rect.center)
             screen.blit(text, text_rect)
     
     def draw_animation_screen(self):
@@ -537,6 +625,47 @@ class RushHourUI:
         self.pause_button.draw(screen)
         self.restart_button.draw(screen)
         
+        self.draw_info_panel()
+        
+        # Draw board (right side, larger and centered better)
+        if self.solution_path and self.current_step < len(self.solution_path):
+            board_x, board_y, cell_size = ANIMATION_BOARD
+            self.draw_board(self.solution_path[self.current_step], board_x, board_y, cell_size)
+        
+        self.draw_progress_bar()
+        
+        # Draw success popup if finished
+        if self.show_success:
+            self.draw_success_popup()
+    
+    def draw_animation_step(self, previous_step):
+        """
+        Redraws only what changes from previous_step to current_step (the info panel, the cars that moved,
+        the progress bar) over the last full frame, returns the dirty rectangles for pygame.display.update
+        """
+        board_x, board_y, cell_size = ANIMATION_BOARD
+        state = self.solution_path[self.current_step]
+        before = {vehicle['id']: vehicle for vehicle in self.solution_path[previous_step].vehicles}
+        moved = None
+        for vehicle in state.vehicles:
+            old = before.get(vehicle['id'])
+            if old is None or (old['x'], old['y']) != (vehicle['x'], vehicle['y']):
+                rect = self.vehicle_rect(vehicle, board_x, board_y, cell_size)
+                if old is not None:
+                    rect.union_ip(self.vehicle_rect(old, board_x, board_y, cell_size))
+                moved = rect if moved is None else moved.union(rect)
+        
+        dirty = [self.draw_info_panel(), self.draw_progress_bar()]
+        if moved is not None:
+            # background + sprites again but clipped: only the cells of the moved cars are touched
+            screen.set_clip(moved)
+            self.draw_board(state, board_x, board_y, cell_size)
+            screen.set_clip(None)
+            dirty.append(moved)
+        return dirty
+    
+    def draw_info_panel(self):
+        """Algorithm, puzzle, moves and current action (left side), returns its rectangle"""
         # Algorithm name and info panel (left side)
         algo_names = {
             'bfs': 'BFS Algorithm',
@@ -552,13 +681,13 @@ class RushHourUI:
         pygame.draw.rect(screen, COLORS['border'], panel_rect, 3)
         
         # Title in panel
-        title_text = SUBTITLE_FONT.render(algo_name, True, COLORS['text'])
+        title_text = render_text(SUBTITLE_FONT, algo_name, True, COLORS['text'])
         screen.blit(title_text, (50, 120))
         
         # Draw puzzle file name
         if self.selected_file:
             file_name = os.path.basename(self.selected_file)
-            file_text = TEXT_FONT.render(f"Puzzle: {file_name}", True, COLORS['text_dark'])
+            file_text = render_text(TEXT_FONT, f"Puzzle: {file_name}", True, COLORS['text_dark'])
             screen.blit(file_text, (50, 170))
         
         # Stats
@@ -571,10 +700,10 @@ class RushHourUI:
             ]
             
             for label, value in stats:
-                label_text = SMALL_FONT.render(label + ":", True, COLORS['text_dark'])
+                label_text = render_text(SMALL_FONT, label + ":", True, COLORS['text_dark'])
                 screen.blit(label_text, (50, stats_y))
                 
-                value_text = TEXT_FONT.render(value, True, COLORS['accent'])
+                value_text = render_text(TEXT_FONT, value, True, COLORS['accent'])
                 screen.blit(value_text, (50, stats_y + 22))
                 
                 stats_y += 60
@@ -582,31 +711,26 @@ class RushHourUI:
             # Current action
             if self.current_step > 0 and self.solution_actions:
                 action_y = 420
-                action_label = SMALL_FONT.render("Current Action:", True, COLORS['text_dark'])
+                action_label = render_text(SMALL_FONT, "Current Action:", True, COLORS['text_dark'])
                 screen.blit(action_label, (50, action_y))
                 
                 action = self.solution_actions[self.current_step - 1]
                 directions = {'L': 'LEFT', 'R': 'RIGHT', 'U': 'UP', 'D': 'DOWN'}
-                action_text = TEXT_FONT.render(
-                    f"{action[0]} -> {directions.get(action[1], action[1])}",
+                distance = f" x{action[2]}" if len(action) > 2 else ""  # multi-cell slide
+                action_text = render_text(
+                    TEXT_FONT, f"{action[0]} -> {directions.get(action[1], action[1])}{distance}",
                     True, COLORS['warning']
                 )
                 screen.blit(action_text, (50, action_y + 25))
-        
-        # Draw board (right side, larger and centered better)
-        if self.solution_path and self.current_step < len(self.solution_path):
-            current_state = self.solution_path[self.current_step]
-            board_x = 500
-            board_y = 150
-            self.draw_board(current_state, board_x, board_y, 80)
-        
-        # Progress bar at bottom
+        return panel_rect
+    
+    def draw_progress_bar(self):
+        """Progress bar at the bottom of the animation, returns its rectangle"""
+        bar_width = 800
+        bar_height = 30
+        bar_x = (SCREEN_WIDTH - bar_width) // 2
+        bar_y = SCREEN_HEIGHT - 80
         if self.solution_path:
-            bar_width = 800
-            bar_height = 30
-            bar_x = (SCREEN_WIDTH - bar_width) // 2
-            bar_y = SCREEN_HEIGHT - 80
-            
             # Background
             pygame.draw.rect(screen, COLORS['bg_light'], (bar_x, bar_y, bar_width, bar_height))
             pygame.draw.rect(screen, COLORS['border'], (bar_x, bar_y, bar_width, bar_height), 3)
@@ -618,13 +742,10 @@ class RushHourUI:
                            (bar_x + 3, bar_y + 3, progress_width, bar_height - 6))
             
             # Percentage text
-            percent_text = TEXT_FONT.render(f"{int(progress * 100)}%", True, COLORS['text'])
+            percent_text = render_text(TEXT_FONT, f"{int(progress * 100)}%", True, COLORS['text'])
             percent_rect = percent_text.get_rect(center=(bar_x + bar_width // 2, bar_y + bar_height // 2))
             screen.blit(percent_text, percent_rect)
-        
-        # Draw success popup if finished
-        if self.show_success:
-            self.draw_success_popup()
+        return pygame.Rect(bar_x, bar_y, bar_width, bar_height)
     
     def draw_waiting_indicator(self):
         """Draw animated waiting screen while algorithm is solving"""
@@ -641,12 +762,12 @@ class RushHourUI:
         dots = "." * self.waiting_dots
         full_message = message + dots
         
-        message_text = TITLE_FONT.render(full_message, True, COLORS['text'])
+        message_text = render_text(TITLE_FONT, full_message, True, COLORS['text'])
         message_rect = message_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
         screen.blit(message_text, message_rect)
         
         # Subtitle
-        subtitle_text = SUBTITLE_FONT.render("Wait for the magic to happen...", True, COLORS['text_dark'])
+        subtitle_text = render_text(SUBTITLE_FONT, "Wait for the magic to happen...", True, COLORS['text_dark'])
         subtitle_rect = subtitle_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 20))
         screen.blit(subtitle_text, subtitle_rect)
         
@@ -660,9 +781,23 @@ class RushHourUI:
             a = angle + i * 45
             end_x = spinner_x + int(spinner_size * pygame.math.Vector2(1, 0).rotate(a).x)
             end_y = spinner_y + int(spinner_size * pygame.math.Vector2(1, 0).rotate(a).y)
-            alpha = 255 - i * 30
             color = tuple(max(0, c - i * 20) for c in COLORS['accent'][:3])
             pygame.draw.circle(screen, color, (end_x, end_y), 6)
+        
+        # Progress of the search (sent by the worker) and the cancel button
+        if self.progress:
+            progress_text = render_text(TEXT_FONT, self.progress_text(), True, COLORS['text_dark'])
+            progress_rect = progress_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 165))
+            screen.blit(progress_text, progress_rect)
+        self.cancel_button.draw(screen)
+    
+    def progress_text(self):
+        """One line with the last progress snapshot of the running search"""
+        progress = self.progress
+        text = f"Expanded {progress['expanded']:,}  |  depth {progress['depth']}"
+        if self.running_algorithm != 'BFS' and progress['f'] is not None:
+            text += f"  |  f {progress['f']}"
+        return text + f"  |  {progress['elapsed']:.1f}s"
     
     def draw_success_popup(self):
         """Draw success popup when puzzle is solved"""
@@ -686,21 +821,21 @@ class RushHourUI:
         pygame.draw.rect(screen, COLORS['bg'], popup_rect)
         
         # Success title
-        success_text = TITLE_FONT.render("SUCCESS!", True, COLORS['success'])
+        success_text = render_text(TITLE_FONT, "SUCCESS!", True, COLORS['success'])
         success_rect = success_text.get_rect(center=(SCREEN_WIDTH // 2, popup_y + 70))
         screen.blit(success_text, success_rect)
         
         # Stats
         if self.solution_path:
-            moves_text = SUBTITLE_FONT.render(
-                f"Solved in {len(self.solution_path) - 1} moves",
+            moves_text = render_text(
+                SUBTITLE_FONT, f"Solved in {len(self.solution_path) - 1} moves",
                 True, COLORS['text']
             )
             moves_rect = moves_text.get_rect(center=(SCREEN_WIDTH // 2, popup_y + 140))
             screen.blit(moves_text, moves_rect)
             
-            time_text = TEXT_FONT.render(
-                f"Time: {self.solving_time:.3f}s",
+            time_text = render_text(
+                TEXT_FONT, f"Time: {self.solving_time:.3f}s",
                 True, COLORS['text_dark']
             )
             time_rect = time_text.get_rect(center=(SCREEN_WIDTH // 2, popup_y + 180))
@@ -716,14 +851,14 @@ class RushHourUI:
         self.back_button.draw(screen)
         
         # Title
-        title_text = TITLE_FONT.render("COMPARISON MODE", True, COLORS['text'])
+        title_text = render_text(TITLE_FONT, "COMPARISON MODE", True, COLORS['text'])
         title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, 80))
-        shadow_text = TITLE_FONT.render("COMPARISON MODE", True, COLORS['border'])
+        shadow_text = render_text(TITLE_FONT, "COMPARISON MODE", True, COLORS['border'])
         screen.blit(shadow_text, (title_rect.x + 3, title_rect.y + 3))
         screen.blit(title_text, title_rect)
         
-        # Show waiting indicator while comparing
-        if self.comparison_solving:
+        # Show waiting indicator while comparing, until the first result or progress arrives
+        if self.comparison_solving and not self.comparison_results and not self.comparison_progress:
             # Update dots animation
             current_time = pygame.time.get_ticks()
             if current_time - self.last_dot_update > 500:
@@ -735,12 +870,17 @@ class RushHourUI:
             dots = "." * self.waiting_dots
             full_message = message + dots
             
-            message_text = SUBTITLE_FONT.render(full_message, True, COLORS['text'])
+            message_text = render_text(SUBTITLE_FONT, full_message, True, COLORS['text'])
             message_rect = message_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 50))
             screen.blit(message_text, message_rect)
             
-            # Subtitle
-            subtitle_text = TEXT_FONT.render("Running BFS, A* h1, A* h2, A* h3", True, COLORS['text_dark'])
+            # Subtitle: the algorithm running now and its progress
+            subtitle = "Running BFS, A* h1, A* h2, A* h3"
+            if self.running_algorithm:
+                subtitle = f"Running {self.running_algorithm}"
+                if self.progress:
+                    subtitle += f": {self.progress_text()}"
+            subtitle_text = render_text(TEXT_FONT, subtitle, True, COLORS['text_dark'])
             subtitle_rect = subtitle_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 20))
             screen.blit(subtitle_text, subtitle_rect)
             
@@ -757,119 +897,280 @@ class RushHourUI:
                 color = tuple(max(0, c - i * 20) for c in COLORS['accent'][:3])
                 pygame.draw.circle(screen, color, (end_x, end_y), 6)
         
-        # Show comparison results when done
-        elif hasattr(self, 'comparison_results') and self.comparison_results:
-            y_offset = 200
-            col_widths = [300, 150, 150]
+        # Show comparison results, filled in as they arrive
+        elif self.comparison_results or self.comparison_solving:
+            y_offset = 170
+            col_widths = [170, 130, 110, 130, 140, 140, 110]
             
             # Header
-            headers = ["Algorithm", "Moves", "Time (s)"]
-            x = 200
+            headers = ["Algorithm", "Moves", "Time (s)", "Expanded", "Generated", "Peak Open", "EBF"]
+            x = 90
             for i, header in enumerate(headers):
-                text = SUBTITLE_FONT.render(header, True, COLORS['accent'])
+                text = render_text(BUTTON_FONT, header, True, COLORS['accent'])
                 screen.blit(text, (x, y_offset))
                 x += col_widths[i]
             
-            y_offset += 70
+            y_offset += 60
             
-            # Results
-            for algo, result in self.comparison_results.items():
-                x = 200
-                
-                # Algorithm name
-                algo_text = TEXT_FONT.render(algo, True, COLORS['text'])
-                screen.blit(algo_text, (x, y_offset))
-                x += col_widths[0]
+            # Results (in the usual order), the searches still running show their progress
+            for algo in ALGORITHMS:
+                result = self.comparison_results.get(algo)
+                if result is None:
+                    progress = self.comparison_progress.get(algo)
+                    if not self.comparison_solving:
+                        continue
+                    columns = [algo, "running" + "." * self.waiting_dots]
+                    if progress:
+                        columns += [f"{progress['elapsed']:.1f}", str(progress['expanded'])]
+                    x = 90
+                    for i, column in enumerate(columns):
+                        column_text = render_text(TEXT_FONT, column, True, COLORS['text_dark'])
+                        screen.blit(column_text, (x, y_offset))
+                        x += col_widths[i]
+                    y_offset += 80
+                    continue
+                stats = result.get('stats')
+                elapsed = f"{result['time']:.3f}" if result['time'] is not None else "-"
+                columns = [algo, str(result['moves']), elapsed + (" *" if result.get('cached') else "")]
+                if stats is not None:
+                    ebf = stats.branching_factor
+                    columns += [str(stats.expanded), str(stats.generated), str(stats.peak_open),
+                                f"{ebf:.3f}" if ebf is not None else "-"]
                 
-                # Moves
-                moves_text = TEXT_FONT.render(str(result['moves']), True, COLORS['text'])
-                screen.blit(moves_text, (x, y_offset))
-                x += col_widths[1]
+                x = 90
+                for i, column in enumerate(columns):
+                    column_text = render_text(TEXT_FONT, column, True, COLORS['text'])
+                    screen.blit(column_text, (x, y_offset))
+                    x += col_widths[i]
                 
-                # Time
-                time_text = TEXT_FONT.render(f"{result['time']:.3f}", True, COLORS['text'])
-                screen.blit(time_text, (x, y_offset))
+                # Second line: why the search failed, or the duplicates (and where the time went if the run
+                # was instrumented)
+                if result.get('error'):
+                    error_text = render_text(SMALL_FONT, result['error'], True, COLORS['secondary'])
+                    screen.blit(error_text, (90 + col_widths[0], y_offset + 30))
+                elif stats is not None:
+                    timings = stats.timings
+                    details = (f"duplicates open {stats.duplicates_open} / closed {stats.duplicates_closed}, "
+                               f"reopened {stats.reopened}, peak closed {stats.peak_closed}")
+                    if result.get('cached'):
+                        details = "* cached: time of the first solve  |  " + details
+                    if stats.timed:
+                        details += (f"  |  successors {timings['successors']:.3f}s, h {timings['heuristic']:.3f}s, "
+                                    f"queue {timings['queue']:.3f}s")
+                    details_text = render_text(SMALL_FONT, details, True, COLORS['text_dark'])
+                    screen.blit(details_text, (90 + col_widths[0], y_offset + 30))
                 
-                y_offset += 50
+                y_offset += 80
+        
+        # The comparison itself failed (the rows that arrived before stay)
+        if self.worker_error:
+            error_text = render_text(TEXT_FONT, f"Comparison failed: {self.worker_error}", True, COLORS['secondary'])
+            screen.blit(error_text, error_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 60)))
     
-    def solve_puzzle(self, algorithm):
-        """Solve the puzzle with selected algorithm"""
-        if not self.selected_file:
-            return False
-        
-        self.is_solving = True
-        self.puzzle = RushHourPuzzle(self.selected_file)
-        self.assign_vehicle_colors(self.puzzle.vehicles)
-        
-        start_time = time.time()
-        
-        if algorithm == 'bfs':
-            goal_node = BFS(
-                self.puzzle,
-                lambda state: state.successorFunction(),
-                lambda state: state.isGoal()
-            )
+    def frame_key(self):
+        """
+        What the current screen shows, None for the screens that move by themselves (waiting dots,
+        spinner). run() draws a frame only when the key changed, a new animation step alone only
+        redraws what moved (draw_animation_step): nothing is drawn while nothing changes
+        """
+        buttons = {
+            STATE_WELCOME: [self.start_button],
+            STATE_ALGORITHM_SELECT: [self.back_button, self.bfs_button, self.astar_h1_button, self.astar_h2_button,
+                                     self.astar_h3_button, self.compare_button],
+            STATE_FILE_SELECT: [self.back_button] + self.file_buttons,
+            STATE_ANIMATION: [self.back_button, self.pause_button, self.restart_button, self.continue_button],
+        }.get(self.state)
+        if buttons is None or self.is_solving:
+            return None
+        return (self.state, self.selected_algorithm, self.slide_moves, self.worker_job, self.paused, self.show_success,
+                self.worker_error,
+                tuple((btn.text, btn.current_color, btn.is_pressed, btn.is_hovered_flag) for btn in buttons))
+    
+    def successors(self, state):
+        """Successor function of the selected mode"""
+        if self.slide_moves:
+            return state.iterSlideSuccessors()
+        return state.iterSuccessors()
+    
+    def solver_name(self, algorithm):
+        """Key of the solver in the SolutionCache, the same as solve_puzzle.py"""
+        name = 'BFS' if algorithm == 'bfs' else f"A* {algorithm}"
+        if self.slide_moves:
+            name += " slides" if algorithm == 'bfs' else " slides cell_cost"
+        return name
+    
+    def start_solving(self):
+        """Start the search (or the comparison) of the selected file on a worker thread"""
+        self.cancel_solving()
+        self.worker_job += 1
+        self.progress = None
+        self.running_algorithm = None
+        self.worker_error = None
+        if self.selected_algorithm == 'compare':
+            self.cancel_token = SharedCancelToken()  # read by the search processes
+            self.comparison_solving = True
+            self.comparison_results = {}
+            self.comparison_progress = {}
+            target = self.compare_all_algorithms
+            args = (self.worker_job, self.cancel_token)
         else:
-            heuristic = {'h1': h1, 'h2': h2, 'h3': h3}[algorithm]
-            goal_node = AStar(
-                self.puzzle,
-                lambda state: state.successorFunction(),
-                lambda state: state.isGoal(),
-                heuristic
-            )
-        
-        self.solving_time = time.time() - start_time
+            self.cancel_token = CancelToken()
+            self.is_solving = True
+            self.puzzle = RushHourPuzzle(self.selected_file)
+            self.assign_vehicle_colors(self.puzzle.vehicles)
+            target = self.solve_puzzle
+            args = (self.selected_algorithm, self.worker_job, self.cancel_token)
+        threading.Thread(target=target, args=args, daemon=True).start()
+    
+    def cancel_solving(self):
+        """Stop the running search, if any (its thread sees the token at its next expansion)"""
+        if self.cancel_token is not None:
+            self.cancel_token.cancel()
+            self.cancel_token = None
         self.is_solving = False
-        
-        if goal_node:
-            self.solution_path = goal_node.getPath()
-            self.solution_actions = goal_node.getSolution()
-            self.current_step = 0
-            return True
-        return False
+        self.comparison_solving = False
     
-    def compare_all_algorithms(self):
-        """Compare all algorithms on selected puzzle"""
-        if not self.selected_file:
-            return
-        
-        self.comparison_results = {}
-        
-        algorithms = [
-            ('BFS', 'bfs', None),
-            ('A* h1', 'h1', h1),
-            ('A* h2', 'h2', h2),
-            ('A* h3', 'h3', h3)
-        ]
-        
-        for name, algo_key, heuristic in algorithms:
-            puzzle = RushHourPuzzle(self.selected_file)
+    def solve_budget(self, job, token):
+        """Budget of a worker search: time limit, cancel flag, progress sent to the UI"""
+        report = lambda snapshot: self.worker_queue.put((job, 'progress', snapshot))
+        return Budget(max_time=SOLVE_TIME_LIMIT, cancel=token, progress=report)
+    
+    def poll_worker(self):
+        """Messages of the worker, once per frame: progress, results, end of the search"""
+        while True:
+            try:
+                message = self.worker_queue.get_nowait()
+            except queue.Empty:
+                return
+            job, kind = message[:2]
+            if job != self.worker_job:
+                continue  # an old search still finishing
+            if kind == 'progress':
+                self.progress = message[2]
+            elif kind == 'running':
+                self.running_algorithm = message[2]
+                self.progress = None
+            elif kind == 'solved':
+                goal_node, self.solving_time = message[2:]
+                self.is_solving = False
+                self.cancel_token = None
+                # a SearchStopped is falsy too: back to the file selection
+                if goal_node and self.state == STATE_SOLVING:
+                    # lazy: the initial state + the actions, the animation makes each step when it shows it
+                    self.solution_path = goal_node.getPathView()
+                    self.solution_actions = goal_node.getSolution()
+                    self.current_step = 0
+                    self.state = STATE_ANIMATION
+                    self.last_update = pygame.time.get_ticks()
+                elif self.state == STATE_SOLVING:
+                    self.state = STATE_FILE_SELECT
+            elif kind == 'compare_progress':
+                self.comparison_progress[message[2]] = message[3]
+            elif kind == 'result':
+                self.comparison_results[message[2]] = message[3]
+            elif kind == 'compared':
+                self.comparison_solving = False
+                self.running_algorithm = None
+                self.cancel_token = None
+            elif kind == 'failed':
+                # the worker raised: its message is shown, the search (or comparison) is over
+                self.worker_error = message[2]
+                self.is_solving = False
+                self.comparison_solving = False
+                self.running_algorithm = None
+                self.cancel_token = None
+                if self.state == STATE_SOLVING:
+                    self.state = STATE_FILE_SELECT
+    
+    def solve_puzzle(self, algorithm, job, token):
+        """Solve self.puzzle with the selected algorithm (worker thread), the result goes to the queue"""
+        try:
             start_time = time.time()
+            self.worker_queue.put((job, 'running', 'BFS' if algorithm == 'bfs' else f"A* {algorithm}"))
             
-            if algo_key == 'bfs':
-                goal_node = BFS(
+            cost = cell_cost if self.slide_moves else None
+            if algorithm == 'bfs':
+                search = lambda puzzle: BFS(
                     puzzle,
-                    lambda state: state.successorFunction(),
-                    lambda state: state.isGoal()
+                    self.successors,
+                    lambda state: state.isGoal(),
+                    budget=self.solve_budget(job, token)
                 )
             else:
-                goal_node = AStar(
+                heuristic = {'h1': h1, 'h2': h2, 'h3': h3}[algorithm]
+                search = lambda puzzle: AStar(
                     puzzle,
-                    lambda state: state.successorFunction(),
+                    self.successors,
                     lambda state: state.isGoal(),
-                    heuristic
+                    heuristic,
+                    cost,
+                    budget=self.solve_budget(job, token)
                 )
+            goal_node = self.cache.solve(self.puzzle, self.solver_name(algorithm), search, cost)
             
-            solve_time = time.time() - start_time
+            self.worker_queue.put((job, 'solved', goal_node, time.time() - start_time))
+        except Exception as error:
+            # a crash of the search must not leave the UI waiting for a result forever
+            self.worker_queue.put((job, 'failed', f"{type(error).__name__}: {error}"))
+    
+    def compare_all_algorithms(self, job, token):
+        """
+        Compare all algorithms on selected puzzle (worker thread): the cached ones right away, the
+        others in one process each (compare_concurrently), each result goes to the queue when it arrives
+        """
+        try:
+            puzzle = RushHourPuzzle(self.selected_file)
+            solvers = {'BFS': 'bfs', 'A* h1': 'h1', 'A* h2': 'h2', 'A* h3': 'h3'}
+            pending = []
+            for name, algo_key in solvers.items():
+                cached = self.cache.get(puzzle, self.solver_name(algo_key))
+                if cached is not None and cached['actions'] is not None:
+                    stats = restore_stats(SearchStats(), cached)
+                    result = {
+                        'moves': len(cached['actions']),
+                        'time': stats.timings['total'] or None,  # of the first solve, not of the lookup
+                        'stats': stats,
+                        'cached': True
+                    }
+                    self.worker_queue.put((job, 'result', name, result))
+                else:
+                    pending.append(name)
             
-            if goal_node:
-                self.comparison_results[name] = {
-                    'moves': len(goal_node.getSolution()),
-                    'time': solve_time
-                }
-        
-        # Mark comparison as complete
-        self.comparison_solving = False
+            # more processes than cores: the CPU time of each search, its wall time would count the waits
+            timing = 'cpu_time' if len(pending) > (os.cpu_count() or 1) else 'time'
+            report = lambda name, snapshot: self.worker_queue.put((job, 'compare_progress', name, snapshot))
+            for name, result in compare_concurrently(self.selected_file, pending, self.slide_moves, token,
+                                                     SOLVE_TIME_LIMIT, report):
+                if result.get('error'):
+                    # the search raised in its process: a row with the error instead of "running" forever
+                    self.worker_queue.put((job, 'result', name, {
+                        'moves': 'error',
+                        'time': None,
+                        'stats': None,
+                        'error': result['error']
+                    }))
+                    continue
+                if result['stopped']:
+                    moves = f"stopped ({result['stopped']})"
+                elif result['actions'] is None:
+                    moves = "no solution"
+                else:
+                    moves = result['moves']
+                    # what a cache hit shows: the time of this search alone
+                    result['stats'].timings['total'] = result[timing]
+                    self.cache.put(puzzle, self.solver_name(solvers[name]), result['actions'], result['cost'],
+                                   result['stats'])
+                self.worker_queue.put((job, 'result', name, {
+                    'moves': moves,
+                    'time': result[timing],
+                    'stats': result['stats']
+                }))
+            
+            # Mark comparison as complete
+            self.worker_queue.put((job, 'compared'))
+        except Exception as error:
+            # compare_concurrently or the cache raised: the rows still running would never end
+            self.worker_queue.put((job, 'failed', f"{type(error).__name__}: {error}"))
     
     def run(self):
         clock = pygame.time.Clock()
@@ -883,6 +1184,13 @@ class RushHourUI:
                 if event.type == pygame.QUIT:
                     running = False
                 
+                if event.type == pygame.VIDEOEXPOSE:
+                    self.drawn_frame = None  # window uncovered: full redraw
+                
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_m:
+                    if self.state == STATE_ALGORITHM_SELECT:
+                        self.slide_moves = not self.slide_moves
+                
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     if self.state == STATE_WELCOME:
                         if self.start_button.is_hovered(mouse_pos):
@@ -917,16 +1225,17 @@ class RushHourUI:
                                     
                                     if self.selected_algorithm == 'compare':
                                         self.state = STATE_COMPARISON
-                                        self.comparison_solving = True
-                                        self.comparison_results = {}
-                                        # Comparison will run in the main loop
                                     else:
-                                        # Set solving state to show waiting indicator
+                                        # Waiting indicator until the worker sends the result
                                         self.state = STATE_SOLVING
-                                        self.is_solving = True
-                                        # Solving will run in the main loop
+                                    self.start_solving()
                                     break
                     
+                    elif self.state == STATE_SOLVING:
+                        if self.cancel_button.is_hovered(mouse_pos):
+                            self.cancel_solving()
+                            self.state = STATE_FILE_SELECT
+                    
                     elif self.state == STATE_ANIMATION:
                         if self.back_button.is_hovered(mouse_pos):
                             self.state = STATE_FILE_SELECT
@@ -947,6 +1256,7 @@ class RushHourUI:
                     
                     elif self.state == STATE_COMPARISON:
                         if self.back_button.is_hovered(mouse_pos):
+                            self.cancel_solving()
                             self.state = STATE_FILE_SELECT
             
             # Update button hover states
@@ -969,9 +1279,14 @@ class RushHourUI:
                 self.restart_button.update(mouse_pos, mouse_pressed)
                 if self.show_success:
                     self.continue_button.update(mouse_pos, mouse_pressed)
+            elif self.state == STATE_SOLVING:
+                self.cancel_button.update(mouse_pos, mouse_pressed)
             elif self.state == STATE_COMPARISON:
                 self.back_button.update(mouse_pos, mouse_pressed)
             
+            # Results and progress of the worker (starts the animation as soon as a solution arrives)
+            self.poll_worker()
+            
             # Animation logic
             if self.state == STATE_ANIMATION and self.solution_path and not self.paused and not self.is_solving:
                 current_time = pygame.time.get_ticks()
@@ -983,43 +1298,31 @@ class RushHourUI:
                         self.show_success = True
                     self.last_update = current_time
             
-            # Draw current state
-            if self.state == STATE_WELCOME:
-                self.draw_welcome_screen()
-            elif self.state == STATE_ALGORITHM_SELECT:
-                self.draw_algorithm_select_screen()
-            elif self.state == STATE_FILE_SELECT:
-                self.draw_file_select_screen()
-            elif self.state == STATE_SOLVING:
-                self.draw_waiting_indicator()
-            elif self.state == STATE_ANIMATION:
-                self.draw_animation_screen()
-            elif self.state == STATE_COMPARISON:
-                self.draw_comparison_screen()
-            
-            # Update display before potentially blocking operation
-            pygame.display.flip()
-            clock.tick(60)
-            
-            # Run single algorithm solving AFTER drawing waiting indicator
-            if self.state == STATE_SOLVING and self.is_solving:
-                if self.solve_puzzle(self.selected_algorithm):
-                    self.state = STATE_ANIMATION
-                    self.last_update = pygame.time.get_ticks()
-                else:
-                    self.state = STATE_FILE_SELECT
-                # Skip the display update at the end since we already did it
-                continue
-            
-            # Run comparison AFTER drawing waiting indicator
-            if self.state == STATE_COMPARISON and self.comparison_solving:
-                self.compare_all_algorithms()
-                # Skip the display update at the end since we already did it
-                continue
-            
-            pygame.display.flip()
+            # Draw current state, only when it changed (frame_key)
+            frame = self.frame_key()
+            if frame is None or frame != self.drawn_frame:
+                if self.state == STATE_WELCOME:
+                    self.draw_welcome_screen()
+                elif self.state == STATE_ALGORITHM_SELECT:
+                    self.draw_algorithm_select_screen()
+                elif self.state == STATE_FILE_SELECT:
+                    self.draw_file_select_screen()
+                elif self.state == STATE_SOLVING:
+                    self.draw_waiting_indicator()
+                elif self.state == STATE_ANIMATION:
+                    self.draw_animation_screen()
+                elif self.state == STATE_COMPARISON:
+                    self.draw_comparison_screen()
+                pygame.display.flip()
+            elif self.state == STATE_ANIMATION and self.current_step != self.drawn_step:
+                # dirty rectangles: only the panel, the progress bar and the moved cars
+                pygame.display.update(self.draw_animation_step(self.drawn_step))
+            self.drawn_frame = frame
+            self.drawn_step = self.current_step
             clock.tick(60)
         
+        self.cancel_solving()
+        self.cache.close()
         pygame.quit()
         sys.exit()
 
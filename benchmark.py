@@ -0,0 +1,522 @@
+import argparse
+import copy
+import glob
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from RushHourPuzzle import RushHourPuzzle
+from BFS import BFS
+from ParallelBFS import ParallelBFS
+from HDAStar import HDAStar
+from ExternalBFS import ExternalBFS
+from AStar import AStar, IDAStar, h1, h2, h3, h4, cell_cost
+from Node import Node
+from SearchStats import SearchStats
+from PuzzleGenerator import place_vehicles, generate
+
+
+class DeepCopyPuzzle:
+    """
+    The old state representation (list of vehicle dicts + board matrix, deepcopy for every move).
+    Kept here only as the reference for the benchmark.
+    """
+
+    def __init__(self, puzzle):
+        self.board_height = puzzle.board_height
+        self.board_width = puzzle.board_width
+        self.vehicles = puzzle.vehicles
+        self.walls = puzzle.walls
+        self.setBoard()
+
+    def setBoard(self):
+        self.board = [[' ' for _ in range(self.board_width)] for _ in range(self.board_height)]
+        for (x, y) in self.walls:
+            self.board[y][x] = '#'
+        for v in self.vehicles:
+            x, y = v["x"], v["y"]
+            for i in range(v["length"]):
+                if v["orientation"] == 'H':
+                    self.board[y][x + i] = v["id"]
+                else:
+                    self.board[y + i][x] = v["id"]
+
+    def isGoal(self):
+        for v in self.vehicles:
+            if v["id"] == "X":
+                return v["x"] == self.board_width - 2 and v["y"] == (self.board_height // 2 - 1)
+        return False
+
+    def canMove(self, vehicle, direction):
+        x, y, length = vehicle["x"], vehicle["y"], vehicle["length"]
+        if direction == 'L':
+            return x - 1 >= 0 and self.board[y][x - 1] == ' '
+        if direction == 'R':
+            return x + length < self.board_width and self.board[y][x + length] == ' '
+        if direction == 'U':
+            return y - 1 >= 0 and self.board[y - 1][x] == ' '
+        return y + length < self.board_height and self.board[y + length][x] == ' '
+
+    def moveVehicle(self, index, direction):
+        new_state = copy.deepcopy(self)
+        vehicle = new_state.vehicles[index]
+        if direction == 'L':
+            vehicle["x"] -= 1
+        elif direction == 'R':
+            vehicle["x"] += 1
+        elif direction == 'U':
+            vehicle["y"] -= 1
+        else:
+            vehicle["y"] += 1
+        new_state.setBoard()
+        return new_state
+
+    def successorFunction(self):
+        successors = []
+        for i, vehicle in enumerate(self.vehicles):
+            directions = ['L', 'R'] if vehicle["orientation"] == 'H' else ['U', 'D']
+            for direction in directions:
+                if self.canMove(vehicle, direction):
+                    successors.append(((vehicle["id"], direction), self.moveVehicle(i, direction)))
+        return successors
+
+    def __eq__(self, other):
+        return isinstance(other, DeepCopyPuzzle) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def _key(self):
+        return tuple(sorted((v["id"], v["x"], v["y"]) for v in self.vehicles))
+
+
+def run(algorithm, state):
+    """
+    Solve once and return (number of moves, seconds)
+    """
+    start = time.perf_counter()
+    if algorithm == 'BFS':
+        goal_node = BFS(state, lambda s: s.successorFunction(), lambda s: s.isGoal())
+    else:
+        goal_node = AStar(state, lambda s: s.successorFunction(), lambda s: s.isGoal(), h4)
+    elapsed = time.perf_counter() - start
+    return (len(goal_node.getSolution()) if goal_node else None), elapsed
+
+
+def compare_engines(csv_files):
+    """
+    deepcopy states vs packed states (grid and bitboard backends) on the same puzzles
+    (A* uses h4 so every engine expands the same nodes)
+    """
+    print(f"{'Puzzle':<20} {'Algorithm':<10} {'Moves':<7} {'deepcopy (s)':<14} {'grid (s)':<10} "
+          f"{'bitboard (s)':<14} {'Speedup':<8}")
+    print('-' * 90)
+    for csv_file in csv_files:
+        puzzle = RushHourPuzzle(csv_file)
+        for algorithm in ('BFS', 'A* h4'):
+            old_moves, old_time = run(algorithm, DeepCopyPuzzle(puzzle))
+            new_moves, new_time = run(algorithm, puzzle)
+            bit_moves, bit_time = run(algorithm, RushHourPuzzle(csv_file, backend='bitboard'))
+            if not old_moves == new_moves == bit_moves:
+                print(f"!! {csv_file} {algorithm}: deepcopy found {old_moves} moves, "
+                      f"grid {new_moves}, bitboard {bit_moves}")
+            print(f"{csv_file:<20} {algorithm:<10} {str(new_moves):<7} {old_time:<14.4f} {new_time:<10.4f} "
+                  f"{bit_time:<14.4f} {old_time / min(new_time, bit_time):<8.1f}")
+
+
+def large_board(size, vehicles, seed=0):
+    """
+    Writes a size x size puzzle CSV (X on the exit row + random vehicles) and returns its path
+    """
+    rng = random.Random(seed)
+    exit_row = size // 2 - 1
+    placed = place_vehicles(rng, size, size, vehicles, (2, 2, 3), {(0, exit_row), (1, exit_row)})
+    if placed is None:
+        raise ValueError(f"{vehicles} vehicles don't fit on a {size} x {size} board")
+    lines = [f"{size},{size}", f"X,0,{exit_row},H,2"]
+    lines += [f"{vid},{x},{y},{orientation},{length}" for vid, x, y, orientation, length in placed]
+    fd, path = tempfile.mkstemp(suffix=f"-{size}x{size}.csv")
+    with os.fdopen(fd, 'w') as fichier:
+        fichier.write("\n".join(lines) + "\n")
+    return path
+
+
+class DictNode:
+    """
+    The old Node layout (no __slots__, one __dict__ per node), only measured for the report
+    """
+
+    def __init__(self, state, parent=None, action=None, g=0, f=0):
+        self.state = state
+        self.parent = parent
+        self.action = action
+        self.g = g
+        self.f = f
+
+
+def tree_memory(csv_files):
+    """
+    Bytes per search tree node (Node with a __dict__, Node with __slots__, SearchTree arrays)
+    and peak memory of the whole BFS (states, Open, Closed included) per stored node
+    """
+    old_node = DictNode(None, None, ('A', 'L'), 1, 1)
+    dict_size = sys.getsizeof(old_node) + sys.getsizeof(old_node.__dict__)
+    slots_size = sys.getsizeof(Node(None, None, ('A', 'L'), 1, 1))
+
+    print(f"{'Puzzle':<24} {'Nodes':<9} {'dict Node':<11} {'slots Node':<12} {'arrays':<8} "
+          f"{'BFS peak Node':<15} {'BFS peak compact':<17}")
+    print('-' * 100)
+    for csv_file in csv_files:
+        peaks = {}
+        for compact in (False, True):
+            puzzle = RushHourPuzzle(csv_file)
+            tracemalloc.start()
+            goal_node = BFS(puzzle, lambda s: s.successorFunction(), lambda s: s.isGoal(), compact=compact)
+            peaks[compact] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            if compact:
+                tree = goal_node.tree
+        nodes = len(tree)
+        array_size = (tree.parents.itemsize + tree.actions.itemsize + tree.g.itemsize)
+        print(f"{os.path.basename(csv_file):<24} {nodes:<9} {dict_size:<11} {slots_size:<12} {array_size:<8} "
+              f"{peaks[False] / nodes:<15.1f} {peaks[True] / nodes:<17.1f}")
+
+
+def open_lists(csv_files):
+    """
+    Expansions of A* (h2, slides with the per-cell cost, where an Open update really happens)
+    with each open list: 'expanded' counts the pops, 'again' the states expanded more than once
+    """
+    variants = [('heap fifo', 'heap', 'fifo'), ('heap high_g', 'heap', 'high_g'),
+                ('bucket high_g', 'bucket', 'high_g'), ('bucket low_g', 'bucket', 'low_g')]
+    print(f"{'Puzzle':<20} {'Open list':<15} {'Cost':<6} {'Expanded':<10} {'Again':<7} {'Time (s)':<8}")
+    print('-' * 70)
+    for csv_file in csv_files:
+        for name, open_list, tie_break in variants:
+            puzzle = RushHourPuzzle(csv_file, backend='bitboard')
+            expanded = []
+
+            def successors(state):
+                expanded.append(state)
+                return state.iterSlideSuccessors()
+
+            start = time.perf_counter()
+            goal_node = AStar(puzzle, successors, lambda s: s.isGoal(), h2, cost=cell_cost,
+                              open_list=open_list, tie_break=tie_break)
+            elapsed = time.perf_counter() - start
+            print(f"{os.path.basename(csv_file):<20} {name:<15} {str(goal_node.g if goal_node else None):<6} "
+                  f"{len(expanded):<10} {len(expanded) - len(set(expanded)):<7} {elapsed:<8.3f}")
+
+
+def parallel_scaling(csv_files, max_workers=None):
+    """
+    ParallelBFS and HDAStar (h2) with 1..N worker processes against BFS / AStar in this process
+    (speedup vs the single process search and vs 1 worker)
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    engines = [
+        ('BFS', lambda p: BFS(p, lambda s: s.iterSuccessors(), lambda s: s.isGoal()),
+         lambda p, workers: ParallelBFS(p, workers=workers)),
+        ('A* h2', lambda p: AStar(p, lambda s: s.iterSuccessors(), lambda s: s.isGoal(), h2),
+         lambda p, workers: HDAStar(p, h2, workers=workers)),
+    ]
+    print(f"{'Puzzle':<20} {'Search':<8} {'Workers':<8} {'Moves':<7} {'Time (s)':<10} {'vs 1 process':<13} "
+          f"{'vs 1 worker':<11}")
+    print('-' * 85)
+    for csv_file in csv_files:
+        puzzle = RushHourPuzzle(csv_file, backend='bitboard')
+        for name, serial, parallel in engines:
+            start = time.perf_counter()
+            serial(puzzle)
+            serial_time = time.perf_counter() - start
+            print(f"{os.path.basename(csv_file):<20} {name:<8} {'-':<8} {'':<7} {serial_time:<10.3f}")
+            one_worker = None
+            for workers in range(1, max_workers + 1):
+                start = time.perf_counter()
+                goal_node = parallel(puzzle, workers)
+                elapsed = time.perf_counter() - start
+                one_worker = one_worker or elapsed
+                print(f"{os.path.basename(csv_file):<20} {name:<8} {workers:<8} "
+                      f"{str(goal_node.g if goal_node else None):<7} {elapsed:<10.3f} "
+                      f"{serial_time / elapsed:<13.2f} {one_worker / elapsed:<11.2f}")
+
+
+def external_memory(csv_files, buffer_size=1 << 16):
+    """
+    BFS in memory vs ExternalBFS (layer files on disk): time and peak Python memory (tracemalloc)
+    """
+    engines = [('BFS', lambda p: BFS(p, lambda s: s.iterSuccessors(), lambda s: s.isGoal())),
+               ('ExternalBFS', lambda p: ExternalBFS(p, buffer_size=buffer_size))]
+    print(f"{'Puzzle':<24} {'Search':<13} {'Moves':<7} {'Time (s)':<10} {'Peak (KB)':<10}")
+    print('-' * 70)
+    for csv_file in csv_files:
+        for name, search in engines:
+            puzzle = RushHourPuzzle(csv_file, backend='bitboard')
+            tracemalloc.start()
+            start = time.perf_counter()
+            goal_node = search(puzzle)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{os.path.basename(csv_file):<24} {name:<13} {str(goal_node.g if goal_node else None):<7} "
+                  f"{elapsed:<10.3f} {peak // 1024:<10}")
+
+
+def corpus_scaling(directories, engines=('BFS', 'A* h2')):
+    """
+    Time, peak Python memory (tracemalloc) and expanded nodes against the depth and the state space
+    size of generated corpora (directories written by PuzzleGenerator.py, read from their manifest.json),
+    from the smallest state space to the biggest
+    """
+    puzzles = []
+    for directory in directories:
+        with open(os.path.join(directory, 'manifest.json')) as fichier:
+            manifest = json.load(fichier)
+        for entry in manifest['puzzles']:
+            # not explored: at least min_states (older manifests don't have it)
+            states = entry['states'] or entry.get('min_states') or float('inf')
+            puzzles.append((states, entry['states'] is None, entry['depth'], os.path.join(directory, entry['file'])))
+    puzzles.sort()
+
+    print(f"{'Puzzle':<24} {'Depth':<6} {'States':<9} {'Search':<8} {'Moves':<6} {'Expanded':<10} "
+          f"{'Time (s)':<10} {'Peak (KB)':<10}")
+    print('-' * 90)
+    for states, lower_bound, depth, csv_file in puzzles:
+        states = '?' if states == float('inf') else f">={states}" if lower_bound else str(states)
+        for name in engines:
+            puzzle = RushHourPuzzle(csv_file, backend='bitboard')
+            stats = SearchStats(timed=False)
+            tracemalloc.start()
+            start = time.perf_counter()
+            if name == 'BFS':
+                goal_node = BFS(puzzle, SUCCESSORS, IS_GOAL, stats=stats)
+            else:
+                goal_node = AStar(puzzle, SUCCESSORS, IS_GOAL, SCALING_HEURISTICS[name], stats=stats)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{os.path.basename(csv_file):<24} {depth:<6} {states:<9} "
+                  f"{name:<8} {str(goal_node.g if goal_node else None):<6} {stats.expanded:<10} "
+                  f"{elapsed:<10.3f} {peak // 1024:<10}")
+
+
+# Engines of the suite: name -> search(puzzle) returning the goal node (or None)
+SUCCESSORS = lambda s: s.iterSuccessors()
+IS_GOAL = lambda s: s.isGoal()
+ENGINES = {
+    'BFS': lambda p: BFS(p, SUCCESSORS, IS_GOAL),
+    'A* h1': lambda p: AStar(p, SUCCESSORS, IS_GOAL, h1),
+    'A* h2': lambda p: AStar(p, SUCCESSORS, IS_GOAL, h2),
+    'A* h3': lambda p: AStar(p, SUCCESSORS, IS_GOAL, h3),
+    'A* h2 bucket': lambda p: AStar(p, SUCCESSORS, IS_GOAL, h2, open_list='bucket'),
+    'IDA* h2': lambda p: IDAStar(p, SUCCESSORS, IS_GOAL, h2, table_size=1 << 20),
+    'ParallelBFS': lambda p: ParallelBFS(p),
+    'HDA* h2': lambda p: HDAStar(p, h2),
+    'ExternalBFS': lambda p: ExternalBFS(p),
+}
+DEFAULT_ENGINES = ['BFS', 'A* h1', 'A* h2', 'A* h3']
+SCALING_HEURISTICS = {'A* h1': h1, 'A* h2': h2, 'A* h3': h3}
+
+# Generated families of increasing size: (name, options of PuzzleGenerator.generate, seeds), each puzzle
+# is solvable and its optimal depth is known. The 8x8 components are too big to be explored, a small
+# max_states sends them to the climb sooner. Seeds left out: slow to generate or BFS takes over 10s
+FAMILIES = [
+    ('6x6-10', {'height': 6, 'vehicles': 10, 'min_depth': 20, 'max_depth': 30}, (0, 3, 4)),
+    ('7x7-18', {'height': 7, 'vehicles': 18, 'min_depth': 15, 'max_depth': 40}, (1, 2, 3)),
+    ('8x8-16', {'height': 8, 'vehicles': 16, 'min_depth': 12, 'max_depth': 20, 'max_states': 10000}, (1, 4, 5)),
+]
+
+
+def percentile(values, p):
+    # nearest rank, so with few repeats the p95 is the slowest run
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def measure(search, csv_file, repeat=5, warmup=1, backend='bitboard'):
+    """
+    warmup runs (not kept) then repeat timed runs of search on a fresh puzzle each time
+    """
+    times = []
+    goal_node = None
+    for run_number in range(warmup + repeat):
+        puzzle = RushHourPuzzle(csv_file, backend=backend)
+        start = time.perf_counter()
+        goal_node = search(puzzle)
+        elapsed = time.perf_counter() - start
+        if run_number >= warmup:
+            times.append(elapsed)
+    return {
+        'moves': len(goal_node.getSolution()) if goal_node else None,
+        'times': times,
+        'median': statistics.median(times),
+        'p95': percentile(times, 95),
+        'min': min(times),
+    }
+
+
+def run_suite(engines=DEFAULT_ENGINES, csv_files=None, families=FAMILIES, repeat=5, warmup=1,
+              backend='bitboard', verbose=True):
+    """
+    Every engine on the examples and on the generated families -> dict ready for json (meta + results)
+    """
+    puzzles = [(os.path.basename(path), path) for path in (csv_files or sorted(glob.glob("examples/*.csv")))]
+    generated = []
+    optimal = {}  # optimal moves of the generated puzzles, every engine of the suite must find them
+    results = []
+    try:
+        for name, options, seeds in families:
+            for seed in seeds:
+                fd, path = tempfile.mkstemp(suffix=f"-{name}.csv")
+                os.close(fd)
+                generated.append(path)
+                puzzle = generate(seed, **options)
+                puzzle.write_csv(path)
+                puzzles.append((f"gen-{name}-s{seed}", path))
+                optimal[f"gen-{name}-s{seed}"] = puzzle.depth
+
+        for puzzle_name, path in puzzles:
+            for engine in engines:
+                result = {'puzzle': puzzle_name, 'engine': engine}
+                result.update(measure(ENGINES[engine], path, repeat, warmup, backend))
+                results.append(result)
+                if puzzle_name in optimal and result['moves'] != optimal[puzzle_name]:
+                    print(f"!! {puzzle_name} {engine}: {result['moves']} moves, the optimum is "
+                          f"{optimal[puzzle_name]}", file=sys.stderr)
+                if verbose:
+                    print(f"{puzzle_name:<20} {engine:<14} {str(result['moves']):<6} "
+                          f"median {result['median']:.4f}s  p95 {result['p95']:.4f}s", file=sys.stderr)
+    finally:
+        for path in generated:
+            os.remove(path)
+
+    meta = {
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'backend': backend,
+        'repeat': repeat,
+        'warmup': warmup,
+        'families': [[name, options, list(seeds)] for name, options, seeds in families],
+    }
+    return {'meta': meta, 'results': results}
+
+
+def compare_results(baseline, current, threshold=0.10, min_delta=0.005):
+    """
+    Regressions of current against baseline (results of run_suite): a median slower by more than
+    threshold (and by more than min_delta seconds, the tiny runs are noise) or a different number of moves.
+    Prints the table and returns the list of regressions.
+    """
+    old = {(r['puzzle'], r['engine']): r for r in baseline['results']}
+    regressions = []
+    print(f"{'Puzzle':<20} {'Engine':<14} {'Baseline (s)':<13} {'Current (s)':<12} {'Change':<9} {'Status':<10}")
+    print('-' * 85)
+    for result in current['results']:
+        key = (result['puzzle'], result['engine'])
+        before = old.get(key)
+        if before is None:
+            print(f"{key[0]:<20} {key[1]:<14} {'-':<13} {result['median']:<12.4f} {'':<9} new")
+            continue
+        change = result['median'] / before['median'] - 1 if before['median'] else 0.0
+        if result['moves'] != before['moves']:
+            status = f"MOVES {before['moves']} -> {result['moves']}"
+        elif change > threshold and result['median'] - before['median'] > min_delta:
+            status = "REGRESSION"
+        elif change < -threshold and before['median'] - result['median'] > min_delta:
+            status = "faster"
+        else:
+            status = "ok"
+        if status not in ("ok", "faster"):
+            regressions.append({'puzzle': key[0], 'engine': key[1], 'status': status,
+                                'baseline': before['median'], 'current': result['median']})
+        print(f"{key[0]:<20} {key[1]:<14} {before['median']:<13.4f} {result['median']:<12.4f} "
+              f"{change:<+9.1%} {status}")
+    print(f"\n{len(regressions)} regression(s) (threshold {threshold:.0%})")
+    return regressions
+
+
+def suite_main(argv):
+    parser = argparse.ArgumentParser(prog="benchmark.py --suite",
+                                     description="Timed runs of the engines, JSON results and baseline compare")
+    parser.add_argument("files", nargs="*", help="puzzle CSVs (default: examples/*.csv)")
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=DEFAULT_ENGINES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--no-generated", action="store_true", help="skip the generated families")
+    parser.add_argument("--backend", choices=["grid", "bitboard"], default="bitboard")
+    parser.add_argument("--output", help="JSON results file (default: stdout)")
+    parser.add_argument("--baseline", help="compare with this results file, exit code 1 on regression")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown of the median")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="seconds under which a slowdown is noise")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.engines, args.files, [] if args.no_generated else FAMILIES,
+                        args.repeat, args.warmup, args.backend)
+    if args.output:
+        with open(args.output, 'w') as fichier:
+            json.dump(results, fichier, indent=1)
+    elif not args.baseline:
+        print(json.dumps(results, indent=1))
+    if args.baseline:
+        with open(args.baseline) as fichier:
+            baseline = json.load(fichier)
+        if compare_results(baseline, results, args.threshold, args.min_delta):
+            sys.exit(1)
+
+
+def compare_main(argv):
+    parser = argparse.ArgumentParser(prog="benchmark.py --compare",
+                                     description="Compare two results files of the suite")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown of the median")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="seconds under which a slowdown is noise")
+    args = parser.parse_args(argv)
+    with open(args.baseline) as fichier:
+        baseline = json.load(fichier)
+    with open(args.current) as fichier:
+        current = json.load(fichier)
+    if compare_results(baseline, current, args.threshold, args.min_delta):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--suite"]:
+        # --suite [files] [--engines ...] [--repeat N] [--output results.json] [--baseline old.json]
+        suite_main(sys.argv[2:])
+    elif sys.argv[1:2] == ["--compare"]:
+        # --compare baseline.json current.json [--threshold 0.1]
+        compare_main(sys.argv[2:])
+    elif sys.argv[1:2] == ["--memory"]:
+        generated = [] if sys.argv[2:] else [large_board(8, 10), large_board(8, 18, seed=2)]
+        tree_memory(sys.argv[2:] or ["examples/e-f.csv"] + generated)
+        for path in generated:
+            os.remove(path)
+    elif sys.argv[1:2] == ["--external"]:
+        generated = [] if sys.argv[2:] else [large_board(8, 10)]
+        external_memory(sys.argv[2:] or ["examples/2-e.csv"] + generated)
+        for path in generated:
+            os.remove(path)
+    elif sys.argv[1:2] == ["--parallel"]:
+        # --parallel [N] [files]: 1..N workers (default: all the cores)
+        args = sys.argv[2:]
+        max_workers = int(args.pop(0)) if args and args[0].isdigit() else None
+        parallel_scaling(args or sorted(glob.glob("examples/*.csv")), max_workers)
+    elif sys.argv[1:2] == ["--scaling"]:
+        # --scaling corpus_dir [corpus_dir ...]: corpora of PuzzleGenerator.py
+        corpus_scaling(sys.argv[2:])
+    elif sys.argv[1:2] == ["--open-list"]:
+        open_lists(sys.argv[2:] or sorted(glob.glob("examples/*.csv")))
+    else:
+        compare_engines(sys.argv[1:] or sorted(glob.glob("examples/*.csv")))
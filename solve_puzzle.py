@@ -1,64 +1,229 @@
 from RushHourPuzzle import RushHourPuzzle
-from Node import Node
 from BFS import BFS
-from AStar import AStar, h1, h2, h3, h4
+from ParallelBFS import ParallelBFS
+from AStar import AStar, IDAStar, h1, h2, h3, h4, h5, cell_cost, slide_cost
+from HDAStar import HDAStar
+from DistanceTable import DistanceTable
+from Budget import Budget, SearchStopped, memory_used, peak_memory, reset_peak_memory
+from SearchStats import SearchStats
+from Profiler import Profiler
+from SolutionCache import SolutionCache, restore_stats
+from PuzzleCorpus import PuzzleCorpus, SUFFIX as CORPUS_SUFFIX
+from Comparison import ALGORITHMS, compare_concurrently, run_algorithm
+from ParallelBFS import replay
+from functools import partial
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
 import time
 
+HEURISTICS = {'h1': h1, 'h2': h2, 'h3': h3, 'h4': h4, 'h5': h5}
+COSTS = {'cell': cell_cost, 'slide': slide_cost}
+TASKS_PER_WORKER = 64  # batch: a worker is replaced after this many puzzles (gives back a fragmented heap)
 
-def solve_with_bfs(csv_file):
+
+def successors_for(slides):
     """
-    Solve puzzle using BFS
+    Single cell moves (default) or macro-moves (id, dir, k) that slide a vehicle k cells at once
+    """
+    if slides:
+        return lambda state: state.iterSlideSuccessors()
+    return lambda state: state.iterSuccessors()
+
+
+def print_actions(solution):
+    directions = {'L': 'Left', 'R': 'Right', 'U': 'Up', 'D': 'Down'}
+    for i, action in enumerate(solution, 1):
+        distance = f" x{action[2]}" if len(action) > 2 else ""
+        print(f"{i}. {action[0]} -> {directions[action[1]]}{distance}")
+
+
+def print_stopped(stopped):
+    print(f"Search stopped ({stopped.reason}) after {stopped.stats.expanded} expanded nodes "
+          f"in {stopped.stats.timings['total']:.4f}s")
+
+
+def print_stats(stats):
+    timings = stats.timings
+    print(f"Expanded: {stats.expanded}, generated: {stats.generated}, "
+          f"effective branching factor: {format_number(stats.branching_factor, '.3f')}")
+    print(f"Duplicates in Open: {stats.duplicates_open}, in Closed: {stats.duplicates_closed}, "
+          f"reopened: {stats.reopened}")
+    print(f"Peak Open: {stats.peak_open}, peak Closed: {stats.peak_closed}")
+    if stats.timed:
+        print(f"Time in successors: {timings['successors']:.4f}s, heuristic: {timings['heuristic']:.4f}s, "
+              f"open list: {timings['queue']:.4f}s (instrumented run)")
+
+
+def format_number(value, spec):
+    return '-' if value is None else format(value, spec)
+
+
+def print_summary(results, label):
+    """
+    Summary table of the compare functions: moves, time and the SearchStats of each search.
+    The times are the ones of uninstrumented runs (SearchStats(timed=False)), see print_phases.
+    A solution read from the cache shows the time of its first solve, marked with *
+    """
+    print(f"\n{'='*110}")
+    print("SUMMARY")
+    print('='*110)
+    print(f"{label:<12} {'Moves':<6} {'Time (s)':<9} {'Expanded':<9} {'Generated':<10} {'Dup open':<9} "
+          f"{'Dup closed':<11} {'Reopened':<9} {'Peak open':<10} {'Peak closed':<12} {'EBF':<6}")
+    print('-'*110)
+    for name, result in results.items():
+        if not result:
+            continue
+        elapsed = format_number(result['time'], '.4f') + ('*' if result.get('cached') else '')
+        stats = result.get('stats')
+        if stats is None:
+            print(f"{name:<12} {result['moves']:<6} {elapsed:<9}")
+            continue
+        print(f"{name:<12} {result['moves']:<6} {elapsed:<9} {stats.expanded:<9} {stats.generated:<10} "
+              f"{stats.duplicates_open:<9} {stats.duplicates_closed:<11} {stats.reopened:<9} "
+              f"{stats.peak_open:<10} {stats.peak_closed:<12} {format_number(stats.branching_factor, '.3f'):<6}")
+    if any(result and result.get('cached') for result in results.values()):
+        print("* cached: time of the first solve, not of this run")
+
+
+def print_phases(phases, label):
+    """
+    Where the time goes, from separate instrumented runs (every successor / h / open list call is
+    timed, which slows the search down): compare the phases between them, not with the summary times
+    """
+    print(f"\n{'='*80}")
+    print("PHASES (instrumented runs, slower than the summary)")
+    print('='*80)
+    print(f"{label:<12} {'Total (s)':<10} {'Succ (s)':<9} {'h (s)':<7} {'Queue (s)':<10} {'Other (s)':<9}")
+    print('-'*80)
+    for name, stats in phases.items():
+        timings = stats.timings
+        other = timings['total'] - timings['successors'] - timings['heuristic'] - timings['queue']
+        print(f"{name:<12} {timings['total']:<10.4f} {timings['successors']:<9.4f} {timings['heuristic']:<7.4f} "
+              f"{timings['queue']:<10.4f} {other:<9.4f}")
+
+
+def measure_phases(csv_file, names=None):
+    """
+    {name: timed SearchStats} of one instrumented run of each algorithm of the comparison,
+    one after the other in this process
+    """
+    return {name: run_algorithm(csv_file, name, timed=True)['stats'] for name in (names or ALGORITHMS)}
+
+
+def print_solution(goal_node, elapsed, stats=None, cached=False):
+    """
+    Solution, time, stats and final board of a search -> the dict of the summary tables
+    cached=True: read from a SolutionCache, elapsed is the time of the first solve (None if not stored)
     """
-    print(f"\n{'='*70}")
-    print(f"BFS (Breadth-First Search)")
-    print('='*70)
-    
-    puzzle = RushHourPuzzle(csv_file)
-    
-    print("\nInitial state:")
-    puzzle.displayBoard()
-    
-    start_time = time.time()
-    goal_node = BFS(
-        puzzle,
-        lambda state: state.successorFunction(),
-        lambda state: state.isGoal()
-    )
-    end_time = time.time()
-    
-    if goal_node is None:
-        print("No solution found!")
-        return None
-    
     solution = goal_node.getSolution()
-    path = goal_node.getPath()
     
-    print(f"\nSolution found!")
+    print("\nSolution found!")
     print(f"Moves: {len(solution)}")
     print(f"Cost: {goal_node.g}")
-    print(f"Time: {end_time - start_time:.4f}s")
+    if cached:
+        print(f"Time: {format_number(elapsed, '.4f')}s (cached: time of the first solve)")
+    else:
+        print(f"Time: {elapsed:.4f}s")
+    if stats is not None:
+        print_stats(stats)
     
     print("\nActions:")
-    directions = {'L': 'Left', 'R': 'Right', 'U': 'Up', 'D': 'Down'}
-    for i, (vehicle, direction) in enumerate(solution, 1):
-        print(f"{i}. {vehicle} -> {directions[direction]}")
+    print_actions(solution)
     
     print("\nFinal state:")
-    path[-1].displayBoard()
+    goal_node.state.displayBoard()
     
     return {
         'moves': len(solution),
         'cost': goal_node.g,
-        'time': end_time - start_time
+        'time': elapsed,
+        'stats': stats,
+        'cached': cached
     }
 
 
-def solve_with_astar(csv_file, heuristic_func, heuristic_name):
+def solve_with_bfs(csv_file, slides=False, workers=None, budget=None, cache=None):
+    """
+    Solve puzzle using BFS
+    With slides=True BFS minimises the number of slides (unit cost per slide)
+    workers=N expands each depth level on N processes (ParallelBFS), same solution
+    budget: optional Budget, the search gives up when it runs out (not with workers)
+    cache: optional SolutionCache, a puzzle already solved (even with renamed vehicles) is not searched again
+    """
+    print(f"\n{'='*70}")
+    print("BFS (Breadth-First Search)")
+    print('='*70)
+    
+    puzzle = RushHourPuzzle(csv_file)
+    
+    print("\nInitial state:")
+    puzzle.displayBoard()
+    
+    stats = None
+    if workers:
+        search = lambda state: ParallelBFS(state, workers=workers, slides=slides)
+    else:
+        stats = SearchStats(timed=False)  # the time is measured on the search, not the timing wrappers
+        search = lambda state: BFS(
+            state,
+            successors_for(slides),
+            lambda state: state.isGoal(),
+            budget=budget,
+            stats=stats
+        )
+    searched = []  # stays empty on a cache hit
+    start_time = time.perf_counter()
+    if cache is not None:
+        goal_node = cache.solve(puzzle, "BFS slides" if slides else "BFS",
+                                lambda state: searched.append(state) or search(state), stats=stats)
+    else:
+        goal_node = search(puzzle)
+    end_time = time.perf_counter()
+    
+    if isinstance(goal_node, SearchStopped):
+        print_stopped(goal_node)
+        return None
+    if goal_node is None:
+        print("No solution found!")
+        return None
+    
+    if cache is not None and not searched:
+        return print_solution(goal_node, stats.timings['total'] or None if stats else None, stats,
+                              cached=True)
+    return print_solution(goal_node, end_time - start_time, stats)
+
+
+def solve_with_astar(csv_file, heuristic_func, heuristic_name, slides=False, cost=cell_cost, search=AStar,
+                     workers=None, budget=None, cache=None):
     """
     Solve puzzle using A* with given heuristic
+    With slides=True, cost is the cost model of a slide (cell_cost keeps today's optimal answers,
+    slide_cost is the standard Rush Hour metric and needs h5 to stay admissible)
+    search=IDAStar uses IDA* (memory bounded, with a transposition table of 2^20 entries)
+    search=HDAStar spreads A* over `workers` processes (None = all the cores)
+    budget: optional Budget, A* gives up when it runs out (AStar only)
+    cache: optional SolutionCache (see solve_with_bfs)
     """
+    stats = None
+    if search is AStar:
+        stats = SearchStats(timed=False)  # the time is measured on the search, not the timing wrappers
+        search = lambda *args: AStar(*args, budget=budget, stats=stats)
+        name = "A*"
+    elif search is IDAStar:
+        search = lambda *args: IDAStar(*args, table_size=1 << 20)
+        name = "IDA*"
+    elif search is HDAStar:
+        search = lambda state, _, __, h, c: HDAStar(state, h, c, workers=workers, slides=slides)
+        name = "HDA*"
+    else:
+        name = "A*"
+    
     print(f"\n{'='*70}")
-    print(f"A* with {heuristic_name}")
+    print(f"{name} with {heuristic_name}")
     print('='*70)
     
     puzzle = RushHourPuzzle(csv_file)
@@ -66,34 +231,73 @@ def solve_with_astar(csv_file, heuristic_func, heuristic_name):
     print("\nInitial state:")
     puzzle.displayBoard()
     
-    start_time = time.time()
-    goal_node = AStar(
-        puzzle,
-        lambda state: state.successorFunction(),
+    run = lambda state: search(
+        state,
+        successors_for(slides),
         lambda state: state.isGoal(),
-        heuristic_func
+        heuristic_func,
+        cost if slides else None
     )
-    end_time = time.time()
+    searched = []  # stays empty on a cache hit
+    start_time = time.perf_counter()
+    if cache is not None:
+        solver = f"{name} {heuristic_func.__name__}" + (f" slides {cost.__name__}" if slides else "")
+        goal_node = cache.solve(puzzle, solver, lambda state: searched.append(state) or run(state),
+                                cost if slides else None, stats)
+    else:
+        goal_node = run(puzzle)
+    end_time = time.perf_counter()
+    
+    if isinstance(goal_node, SearchStopped):
+        print_stopped(goal_node)
+        return None
+    if goal_node is None:
+        print("No solution found!")
+        return None
+    
+    if cache is not None and not searched:
+        return print_solution(goal_node, stats.timings['total'] or None if stats else None, stats,
+                              cached=True)
+    return print_solution(goal_node, end_time - start_time, stats)
+
+
+def solve_with_table(csv_file, table_file=None, slides=False):
+    """
+    Solve puzzle with a retrograde distance table of its whole component
+    If table_file exists it is memory-mapped, else the table is built (and saved there if given)
+    """
+    print(f"\n{'='*70}")
+    print("Distance table (retrograde BFS)")
+    print('='*70)
+    
+    puzzle = RushHourPuzzle(csv_file)
+    
+    start_time = time.perf_counter()
+    if table_file and os.path.exists(table_file):
+        table = DistanceTable.load(table_file, puzzle.layout)
+        print(f"Table loaded from {table_file} ({len(table)} states)")
+    else:
+        table = DistanceTable.build(puzzle, slides)
+        print(f"Table built: {len(table)} states in {time.perf_counter() - start_time:.4f}s")
+        if table_file:
+            table.save(table_file)
+    
+    query_time = time.perf_counter()
+    goal_node = table.solve(puzzle)
+    end_time = time.perf_counter()
     
     if goal_node is None:
         print("No solution found!")
         return None
     
     solution = goal_node.getSolution()
-    path = goal_node.getPath()
     
-    print(f"\nSolution found!")
+    print("\nSolution found!")
     print(f"Moves: {len(solution)}")
-    print(f"Cost: {goal_node.g}")
-    print(f"Time: {end_time - start_time:.4f}s")
+    print(f"Query time: {end_time - query_time:.6f}s")
     
     print("\nActions:")
-    directions = {'L': 'Left', 'R': 'Right', 'U': 'Up', 'D': 'Down'}
-    for i, (vehicle, direction) in enumerate(solution, 1):
-        print(f"{i}. {vehicle} -> {directions[direction]}")
-    
-    print("\nFinal state:")
-    path[-1].displayBoard()
+    print_actions(solution)
     
     return {
         'moves': len(solution),
@@ -102,38 +306,97 @@ def solve_with_astar(csv_file, heuristic_func, heuristic_name):
     }
 
 
-def compare_all_algorithms(csv_file):
+COMPARE_TITLES = {
+    'BFS': "BFS (Breadth-First Search)",
+    'A* h1': "A* with h1 (distance to exit)",
+    'A* h2': "A* with h2 (distance + blocking vehicles)",
+    'A* h3': "A* with h3 (h2 + clearing cost)",
+}
+
+
+def compare_all_algorithms(csv_file, cache=None, concurrent=True, phases=False):
     """
     Compare BFS and all A* heuristics on the same puzzle
+    cache: optional SolutionCache, the searches already done are read from it
+    concurrent=True runs each algorithm in its own process (wall time ~ the slowest one) and prints
+    them as they finish, each one timed inside its process; False: one after the other (as before)
+    phases=True adds the time per phase of separate instrumented runs (print_phases)
     """
     print(f"\n{'='*70}")
     print(f"COMPARING ALL ALGORITHMS ON: {csv_file}")
     print('='*70)
     
+    if concurrent:
+        compare_concurrent(csv_file, cache)
+    else:
+        compare_serial(csv_file, cache)
+    if phases:
+        print_phases(measure_phases(csv_file), 'Algorithm')
+
+
+def compare_serial(csv_file, cache=None):
     results = {}
     
     # Test BFS
-    results['BFS'] = solve_with_bfs(csv_file)
+    results['BFS'] = solve_with_bfs(csv_file, cache=cache)
     
     # Test A* with h1
-    results['A* h1'] = solve_with_astar(csv_file, h1, "h1 (distance to exit)")
+    results['A* h1'] = solve_with_astar(csv_file, h1, "h1 (distance to exit)", cache=cache)
     
     # Test A* with h2
-    results['A* h2'] = solve_with_astar(csv_file, h2, "h2 (distance + blocking vehicles)")
+    results['A* h2'] = solve_with_astar(csv_file, h2, "h2 (distance + blocking vehicles)", cache=cache)
     
     # Test A* with h3
-    results['A* h3'] = solve_with_astar(csv_file, h3, "h3 (h2 + clearing cost)")
+    results['A* h3'] = solve_with_astar(csv_file, h3, "h3 (h2 + clearing cost)", cache=cache)
     
     
     # Summary
-    print(f"\n{'='*70}")
-    print("SUMMARY")
-    print('='*70)
-    print(f"{'Algorithm':<20} {'Moves':<10} {'Time (s)':<10}")
-    print('-'*70)
-    for name, result in results.items():
-        if result:
-            print(f"{name:<20} {result['moves']:<10} {result['time']:<10.4f}")
+    print_summary(results, 'Algorithm')
+
+
+def compare_concurrent(csv_file, cache=None):
+    puzzle = RushHourPuzzle(csv_file)
+    print("\nInitial state:")
+    puzzle.displayBoard()
+    
+    results = {}
+    pending = []
+    for name in ALGORITHMS:
+        cached = cache.get(puzzle, name) if cache is not None else None
+        if cached is not None and cached['actions'] is not None:
+            stats = restore_stats(SearchStats(), cached)
+            print(f"\n{'='*70}\n{COMPARE_TITLES[name]} (cached)\n{'='*70}")
+            results[name] = print_solution(replay(puzzle, cached['actions']), stats.timings['total'] or None, stats,
+                                           cached=True)
+        else:
+            pending.append(name)
+    
+    # more processes than cores: they share the cores, their wall times would add up the waits
+    timing = 'cpu_time' if len(pending) > (os.cpu_count() or 1) else 'time'
+    if timing == 'cpu_time':
+        print(f"\n{len(pending)} searches on {os.cpu_count()} core(s): times are CPU times of each search")
+    
+    start_time = time.perf_counter()
+    for name, result in compare_concurrently(csv_file, pending):
+        print(f"\n{'='*70}\n{COMPARE_TITLES[name]}  (done after {time.perf_counter() - start_time:.2f}s)\n{'='*70}")
+        if result.get('error'):
+            print(f"Failed: {result['error']}")
+            continue
+        if result['actions'] is None:
+            print("No solution found!")
+            continue
+        goal_node = replay(puzzle, result['actions'])
+        results[name] = print_solution(goal_node, result[timing], result['stats'])
+        if cache is not None:
+            result['stats'].timings['total'] = result[timing]  # what a cache hit shows: the time of this search alone
+            cache.put(puzzle, name, result['actions'], result['cost'], result['stats'])
+    wall_time = time.perf_counter() - start_time
+    
+    # Summary (in the usual order, whatever the order they finished in)
+    print_summary({name: results.get(name) for name in ALGORITHMS}, 'Algorithm')
+    searched = sum(r['time'] for r in results.values() if r and not r['cached'])
+    print(f"\nWall time of the concurrent comparison: {wall_time:.4f}s "
+          f"(sum of the searches run now: {searched:.4f}s)")
 
 
 def compare_heuristics(csv_file):
@@ -159,18 +422,197 @@ def compare_heuristics(csv_file):
     results['h4'] = solve_with_astar(csv_file, h4, "h4 (always 0 - TERRIBLE!)")
     
     # Summary
-    print(f"\n{'='*70}")
-    print("SUMMARY")
-    print('='*70)
-    print(f"{'Heuristic':<20} {'Moves':<10} {'Time (s)':<10}")
-    print('-'*70)
-    for name, result in results.items():
-        if result:
-            print(f"{name:<20} {result['moves']:<10} {result['time']:<10.4f}")
+    print_summary(results, 'Heuristic')
+
+
+def puzzle_files(path):
+    """
+    A directory (all its .csv), a glob pattern or a single file
+    Raises FileNotFoundError when nothing matches (a typo must not look like an empty batch)
+    """
+    if os.path.isdir(path):
+        path = os.path.join(path, '*.csv')
+    files = sorted(glob.glob(path))
+    if not files:
+        raise FileNotFoundError(f"No puzzle found at {path}")
+    return files
+
+
+_corpora = {}  # corpus files opened by this process
+
+
+def load_puzzle(spec, backend='bitboard'):
+    """
+    A CSV file, or puzzle number i of a binary corpus written as "corpus.rhc#i"
+    """
+    path, sep, index = spec.rpartition('#')
+    if sep and path.endswith(CORPUS_SUFFIX):
+        if path not in _corpora:
+            _corpora[path] = PuzzleCorpus(path)
+        return _corpora[path].puzzle(int(index), backend)
+    return RushHourPuzzle(spec, backend=backend)
+
+
+def solve_quiet(csv_file, algorithm='astar', heuristic='h2', slides=False, cost='cell',
+                max_expanded=None, max_time=None, max_memory=None):
+    """
+    Solve without printing anything, returns the dict of one JSON line of the batch mode
+    peak_rss_kb is the peak resident memory of this puzzle above the memory of the process before it
+    (peak reset per puzzle on Linux, elsewhere the peak of the whole process minus that baseline)
+    max_expanded / max_time (s) / max_memory (bytes): Budget of bfs and astar, "stopped" says why it gave up
+    """
+    baseline = memory_used()
+    reset_peak_memory()
+    budget = None
+    if (max_expanded, max_time, max_memory) != (None, None, None):
+        budget = Budget(max_expanded, max_time, max_memory)
+    successors = successors_for(slides)
+    stats = SearchStats(timed=False)  # counters only, timing every call would slow the corpus runs
+
+    def counting_successors(state):
+        # IDA* has no stats, only its expansions are counted
+        stats.expanded += 1
+        return successors(state)
+
+    puzzle = load_puzzle(csv_file)
+    start_time = time.perf_counter()
+    if algorithm == 'bfs':
+        goal_node = BFS(puzzle, successors, lambda state: state.isGoal(), budget=budget, stats=stats)
+    elif algorithm == 'astar':
+        goal_node = AStar(puzzle, successors, lambda state: state.isGoal(), HEURISTICS[heuristic],
+                          COSTS[cost] if slides else None, budget=budget, stats=stats)
+    else:
+        goal_node = IDAStar(puzzle, counting_successors, lambda state: state.isGoal(), HEURISTICS[heuristic],
+                            COSTS[cost] if slides else None, table_size=1 << 20)
+    elapsed = time.perf_counter() - start_time
+    stopped = goal_node.reason if isinstance(goal_node, SearchStopped) else None
+    if stopped:
+        goal_node = None
+    peak = peak_memory()
+    counters = stats.as_dict()
+    del counters['timings']
+    if algorithm == 'idastar':
+        counters = {name: value if name == 'expanded' else None for name, value in counters.items()}
+
+    return {
+        'file': csv_file,
+        'algorithm': algorithm,
+        'heuristic': None if algorithm == 'bfs' else heuristic,
+        'solved': goal_node is not None,
+        'stopped': stopped,
+        'moves': len(goal_node.getSolution()) if goal_node else None,
+        'cost': goal_node.g if goal_node else None,
+        'time': round(elapsed, 6),
+        **counters,
+        'peak_rss_kb': max(0, peak - baseline) // 1024 if None not in (peak, baseline) else None,
+    }
+
+
+def _solve_task(csv_file, **options):
+    # one bad file must not stop a corpus run
+    try:
+        return solve_quiet(csv_file, **options)
+    except Exception as error:
+        return {'file': csv_file, 'error': f"{type(error).__name__}: {error}"}
+
+
+def solve_batch(path, algorithm='astar', heuristic='h2', slides=False, cost='cell', workers=None,
+                output=sys.stdout, verbose=False, in_process=False, **limits):
+    """
+    Solve every puzzle of a directory / glob / binary corpus (.rhc, streamed: the puzzles are read
+    by the workers) on a process pool, one JSON line per puzzle on output
+    (in the order they finish). The workers are reused (TASKS_PER_WORKER puzzles each), peak_rss_kb
+    is measured from the memory before each puzzle (see solve_quiet).
+    verbose=True also prints one progress line per puzzle on stderr
+    limits: max_expanded / max_time / max_memory of each puzzle (see solve_quiet)
+    in_process=True solves them one after the other in this process (no pool, for --profile)
+    """
+    if path.endswith(CORPUS_SUFFIX):
+        with PuzzleCorpus(path) as corpus:
+            total = len(corpus)
+        if not total:
+            raise FileNotFoundError(f"No puzzle in the corpus {path}")
+        files = (f"{path}#{i}" for i in range(total))
+    else:
+        files = puzzle_files(path)
+        total = len(files)
+    task = partial(_solve_task, algorithm=algorithm, heuristic=heuristic, slides=slides, cost=cost, **limits)
+    solved = 0
+    pool = None if in_process else multiprocessing.Pool(workers, maxtasksperchild=TASKS_PER_WORKER)
+    try:
+        results = map(task, files) if pool is None else pool.imap_unordered(task, files)
+        for done, result in enumerate(results, 1):
+            output.write(json.dumps(result) + '\n')
+            output.flush()
+            solved += bool(result.get('solved'))
+            if verbose:
+                status = (result.get('error') or (result['stopped'] and f"stopped ({result['stopped']})")
+                          or f"{result['moves']} moves in {result['time']:.3f}s")
+                print(f"[{done}/{total}] {result['file']}: {status}", file=sys.stderr)
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return solved, total
+
+
+def main(args):
+    if args.puzzles is None or args.compare:
+        # Compare all algorithms
+        cache = SolutionCache(args.cache or None) if args.cache is not None else None
+        try:
+            for csv_file in puzzle_files(args.puzzles) if args.puzzles else ["examples/e-f.csv"]:
+                # profiled: in this process, the Profiler doesn't see the searches of the worker processes
+                compare_all_algorithms(csv_file, cache, concurrent=not (args.serial or args.profile),
+                                       phases=args.phases)
+        finally:
+            if cache is not None:
+                cache.close()
+    else:
+        output = open(args.output, 'w') if args.output else sys.stdout
+        try:
+            solve_batch(args.puzzles, args.algorithm, args.heuristic, args.slides, args.cost, args.workers,
+                        output, args.verbose, in_process=bool(args.profile), max_expanded=args.max_expanded,
+                        max_time=args.time_limit, max_memory=args.max_memory * 2 ** 20 if args.max_memory else None)
+        finally:
+            if args.output:
+                output.close()
 
 
 if __name__ == "__main__":
-    # Compare all algorithms
-    compare_all_algorithms("examples/e-f.csv")
-    
+    parser = argparse.ArgumentParser(description="Rush Hour solver (no puzzles: compare all algorithms on e-f)")
+    parser.add_argument("puzzles", nargs="?",
+                        help="directory or glob of puzzle CSVs or a .rhc corpus (PuzzleCorpus.py): "
+                             "batch mode, one JSON line per puzzle")
+    parser.add_argument("--compare", action="store_true", help="compare all algorithms on each puzzle instead")
+    parser.add_argument("--serial", action="store_true",
+                        help="compare mode: one algorithm after the other instead of one process each")
+    parser.add_argument("--phases", action="store_true",
+                        help="compare mode: time per phase (successors, h, open list) of extra instrumented runs")
+    parser.add_argument("--algorithm", choices=["bfs", "astar", "idastar"], default="astar")
+    parser.add_argument("--heuristic", choices=sorted(HEURISTICS), default="h2")
+    parser.add_argument("--slides", action="store_true", help="macro-moves (id, direction, k)")
+    parser.add_argument("--cost", choices=sorted(COSTS), default="cell", help="cost of a slide")
+    parser.add_argument("--workers", type=int, help="processes (default: all the cores)")
+    parser.add_argument("--output", help="file for the JSON lines (default: stdout)")
+    parser.add_argument("--verbose", action="store_true", help="progress on stderr")
+    parser.add_argument("--max-expanded", type=int, help="give up after this many expanded nodes (bfs, astar)")
+    parser.add_argument("--time-limit", type=float, help="give up after this many seconds (bfs, astar)")
+    parser.add_argument("--max-memory", type=float, help="give up above this many MB of memory (bfs, astar)")
+    parser.add_argument("--profile", nargs="?", const="rushhour.prof", metavar="FILE",
+                        help="cProfile stats to FILE (default rushhour.prof) + a text summary next to it "
+                             "(memory, allocation sites, GC); the batch or the comparison runs in this process")
+    parser.add_argument("--cache", nargs="?", const="", metavar="FILE",
+                        help="compare mode: reuse the solutions of a SolutionCache (default file: "
+                             "$RUSHHOUR_CACHE or ~/.cache/rushhour/solutions.sqlite)")
+    args = parser.parse_args()
 
+    try:
+        if args.profile:
+            with Profiler(args.profile) as profiler:
+                main(args)
+            print(profiler.summary(), file=sys.stderr)
+            print(f"Profile written to {profiler.path} and {profiler.summary_path}", file=sys.stderr)
+        else:
+            main(args)
+    except FileNotFoundError as error:
+        parser.error(str(error))  # no puzzle: usage error, exit code 2
@@ -0,0 +1,118 @@
+"""
+Budget / CancelToken / SearchStopped: why a search stops and what it gives back,
+SearchSnapshot: what iterBFS / iterAStar yield while they search
+"""
+import threading
+
+import pytest
+
+from RushHourPuzzle import RushHourPuzzle
+from BFS import BFS, iterBFS
+from AStar import AStar, iterAStar, h2
+from Budget import Budget, CancelToken, SearchStopped, SearchSnapshot, run_search, memory_used
+from test_solvers import example, EXAMPLES, successors, is_goal
+
+ITER_SEARCHES = {
+    'BFS': lambda puzzle, every: iterBFS(puzzle, successors, is_goal, every=every),
+    'A*': lambda puzzle, every: iterAStar(puzzle, successors, is_goal, h2, every=every),
+}
+SEARCHES = {
+    'BFS': lambda puzzle, budget: BFS(puzzle, successors, is_goal, budget=budget),
+    'A*': lambda puzzle, budget: AStar(puzzle, successors, is_goal, h2, budget=budget),
+}
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_max_expanded(search):
+    puzzle = RushHourPuzzle(example('2-c'))
+    stopped = SEARCHES[search](puzzle, Budget(max_expanded=50))
+    assert isinstance(stopped, SearchStopped) and stopped.reason == 'expanded'
+    assert stopped.stats.expanded == 50 and stopped.node is not None
+    # a big enough budget changes nothing
+    assert SEARCHES[search](puzzle, Budget(max_expanded=10 ** 6)).g == 110
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_max_time(search):
+    stopped = SEARCHES[search](RushHourPuzzle(example('2-c')), Budget(max_time=0, check_every=1))
+    assert stopped.reason == 'time'
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_cancel_token(search):
+    token = CancelToken()
+    token.cancel()
+    stopped = SEARCHES[search](RushHourPuzzle(example('2-c')), Budget(cancel=token))
+    assert stopped.reason == 'cancelled' and stopped.stats.expanded == 0
+    # set while the search runs (here by the progress function): the search stops before the next node
+    token = CancelToken()
+    progress = lambda info: token.cancel() if info['expanded'] >= 100 else None
+    stopped = SEARCHES[search](RushHourPuzzle(example('2-c')), Budget(cancel=token, check_every=10,
+                                                                      progress=progress))
+    assert stopped.reason == 'cancelled' and stopped.stats.expanded == 101
+
+
+def test_cancel_from_a_thread():
+    token = CancelToken()
+    timer = threading.Timer(0.05, token.cancel)
+    timer.start()
+    # 2-a takes longer than that with BFS
+    stopped = BFS(RushHourPuzzle(example('2-a')), successors, is_goal, budget=Budget(cancel=token))
+    timer.join()
+    assert stopped.reason == 'cancelled'
+
+
+def test_max_memory():
+    if memory_used() is None:
+        pytest.skip("no resident memory on this system")
+    budget = Budget(max_memory=1, check_every=1)
+    budget.start()
+    assert budget.check(1) == 'memory'
+    assert Budget(max_memory=1 << 60, check_every=1).check(1) is None
+
+
+def test_progress():
+    seen = []
+    BFS(RushHourPuzzle(example('2-c')), successors, is_goal, budget=Budget(check_every=100, progress=seen.append))
+    assert seen and [info['expanded'] for info in seen] == list(range(0, 100 * len(seen), 100))
+    assert [info['depth'] for info in seen] == sorted(info['depth'] for info in seen)  # BFS goes deeper
+
+
+def test_search_stopped_is_falsy():
+    stopped = SearchStopped('time', None, None)
+    assert not stopped and stopped.reason == 'time'
+    assert "reason='time'" in repr(stopped)
+
+
+@pytest.mark.parametrize("search", ITER_SEARCHES)
+def test_snapshots(search):
+    puzzle = RushHourPuzzle(example('2-c'))
+    items = list(ITER_SEARCHES[search](puzzle, 100))
+    *snapshots, goal_node = items
+    # one snapshot every 100 expanded nodes, then the same result as the search without them
+    assert snapshots and all(isinstance(snapshot, SearchSnapshot) for snapshot in snapshots)
+    assert [snapshot.expanded for snapshot in snapshots] == list(range(100, 100 * len(snapshots) + 1, 100))
+    assert goal_node.g == EXAMPLES['2-c']
+    assert all(snapshot.frontier > 0 and snapshot.node is not None for snapshot in snapshots)
+    elapsed = [snapshot.elapsed for snapshot in snapshots]
+    assert elapsed == sorted(elapsed)
+    if search == 'A*':
+        # f of the expanded nodes: never above the optimal cost (h2 is admissible)
+        assert all(snapshot.f <= EXAMPLES['2-c'] for snapshot in snapshots)
+    else:
+        assert all(snapshot.f is None for snapshot in snapshots)
+    assert set(snapshots[0].as_dict()) == {'expanded', 'frontier', 'f', 'depth', 'elapsed'}
+    assert run_search(ITER_SEARCHES[search](puzzle, None)).g == EXAMPLES['2-c']
+
+
+@pytest.mark.parametrize("search", ITER_SEARCHES)
+def test_send_stops_the_search(search):
+    iterator = ITER_SEARCHES[search](RushHourPuzzle(example('2-c')), 50)
+    snapshot = next(iterator)
+    assert snapshot.expanded == 50
+    next(iterator)
+    stopped = iterator.send('cancelled')  # after the second snapshot: nothing more expanded
+    assert isinstance(stopped, SearchStopped) and not stopped
+    assert stopped.reason == 'cancelled' and stopped.stats.expanded == 100
+    with pytest.raises(StopIteration):
+        next(iterator)
@@ -0,0 +1,43 @@
+"""
+DistanceTable: distances of a whole component, save / load, the size limits
+"""
+import pytest
+
+from RushHourPuzzle import RushHourPuzzle
+from PackedState import PackedState
+from BFS import BFS
+from DistanceTable import DistanceTable, ComponentTooLarge, UNSOLVABLE
+from test_solvers import example, successors, is_goal, EXAMPLES
+
+
+def test_distances_are_the_bfs_depths():
+    puzzle = RushHourPuzzle(example('2-c'), backend='bitboard')
+    table = DistanceTable.build(puzzle)
+    assert table.distance(puzzle) == EXAMPLES['2-c']
+    for key, distance in list(zip(table.keys, table.distances))[::97]:
+        state = PackedState(puzzle.layout, table.decode(key))
+        assert table.encode(state.pos) == key
+        if distance == UNSOLVABLE:
+            assert table.distance(state) is None
+        else:
+            assert len(BFS(state, successors, is_goal).getSolution()) == distance
+            assert len(table.solve(state).getSolution()) == distance
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / 'e-f.table')
+    puzzle = RushHourPuzzle(example('e-f'), backend='bitboard')
+    table = DistanceTable.build(puzzle)
+    table.save(path)
+    loaded = DistanceTable.load(path, puzzle.layout)
+    assert len(loaded) == len(table)
+    assert list(loaded.keys) == list(table.keys) and list(loaded.distances) == list(table.distances)
+    assert loaded.solve(puzzle).getSolution() == table.solve(puzzle).getSolution()
+    with pytest.raises(ValueError):
+        DistanceTable.load(path, RushHourPuzzle(example('2-c')).layout)  # built for another layout
+
+
+def test_component_too_large():
+    with pytest.raises(ComponentTooLarge) as error:
+        DistanceTable.build(RushHourPuzzle(example('2-a'), backend='bitboard'), max_states=1000)
+    assert error.value.states > 1000
@@ -0,0 +1,72 @@
+"""
+HeapOpenList / BucketOpenList: pop order with the tie breaks, decrease-key
+"""
+import random
+
+import pytest
+
+from OpenList import HeapOpenList, BucketOpenList
+from Node import Node
+
+
+def fill(Open, seed):
+    # random pushes with integer f >= g, a third of them push again a state already in Open
+    rng = random.Random(seed)
+    best = {}
+    for _ in range(2000):
+        state = rng.randrange(300) if best and rng.random() < 0.3 else rng.randrange(10 ** 6)
+        g = rng.randrange(40)
+        f = g + rng.randrange(40)
+        Open.push(Node(state=state, parent=None, action=None, g=g), f)
+        best[state] = (f, g)
+    return best
+
+
+def drain(Open):
+    order = []
+    while len(Open):
+        order.append(Open.pop())
+    return order
+
+
+@pytest.mark.parametrize("tie_break, sign", [('high_g', -1), ('low_g', 1)])
+def test_buckets_pop_by_f_then_g(tie_break, sign):
+    Open = BucketOpenList(tie_break)
+    best = fill(Open, 7)
+    assert len(Open) == len(best) and all(state in Open and Open.f(state) == f for state, (f, _) in best.items())
+    order = drain(Open)
+    # each state once, with its last push, sorted on (f, g) the way of the tie break
+    assert sorted(node.state for node in order) == sorted(best)
+    assert all(node.g == best[node.state][1] for node in order)
+    keys = [(best[node.state][0], sign * node.g) for node in order]
+    assert keys == sorted(keys)
+    with pytest.raises(IndexError):
+        Open.pop()
+
+
+@pytest.mark.parametrize("tie_break", ['high_g', 'low_g'])
+def test_buckets_and_heap_agree_on_f_and_g(tie_break):
+    heap, buckets = HeapOpenList(tie_break), BucketOpenList(tie_break)
+    best = fill(heap, 11)
+    assert fill(buckets, 11) == best
+    # between equal f and g the order differs (heap: first in, buckets: last in), not f and g
+    keys = lambda order: [best[node.state] for node in order]
+    assert keys(drain(heap)) == keys(drain(buckets))
+
+
+def test_pushes_between_pops():
+    # a pop, then a push with a better g in the same f: the pointer on g comes back to it
+    Open = BucketOpenList('high_g')
+    for state, g in (('a', 1), ('b', 3)):
+        Open.push(Node(state=state, parent=None, action=None, g=g), 5)
+    assert Open.pop().state == 'b'
+    Open.push(Node(state='c', parent=None, action=None, g=4), 5)
+    Open.push(Node(state='d', parent=None, action=None, g=0), 2)
+    assert [node.state for node in drain(Open)] == ['d', 'c', 'a']
+
+
+def test_unknown_tie_break():
+    with pytest.raises(ValueError):
+        BucketOpenList('fifo')
+    with pytest.raises(ValueError):
+        HeapOpenList('random')
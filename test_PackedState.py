@@ -0,0 +1,63 @@
+"""
+PackedState / RushHourPuzzle: moves, successors and equality of the packed states
+"""
+import pytest
+
+from RushHourPuzzle import RushHourPuzzle
+from PackedState import PackedState
+from test_solvers import example, BACKENDS
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_move_shares_the_layout_and_leaves_the_parent(backend):
+    puzzle = RushHourPuzzle(example('e-f'), backend=backend)
+    before = puzzle.pos
+    (vid, direction), _ = puzzle.successorFunction()[0]
+    child = puzzle.moveVehicle(vid, direction)
+    assert puzzle.pos == before  # no copy of the parent, no change either
+    assert child.layout is puzzle.layout and child != puzzle
+    opposite = {'L': 'R', 'R': 'L', 'U': 'D', 'D': 'U'}[direction]
+    assert child.moveVehicle(vid, opposite) == puzzle
+    assert puzzle.moveVehicle('X', 'U') is None  # an horizontal car stays on its row
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_successors_are_the_legal_moves(backend):
+    puzzle = RushHourPuzzle(example('2-c'), backend=backend)
+    grid = puzzle.grid()
+    for action, child in puzzle.successorFunction():
+        assert child == puzzle.applyAction(action)
+        assert child == PackedState(puzzle.layout, child.pos)
+        # the cells of the board are the same ones, one vehicle moved by one cell
+        moved = [a != b for a, b in zip(puzzle.pos, child.pos)]
+        assert moved.count(True) == 1 and sum(abs(a - b) for a, b in zip(puzzle.pos, child.pos)) == 1
+        assert sorted(child.grid()) == sorted(grid)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_slides_are_the_repeated_single_moves(backend):
+    puzzle = RushHourPuzzle(example('2-c'), backend=backend)
+    singles = dict(puzzle.successorFunction())
+    slides = puzzle.slideSuccessorFunction()
+    assert {action[:2]: child for action, child in slides if action[2] == 1} == singles
+    for (vid, direction, k), child in slides:
+        state = puzzle
+        for _ in range(k):
+            state = dict(state.successorFunction())[(vid, direction)]
+        assert state == child == puzzle.applyAction((vid, direction, k))
+    grid = RushHourPuzzle(example('2-c'), backend='grid').slideSuccessorFunction()
+    assert [action for action, _ in slides] == [action for action, _ in grid]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_incremental_hash_is_the_full_hash(backend):
+    # walk a few levels: every child gets its hash from its parent by XOR, a fresh state recomputes it
+    frontier = [RushHourPuzzle(example('2-a'), backend=backend)]
+    for _ in range(4):
+        frontier = [child for state in frontier for _, child in state.iterSuccessors()]
+        frontier += [child for _, child in frontier[0].iterSlideSuccessors()]
+        for child in frontier:
+            assert hash(child) == hash(PackedState(child.layout, child.pos))
+    # fixed Zobrist seed: the same puzzle read again (another process too) hashes the same
+    first, second = (RushHourPuzzle(example('2-a'), backend=backend) for _ in range(2))
+    assert first.layout is not second.layout and hash(first) == hash(second)
@@ -0,0 +1,51 @@
+"""
+PathView: the lazy path gives the same states as getPath, in any order of access
+"""
+import random
+
+import pytest
+
+from RushHourPuzzle import RushHourPuzzle
+from BFS import BFS
+from AStar import AStar, h2, cell_cost
+from PathView import PathView
+from test_solvers import example, BACKENDS, successors, is_goal
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("slides", [False, True])
+def test_same_states_as_get_path(backend, slides):
+    puzzle = RushHourPuzzle(example('2-c'), backend=backend)
+    if slides:
+        goal_node = AStar(puzzle, lambda state: state.iterSlideSuccessors(), is_goal, h2, cell_cost)
+    else:
+        goal_node = BFS(puzzle, successors, is_goal)
+    path = goal_node.getPath()
+    view = goal_node.getPathView()
+    assert len(view) == len(path) and list(view) == path
+    # forward, then backward (opposite moves), then jumps in any order
+    assert [view[k] for k in range(len(path))] == path
+    assert [view[k] for k in reversed(range(len(path)))] == path[::-1]
+    order = list(range(len(path)))
+    random.Random(3).shuffle(order)
+    assert all(view[k] == path[k] for k in order)
+    assert view[-1] == path[-1] and view[-1].isGoal() and view[-len(path)] == path[0]
+    assert view[5:20:3] == path[5:20:3] and view[::-7] == path[::-7]
+    with pytest.raises(IndexError):
+        view[len(path)]
+    with pytest.raises(IndexError):
+        view[-len(path) - 1]
+
+
+def test_compact_tree():
+    puzzle = RushHourPuzzle(example('e-f'))
+    goal_node = BFS(puzzle, successors, is_goal, compact=True)
+    view = goal_node.getPathView()
+    assert list(view) == goal_node.getPath() == BFS(puzzle, successors, is_goal).getPath()
+    assert view[40] == goal_node.getPath()[40]
+
+
+def test_no_moves():
+    puzzle = RushHourPuzzle(example('1'))
+    view = PathView(puzzle, [])
+    assert len(view) == 1 and view[0] is puzzle and view[-1] is puzzle and list(view) == [puzzle]
@@ -0,0 +1,56 @@
+"""
+PuzzleCorpus: CSV puzzles -> corpus file -> the same puzzles, read lazily
+"""
+import os
+
+import pytest
+
+from RushHourPuzzle import RushHourPuzzle
+from PuzzleCorpus import PuzzleCorpus, convert, write_corpus, encode_puzzle
+from PuzzleGenerator import generate
+from test_solvers import example, EXAMPLES, BACKENDS
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_round_trip(backend, tmp_path):
+    path = str(tmp_path / 'examples.rhc')
+    files = [example(name) for name in EXAMPLES]
+    assert convert(path, files) == len(files)
+    with PuzzleCorpus(path) as corpus:
+        assert len(corpus) == len(files)
+        for i, (name, csv_file) in enumerate(zip(EXAMPLES, files)):
+            puzzle = corpus.puzzle(i, backend)
+            original = RushHourPuzzle(csv_file, backend=backend)
+            assert corpus.name(i) == os.path.basename(csv_file)
+            assert puzzle == original
+            assert (puzzle.board_height, puzzle.board_width) == (original.board_height, original.board_width)
+            assert puzzle.vehicles == original.vehicles and puzzle.walls == original.walls
+        # iterating reads the same puzzles, one at a time
+        assert [puzzle.vehicles for puzzle in corpus] == [RushHourPuzzle(f).vehicles for f in files]
+        names = [name for name, _ in corpus.iter_puzzles(backend)]
+        assert names == [os.path.basename(f) for f in files]
+
+
+def test_walls_and_indexing(tmp_path):
+    # a generated board with walls, written and read back
+    generated = generate(1, height=7, vehicles=12, wall_density=0.1, min_depth=5)
+    original = RushHourPuzzle(generated.write_csv(tmp_path / 'walls.csv'))
+    assert original.walls
+    path = str(tmp_path / 'walls.rhc')
+    write_corpus(path, [('walls', original), ('e-f', RushHourPuzzle(example('e-f')))])
+    with PuzzleCorpus(path) as corpus:
+        assert corpus[0] == original and corpus[0].walls == original.walls
+        assert corpus[-1] == corpus[1] == RushHourPuzzle(example('e-f'))
+        with pytest.raises(IndexError):
+            corpus[2]
+
+
+def test_bad_files(tmp_path):
+    path = tmp_path / 'not-a-corpus.rhc'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        PuzzleCorpus(str(path))
+    puzzle = RushHourPuzzle()
+    puzzle.setPuzzle(300, 6, [], [('X', 0, 149, 'H', 2)])
+    with pytest.raises(ValueError):
+        encode_puzzle(puzzle)
@@ -0,0 +1,52 @@
+"""
+PuzzleGenerator: the same puzzle for the same seed, solvable at the requested depth
+"""
+import json
+
+import pytest
+
+from RushHourPuzzle import RushHourPuzzle
+from BFS import BFS
+from PuzzleGenerator import generate, generate_corpus, parse_depth
+from test_solvers import successors, is_goal
+
+# (options, seed): one component explored by a DistanceTable, one too big (8x8, the depth is climbed)
+CASES = [({'height': 6, 'vehicles': 10, 'min_depth': 20, 'max_depth': 30}, 0),
+         ({'height': 8, 'vehicles': 16, 'min_depth': 12, 'max_depth': 20, 'max_states': 10000}, 5)]
+
+
+@pytest.mark.parametrize("options, seed", CASES)
+def test_generated_depth_is_the_optimum(options, seed, tmp_path):
+    puzzle = generate(seed, **options)
+    assert options['min_depth'] <= puzzle.depth <= options['max_depth']
+    assert (puzzle.states is None) == (options['height'] == 8) and puzzle.min_states > 0
+    state = RushHourPuzzle(puzzle.write_csv(tmp_path / "puzzle.csv"), backend='bitboard')
+    assert len(BFS(state, successors, is_goal).getSolution()) == puzzle.depth
+
+
+@pytest.mark.parametrize("options, seed", CASES)
+def test_same_seed_same_puzzle(options, seed):
+    first, second = generate(seed, **options), generate(seed, **options)
+    assert first.lines() == second.lines() and first.depth == second.depth
+
+
+def test_corpus(tmp_path):
+    manifest = generate_corpus(str(tmp_path), 2, seed=3, vehicles=9, min_depth=8, max_depth=12)
+    assert [entry['file'] for entry in manifest['puzzles']] == ['6x6-9-0000.csv', '6x6-9-0001.csv']
+    with open(tmp_path / 'manifest.json') as fichier:
+        assert json.load(fichier) == manifest
+    # puzzle i of a corpus is generate("seed-i"): it can be made again alone
+    assert generate("3-1", vehicles=9, min_depth=8, max_depth=12).depth == manifest['puzzles'][1]['depth']
+    files = [(tmp_path / entry['file']).read_text() for entry in manifest['puzzles']]
+    assert files[0] != files[1]  # another seed, another puzzle
+    for entry in manifest['puzzles']:
+        state = RushHourPuzzle(str(tmp_path / entry['file']))
+        assert BFS(state, successors, is_goal).g == entry['depth']
+
+
+def test_bad_options():
+    with pytest.raises(ValueError):
+        generate(0, vehicles=60)
+    with pytest.raises(ValueError):
+        generate(0, height=4, vehicles=6, min_depth=50, attempts=3)  # nothing that deep on a 4x4
+    assert parse_depth("12") == (12, None) and parse_depth("12-20") == (12, 20)
@@ -0,0 +1,53 @@
+"""
+SearchStats: counters of BFS / AStar, effective branching factor, timings
+"""
+import pytest
+
+from RushHourPuzzle import RushHourPuzzle
+from BFS import BFS
+from AStar import AStar, h2
+from SearchStats import SearchStats
+from test_solvers import example, successors, is_goal
+
+# a small graph: 0 is the start, 4 the goal, 1 -> 0 and 3 -> 1 go back
+GRAPH = {0: [1, 2], 1: [0, 2, 3], 2: [3], 3: [1, 4], 4: []}
+graph_successors = lambda state: [((state, child), child) for child in GRAPH[state]]
+
+
+def test_bfs_counters():
+    stats = SearchStats(timed=False)
+    goal_node = BFS(0, graph_successors, lambda state: state == 4, stats=stats)
+    assert goal_node.getSolution() == [(0, 1), (1, 3), (3, 4)]
+    # expanded 0, 1, 2, 3; the goal is seen when 3 is expanded (the 8th successor, the last one)
+    assert (stats.expanded, stats.generated) == (4, 8)
+    assert (stats.duplicates_open, stats.duplicates_closed) == (2, 2)  # 2 and 3 again / 0 and 1 again
+    assert stats.depth == 3 and stats.peak_closed == 4
+
+
+def test_astar_counters():
+    # h = 0: the same nodes as BFS but the goal is only taken when it is popped
+    stats = SearchStats(timed=False)
+    goal_node = AStar(0, graph_successors, lambda state: state == 4, lambda state: 0, stats=stats)
+    assert goal_node.g == stats.depth == 3
+    assert (stats.expanded, stats.generated, stats.reopened) == (4, 8, 0)
+    assert stats.duplicates_open + stats.duplicates_closed == stats.generated - 4  # 4 states reached from 0
+
+
+def test_branching_factor():
+    stats = SearchStats()
+    assert stats.branching_factor is None  # no search, no solution
+    stats.depth, stats.generated = 2, 6  # 1 + b + b^2 = 7
+    assert stats.branching_factor == pytest.approx(2)
+    stats.depth, stats.generated = 3, 3  # a single path: b* = 1
+    assert stats.branching_factor == pytest.approx(1)
+
+
+@pytest.mark.parametrize("timed", [True, False])
+def test_timings(timed):
+    stats = SearchStats(timed=timed)
+    AStar(RushHourPuzzle(example('2-c')), successors, is_goal, h2, stats=stats)
+    phases = [stats.timings[phase] for phase in ('successors', 'heuristic', 'queue')]
+    assert all(phases) if timed else not any(phases)
+    assert sum(phases) < stats.timings['total']
+    assert stats.depth == 110 and 1 < stats.branching_factor < 2
+    assert stats.as_dict()['timings'] == stats.timings and stats.as_dict()['expanded'] == stats.expanded
@@ -0,0 +1,48 @@
+"""
+SearchTree: packed actions and the paths of the compact searches
+"""
+import pytest
+
+from RushHourPuzzle import RushHourPuzzle
+from PackedState import PuzzleLayout, PackedState
+from BFS import BFS
+from AStar import AStar, h2
+from SearchTree import SearchTree
+from test_solvers import example, successors, is_goal, EXAMPLES
+
+
+def test_pack_unpack():
+    puzzle = RushHourPuzzle(example('2-c'))
+    tree = SearchTree(puzzle)
+    actions = [action for action, _ in puzzle.successorFunction() + puzzle.slideSuccessorFunction()]
+    codes = [tree.pack(action) for action in actions]
+    assert len(set(codes)) == len(actions)
+    assert [tree.unpack(code) for code in codes] == actions
+    assert all(0 <= code < 1 << 16 for code in codes)
+
+
+@pytest.mark.parametrize("search", [
+    lambda puzzle, compact: BFS(puzzle, successors, is_goal, compact=compact),
+    lambda puzzle, compact: AStar(puzzle, successors, is_goal, h2, compact=compact),
+    lambda puzzle, compact: AStar(puzzle, lambda state: state.iterSlideSuccessors(), is_goal, h2,
+                                  lambda action: action[2], compact=compact),
+])
+def test_compact_path_is_the_node_path(search):
+    puzzle = RushHourPuzzle(example('e-f'), backend='bitboard')
+    goal_node, tree_node = search(puzzle, False), search(puzzle, True)
+    assert tree_node.g == goal_node.g == EXAMPLES['e-f']
+    assert tree_node.getSolution() == goal_node.getSolution()
+    assert tree_node.getSolution(expand=True) == goal_node.getSolution(expand=True)
+    path = tree_node.getPath()
+    assert path == goal_node.getPath() and path[0] == puzzle and path[-1].isGoal()
+
+
+def test_layouts_too_big_to_pack():
+    # one horizontal car per row: 129 vehicles don't fit in 7 bits
+    layout = PuzzleLayout(129, 4, [(f"C{row}", 'H', 2, row) for row in range(129)], [])
+    with pytest.raises(ValueError):
+        SearchTree(PackedState(layout, [0] * 129))
+    # a 300 cells long row: a slide could be longer than 255 cells
+    layout = PuzzleLayout(3, 300, [("X", 'H', 2, 0)], [])
+    with pytest.raises(ValueError):
+        SearchTree(PackedState(layout, [0]))
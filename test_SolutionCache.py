@@ -0,0 +1,111 @@
+"""
+SolutionCache: solutions found again for the same puzzle with other vehicle names, LRU eviction
+"""
+from RushHourPuzzle import RushHourPuzzle
+from BFS import BFS
+from AStar import AStar, h2
+from Budget import Budget
+from ParallelBFS import replay
+from SearchStats import SearchStats
+import SolutionCache as solution_cache
+from SolutionCache import SolutionCache, fingerprint, restore_stats
+from test_solvers import example, EXAMPLES, successors, is_goal
+
+
+def renamed_copy(name, path):
+    # same puzzle, other vehicle names (X stays X) and the other vehicles in reverse order
+    with open(example(name)) as fichier:
+        lines = [line.strip() for line in fichier if line.strip()]
+    vehicles = [line.split(',') for line in lines[1:]]
+    target = [vehicle for vehicle in vehicles if vehicle[0] == 'X']
+    others = [[f"R{vehicle[0]}"] + vehicle[1:] for vehicle in vehicles if vehicle[0] != 'X']
+    with open(path, 'w') as fichier:
+        fichier.write('\n'.join([lines[0]] + [','.join(vehicle) for vehicle in target + others[::-1]]) + '\n')
+    return str(path)
+
+
+def test_fingerprint(tmp_path):
+    puzzle = RushHourPuzzle(example('e-f'))
+    renamed = RushHourPuzzle(renamed_copy('e-f', tmp_path / 'renamed.csv'))
+    assert fingerprint(puzzle)[0] == fingerprint(renamed)[0]
+    assert fingerprint(puzzle)[0] != fingerprint(RushHourPuzzle(example('2-c')))[0]
+    # a move is another puzzle
+    (_, child), = puzzle.successorFunction()[:1]
+    assert fingerprint(child)[0] != fingerprint(puzzle)[0]
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'solutions.sqlite')
+    puzzle = RushHourPuzzle(example('e-f'))
+    stats = SearchStats(timed=False)
+    goal_node = BFS(puzzle, successors, is_goal, stats=stats)
+    with SolutionCache(path) as cache:
+        cache.put(puzzle, 'BFS', goal_node.getSolution(), goal_node.g, stats)
+        cache.put(puzzle, 'nothing', None)
+
+    renamed = RushHourPuzzle(renamed_copy('e-f', tmp_path / 'renamed.csv'))
+    with SolutionCache(path) as cache:
+        assert len(cache) == 2
+        cached = cache.get(renamed, 'BFS')
+        assert cached is not None
+        # the actions come back with the names of the renamed puzzle
+        assert {action[0] for action in cached['actions']} <= set(renamed.layout.ids)
+        assert len(cached['actions']) == EXAMPLES['e-f'] and cached['cost'] == goal_node.g
+        assert replay(renamed, cached['actions']).state.isGoal()
+        restored = restore_stats(SearchStats(), cached)
+        assert (restored.expanded, restored.generated, restored.timed) == (stats.expanded, stats.generated, False)
+        assert restored.timings['total'] == stats.timings['total']
+
+        assert cache.get(renamed, 'nothing')['actions'] is None  # unsolvable stays unsolvable
+        assert cache.get(renamed, 'A* h2') is None  # other solver, other entry
+        assert cache.get(RushHourPuzzle(example('2-c')), 'BFS') is None
+
+
+def test_solve(tmp_path):
+    searched = []
+    first_stats = SearchStats(timed=False)
+    search = lambda state: searched.append(state) or BFS(state, successors, is_goal, stats=first_stats)
+    puzzle = RushHourPuzzle(example('e-f'))
+    with SolutionCache(str(tmp_path / 'solutions.sqlite')) as cache:
+        # a miss searches and stores, the hit reads it without searching
+        first = cache.solve(puzzle, 'BFS', search, stats=first_stats)
+        stats = SearchStats()
+        hit = cache.solve(RushHourPuzzle(renamed_copy('e-f', tmp_path / 'renamed.csv')), 'BFS', search, stats=stats)
+        assert len(searched) == 1 and hit.g == first.g == EXAMPLES['e-f']
+        assert (stats.depth, stats.expanded) == (EXAMPLES['e-f'], first_stats.expanded)
+        # a stopped search proves nothing: returned, not stored
+        stopped = cache.solve(puzzle, 'A* h2', lambda state: AStar(state, successors, is_goal, h2,
+                                                                   budget=Budget(max_expanded=10)))
+        assert not stopped and stopped.reason == 'expanded'
+        assert cache.get(puzzle, 'A* h2') is None
+
+
+def test_eviction(tmp_path):
+    puzzles = [RushHourPuzzle(example(name)) for name in ('1', '2-b', '2-c')]
+    solutions = [BFS(puzzle, successors, is_goal) for puzzle in puzzles]
+    sizes = []
+    with SolutionCache(str(tmp_path / 'all.sqlite')) as cache:
+        for puzzle, goal_node in zip(puzzles, solutions):
+            cache.put(puzzle, 'BFS', goal_node.getSolution(), goal_node.g)
+            sizes.append(cache.size() - sum(sizes))
+    # room for two of them: the least recently used one goes when the third is put
+    with SolutionCache(str(tmp_path / 'two.sqlite'), max_bytes=sizes[0] + max(sizes[1:])) as cache:
+        for puzzle, goal_node in zip(puzzles[:2], solutions):
+            cache.put(puzzle, 'BFS', goal_node.getSolution(), goal_node.g)
+        assert cache.get(puzzles[0], 'BFS') is not None  # 1 used after 2-b
+        cache.put(puzzles[2], 'BFS', solutions[2].getSolution(), solutions[2].g)
+        assert cache.size() <= cache.max_bytes and len(cache) == 2
+        assert cache.get(puzzles[1], 'BFS') is None
+        assert cache.get(puzzles[0], 'BFS') is not None and cache.get(puzzles[2], 'BFS') is not None
+
+
+def test_other_successors_empty_the_cache(tmp_path, monkeypatch):
+    path = str(tmp_path / 'solutions.sqlite')
+    puzzle = RushHourPuzzle(example('1'))
+    with SolutionCache(path) as cache:
+        cache.put(puzzle, 'BFS', BFS(puzzle, successors, is_goal).getSolution())
+    with SolutionCache(path) as cache:
+        assert len(cache) == 1
+    monkeypatch.setattr(solution_cache, 'SUCCESSOR_VERSION', solution_cache.SUCCESSOR_VERSION + 1)
+    with SolutionCache(path) as cache:
+        assert len(cache) == 0
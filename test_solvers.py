@@ -0,0 +1,154 @@
+"""
+Optimal move counts of examples/*.csv with every engine on both backends. Run: python -m pytest -q
+"""
+import os
+
+import pytest
+
+from RushHourPuzzle import RushHourPuzzle
+from BFS import BFS
+from AStar import AStar, IDAStar, h1, h2, h3, h5, cell_cost, slide_cost
+from ParallelBFS import ParallelBFS, replay
+from HDAStar import HDAStar
+from ExternalBFS import ExternalBFS
+from DistanceTable import DistanceTable
+from SearchStats import SearchStats
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'examples')
+# optimal number of single cell moves of each example
+EXAMPLES = {'1': 35, '2-a': 27, '2-b': 103, '2-c': 110, '2-d': 94, '2-e': 73, 'e-f': 83}
+BACKENDS = ('grid', 'bitboard')
+
+successors = lambda state: state.iterSuccessors()
+is_goal = lambda state: state.isGoal()
+
+ENGINES = {
+    'BFS': lambda puzzle, work_dir: BFS(puzzle, successors, is_goal),
+    'A* h1': lambda puzzle, work_dir: AStar(puzzle, successors, is_goal, h1),
+    'A* h2': lambda puzzle, work_dir: AStar(puzzle, successors, is_goal, h2),
+    'A* h3': lambda puzzle, work_dir: AStar(puzzle, successors, is_goal, h3),
+    'A* h2 buckets': lambda puzzle, work_dir: AStar(puzzle, successors, is_goal, h2, open_list='bucket'),
+    'ParallelBFS': lambda puzzle, work_dir: ParallelBFS(puzzle, workers=2),
+    'HDA* h2': lambda puzzle, work_dir: HDAStar(puzzle, h2, workers=2),
+    'ExternalBFS': lambda puzzle, work_dir: ExternalBFS(puzzle, work_dir=str(work_dir)),
+    'DistanceTable': lambda puzzle, work_dir: DistanceTable.build(puzzle).solve(puzzle),
+    'IDA* h2': lambda puzzle, work_dir: IDAStar(puzzle, successors, is_goal, h2, table_size=1 << 20),
+}
+# engines run on a few examples only, the others take too long: the component of 2-a has 541934 states,
+# IDA* needs minutes on 2-c
+ONLY = {'DistanceTable': ('1', '2-b', '2-c', '2-d', '2-e', 'e-f'), 'IDA* h2': ('1', '2-a')}
+
+CASES = [(engine, name, backend) for engine in ENGINES for name in EXAMPLES
+         if name in ONLY.get(engine, EXAMPLES) for backend in BACKENDS]
+
+
+def example(name):
+    return os.path.join(EXAMPLES_DIR, f"{name}.csv")
+
+
+@pytest.mark.parametrize("engine, name, backend", CASES)
+def test_optimal_moves(engine, name, backend, tmp_path):
+    puzzle = RushHourPuzzle(example(name), backend=backend)
+    goal_node = ENGINES[engine](puzzle, tmp_path)
+    assert goal_node is not None
+    actions = goal_node.getSolution()
+    assert len(actions) == EXAMPLES[name]
+    # the actions really go from the puzzle to the goal
+    assert replay(puzzle, actions).state.isGoal()
+
+
+@pytest.mark.parametrize("name", ['1', '2-c', 'e-f'])
+def test_slides(name):
+    slide_successors = lambda state: state.iterSlideSuccessors()
+    puzzle = RushHourPuzzle(example(name), backend='bitboard')
+    # cell_cost: a slide of k cells costs k, the same optimum as the single cell moves
+    goal_node = AStar(puzzle, slide_successors, is_goal, h2, cell_cost)
+    assert goal_node.g == EXAMPLES[name]
+    expanded = goal_node.getSolution(expand=True)
+    assert len(expanded) == EXAMPLES[name] and all(len(action) == 2 for action in expanded)
+    assert replay(puzzle, expanded).state.isGoal()
+    assert replay(puzzle, goal_node.getSolution(), cell_cost).g == EXAMPLES[name]
+    # slide_cost: fewest slides, A* with h5 (admissible for it) finds as few as BFS on the slides
+    fewest = len(BFS(puzzle, slide_successors, is_goal).getSolution())
+    goal_node = AStar(puzzle, slide_successors, is_goal, h5, slide_cost)
+    assert goal_node.g == len(goal_node.getSolution()) == fewest < EXAMPLES[name]
+    assert replay(puzzle, goal_node.getSolution(), slide_cost).state.isGoal()
+
+
+@pytest.mark.parametrize("name", ['1', '2-a', '2-b', '2-c', 'e-f'])  # 2-d / 2-e: seconds each
+@pytest.mark.parametrize("heuristic", [h1, h2, h3], ids=['h1', 'h2', 'h3'])
+def test_early_goal_keeps_the_optimal_cost(name, heuristic):
+    puzzle = RushHourPuzzle(example(name), backend='bitboard')
+    late, early = SearchStats(timed=False), SearchStats(timed=False)
+    goal_node = AStar(puzzle, successors, is_goal, heuristic, stats=late)
+    early_node = AStar(puzzle, successors, is_goal, heuristic, early_goal=True, stats=early)
+    assert early_node.g == goal_node.g == EXAMPLES[name]
+    assert replay(puzzle, early_node.getSolution()).state.isGoal()
+    assert early.expanded <= late.expanded
+    # the same with slides: a goal child is only taken when its g can't be beaten
+    slides = AStar(puzzle, lambda state: state.iterSlideSuccessors(), is_goal, heuristic, cell_cost, early_goal=True)
+    assert slides.g == EXAMPLES[name]
+
+
+def test_successors_are_lazy():
+    puzzle = RushHourPuzzle(example('2-c'))
+    children = puzzle.iterSuccessors()
+    assert iter(children) is children  # a generator: the siblings are built only when asked for
+    first = next(children)
+    assert [first] + list(children) == puzzle.successorFunction()
+
+
+def test_ida_star_tables():
+    puzzle = RushHourPuzzle(example('1'), backend='bitboard')
+    # either replacement policy keeps IDA* optimal
+    for replacement in ('depth', 'always'):
+        assert IDAStar(puzzle, successors, is_goal, h2, table_size=1 << 16, replacement=replacement).g == EXAMPLES['1']
+    # a table owned by the caller, reused from puzzle to puzzle, is empty again after each call
+    table = [None] * (1 << 16)
+    for name in ('1', '2-a', '1'):
+        goal_node = IDAStar(RushHourPuzzle(example(name)), successors, is_goal, h2, table=table)
+        assert goal_node.g == EXAMPLES[name]
+        assert len(table) == 1 << 16 and not any(table)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("slides", [False, True])
+def test_parallel_bfs_is_bfs(workers, slides):
+    # chunks are merged in order: the same path as BFS, with or without a pool
+    puzzle = RushHourPuzzle(example('2-c'), backend='bitboard')
+    expand = (lambda state: state.iterSlideSuccessors()) if slides else successors
+    goal_node = ParallelBFS(puzzle, workers=workers, slides=slides, chunk_size=7)
+    assert goal_node.getSolution() == BFS(puzzle, expand, is_goal).getSolution()
+    assert ParallelBFS(goal_node.state, workers=workers).g == 0
+
+
+@pytest.mark.parametrize("name", ['1', '2-c'])
+def test_hda_star_slides(name):
+    puzzle = RushHourPuzzle(example(name), backend='bitboard')
+    slide_successors = lambda state: state.iterSlideSuccessors()
+    assert HDAStar(puzzle, h2, cell_cost, workers=2, slides=True).g == EXAMPLES[name]
+    goal_node = HDAStar(puzzle, h5, slide_cost, workers=3, slides=True)
+    assert goal_node.g == AStar(puzzle, slide_successors, is_goal, h5, slide_cost).g
+    assert replay(puzzle, goal_node.getSolution(), slide_cost).state.isGoal()
+
+
+def broken_h(state):
+    raise ZeroDivisionError("h of a worker")
+
+
+def test_hda_star_worker_crash():
+    # the worker dies on its first node: an error, not a search waiting forever
+    with pytest.raises(RuntimeError):
+        HDAStar(RushHourPuzzle(example('1')), broken_h, workers=2)
+
+
+def test_external_bfs_files(tmp_path):
+    puzzle = RushHourPuzzle(example('2-c'), backend='bitboard')
+    # a buffer of 100 keys: every layer is sorted in many runs, merged back
+    assert ExternalBFS(puzzle, work_dir=str(tmp_path), buffer_size=100).g == EXAMPLES['2-c']
+    assert not os.listdir(tmp_path)  # the layers and runs are removed
+    slides = ExternalBFS(puzzle, slides=True, work_dir=str(tmp_path), keep_files=True)
+    fewest = BFS(puzzle, lambda state: state.iterSlideSuccessors(), is_goal)
+    assert len(slides.getSolution()) == len(fewest.getSolution())
+    directory, = os.listdir(tmp_path)
+    assert len(os.listdir(tmp_path / directory)) == slides.g  # one file per depth before the goal